@@ -1,2 +1,3 @@
-python3 src/main.py
-cd public && python3 -m http.server 8888
\ No newline at end of file
+python3 src/main.py --watch &
+trap "kill $!" EXIT
+cd docs && python3 -m http.server 8888
\ No newline at end of file
@@ -0,0 +1,435 @@
+"""
+Reproducible performance benchmarks for the site generator.
+
+Usage: python3 src/benchmark.py [--size N] [--repeat N] [--output FILE]
+                                [--baseline FILE] [--threshold PCT]
+                                [--history FILE] [--shapes a,b,...]
+
+Generates seeded synthetic corpora of several shapes, times each stage of
+the pipeline on them plus a full main() build, and writes the timings as
+JSON. Rendering is also timed with HTML escaping of leaf text switched off,
+to show what escaping costs. Very wide and very deep node trees are
+rendered both by the iterative renderer and by the recursive one it
+replaced, and a link-heavy paragraph is tokenized both in a single scan and
+by the multi-pass splitter. The memory held by a large parsed node tree is
+measured under tracemalloc. With --baseline the run is compared against a
+previous output file and any benchmark slower (or, for memory, larger)
+than the threshold is reported as a regression (exit status 1). With
+--history each run is appended as one JSON line.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+
+import leafnode
+from htmlnode import escape_text
+from leafnode import LeafNode
+from parentnode import ParentNode
+from splitter import (
+    block_to_block_type, markdown_to_blocks, markdown_to_html_node, text_to_textnodes, text_to_textnodes_multipass,
+)
+
+WORDS = (
+    "the ring elves hobbit mountain river shadow road tower forest king song "
+    "light dark journey west east silver wind stone fire ship harbour"
+).split()
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>"""
+
+def _sentence(rng, words, links=0):
+    parts = [rng.choice(WORDS) for _ in range(words)]
+    for _ in range(links):
+        i = rng.randrange(len(parts))
+        target = rng.choice(WORDS)
+        parts[i] = f"[{parts[i]}](/{target}/{rng.randrange(1000)})"
+    if words > 6:
+        parts[1] = f"**{parts[1]}**"
+        parts[3] = f"_{parts[3]}_"
+        parts[5] = f"`{parts[5]}`"
+    return " ".join(parts)
+
+def _page(title, blocks):
+    return "\n\n".join([f"# {title}"] + blocks)
+
+def corpus_long_paragraphs(size, rng):
+    blocks = [_sentence(rng, 400 * size) for _ in range(20)]
+    return {"long/index.md": _page("Long paragraphs", blocks)}
+
+def corpus_huge_lists(size, rng):
+    unordered = "\n".join(f"- {_sentence(rng, 8)}" for _ in range(2000 * size))
+    ordered = "\n".join(f"{i + 1}. {_sentence(rng, 8)}" for i in range(2000 * size))
+    return {"lists/index.md": _page("Huge lists", [unordered, ordered])}
+
+def corpus_link_dense(size, rng):
+    blocks = [_sentence(rng, 200, links=150) for _ in range(10 * size)]
+    return {"links/index.md": _page("Link dense", blocks)}
+
+def corpus_many_small_files(size, rng):
+    files = {}
+    for i in range(300 * size):
+        blocks = [_sentence(rng, 30, links=2), f"- {_sentence(rng, 5)}\n- {_sentence(rng, 5)}"]
+        files[f"small/page{i}/index.md"] = _page(f"Page {i}", blocks)
+    return files
+
+def corpus_deep_tree(size, rng):
+    files = {}
+    for branch in range(4 * size):
+        path = "deep"
+        for depth in range(25):
+            path = f"{path}/d{depth}"
+            files[f"{path}/b{branch}.md"] = _page(f"Depth {depth}", [_sentence(rng, 40, links=3)])
+    return files
+
+def corpus_special_chars(size, rng):
+    # Text that must be HTML-escaped in every block, so the escaping slow
+    # path is timed
+    blocks = [
+        f"{_sentence(rng, 20)} a < b & c > d, said \"{rng.choice(WORDS)}\" & '{rng.choice(WORDS)}'."
+        for _ in range(400 * size)
+    ]
+    return {"special/index.md": _page("Special characters", blocks)}
+
+CORPORA = {
+    "long_paragraphs": corpus_long_paragraphs,
+    "huge_lists": corpus_huge_lists,
+    "link_dense": corpus_link_dense,
+    "many_small_files": corpus_many_small_files,
+    "deep_tree": corpus_deep_tree,
+    "special_chars": corpus_special_chars,
+}
+
+def generate_corpus(shape, size=1, seed=0):
+    """
+    Build a synthetic corpus deterministically from (shape, size, seed).
+
+    Args:
+        shape: One of the keys of CORPORA
+        size: Integer scale factor
+        seed: Random seed
+
+    Returns:
+        Dict mapping relative .md paths to markdown text
+    """
+    return CORPORA[shape](size, random.Random(f"{shape}:{size}:{seed}"))
+
+def write_corpus(files, root):
+    """
+    Lay a corpus out as a site: content/, static/ and template.html.
+    """
+    for rel_path, markdown in files.items():
+        path = os.path.join(root, "content", rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(markdown)
+    os.makedirs(os.path.join(root, "static"), exist_ok=True)
+    with open(os.path.join(root, "static", "index.css"), "w") as f:
+        f.write("body { margin: 0 }\n")
+    with open(os.path.join(root, "template.html"), "w") as f:
+        f.write(TEMPLATE)
+
+def time_call(func, repeat):
+    """
+    Run func repeat times and return timing statistics in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "runs": repeat}
+
+def leaf_values(node):
+    """
+    Collect the text of every leaf in a node tree.
+    """
+    values = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.children is None:
+            values.append(node.value)
+        else:
+            stack.extend(node.children)
+    return values
+
+def wide_tree(paragraphs, spans=8):
+    """
+    A node tree of many shallow paragraphs.
+    """
+    return ParentNode("div", [
+        ParentNode("p", [
+            LeafNode("b", f"bold {i}") if j % 2 else LeafNode(None, f"text {i}.{j} ")
+            for j in range(spans)
+        ])
+        for i in range(paragraphs)
+    ])
+
+def deep_tree(depth):
+    """
+    A node tree nested depth levels deep, far past the recursion limit for
+    large depths; markdown itself never nests this deep.
+    """
+    node = LeafNode(None, "leaf")
+    for i in range(depth):
+        node = ParentNode("blockquote" if i % 2 else "div", [node, LeafNode("i", f"level {i}")])
+    return node
+
+def iter_html_recursive(node):
+    """
+    The renderer ParentNode.iter_html replaced: one nested generator per
+    ParentNode, so it fails on trees deeper than the recursion limit.
+    """
+    if not isinstance(node, ParentNode):
+        yield node.to_html()
+        return
+    yield f"<{node.tag}{node.props_to_html()}>"
+    for child in node.children:
+        yield from iter_html_recursive(child)
+    yield f"</{node.tag}>"
+
+def render_recursive(node):
+    return "".join(iter_html_recursive(node))
+
+def _unescaped(func):
+    """
+    Wrap func so leaf text is emitted without HTML escaping while it runs,
+    the cost escaping is measured against.
+    """
+    def run():
+        leafnode.escape_text = str
+        try:
+            return func()
+        finally:
+            leafnode.escape_text = escape_text
+    return run
+
+def _stage_benchmarks(documents):
+    blocks = [block for doc in documents for block in markdown_to_blocks(doc)]
+    inline = [block.text.replace("\n", " ") for block in blocks if not block.text.startswith("```")]
+    trees = [markdown_to_html_node(doc) for doc in documents]
+    values = [value for tree in trees for value in leaf_values(tree)]
+    return {
+        "markdown_to_blocks": lambda: [markdown_to_blocks(doc) for doc in documents],
+        "block_to_block_type": lambda: [block_to_block_type(block.text) for block in blocks],
+        "text_to_textnodes": lambda: [text_to_textnodes(text) for text in inline],
+        "markdown_to_html_node": lambda: [markdown_to_html_node(doc) for doc in documents],
+        "to_html": lambda: [tree.to_html() for tree in trees],
+        "to_html_unescaped": _unescaped(lambda: [tree.to_html() for tree in trees]),
+        "render": lambda: [markdown_to_html_node(doc).to_html() for doc in documents],
+        "render_unescaped": _unescaped(lambda: [markdown_to_html_node(doc).to_html() for doc in documents]),
+        "escape_text": lambda: [escape_text(value) for value in values],
+    }
+
+def _tree_benchmarks(size):
+    # Each shape is rendered by the iterative walk and by the recursive
+    # renderer it replaced; the deep forest stays well inside the recursion
+    # limit so both can run, and only the iterative walk renders past it
+    wide = wide_tree(10000 * size)
+    forest = ParentNode("div", [deep_tree(500) for _ in range(20 * size)])
+    past_limit = deep_tree(5000 * size)
+    return {
+        "trees.wide.iterative": wide.to_html,
+        "trees.wide.recursive": lambda: render_recursive(wide),
+        "trees.deep.iterative": forest.to_html,
+        "trees.deep.recursive": lambda: render_recursive(forest),
+        "trees.past_recursion_limit": past_limit.to_html,
+    }
+
+def link_paragraph(links):
+    return " ".join(f"see [link {i}](https://example.com/{i})" for i in range(links))
+
+def _inline_benchmarks(size):
+    # The single-scan tokenizer against the multi-pass splitter it replaced,
+    # on a paragraph long enough for the splitter's repeated passes to show
+    text = link_paragraph(4000 * size)
+    return {
+        "inline.links.single_pass": lambda: text_to_textnodes(text),
+        "inline.links.multipass": lambda: text_to_textnodes_multipass(text),
+    }
+
+def memory_document(paragraphs):
+    """
+    A document of headings, inline-rich paragraphs and short lists, whose
+    node tree is large enough for per-node overhead to dominate.
+    """
+    blocks = []
+    for i in range(paragraphs):
+        blocks.append(f"## Section {i}")
+        blocks.append(
+            f"Paragraph {i} has **bold**, _italic_ and `code`, a [link](/page/{i % 50}) "
+            f"and an ![image](/images/{i % 10}.png) plus [another link](https://example.com)."
+        )
+        blocks.append("\n".join(f"- item {j} with [a link](/item/{j})" for j in range(5)))
+    return "\n\n".join(blocks)
+
+def measure_memory(paragraphs):
+    """
+    Parse memory_document(paragraphs) under tracemalloc.
+
+    Returns:
+        Dict with the peak traced memory while parsing and the memory and
+        allocated blocks still held by the finished tree
+    """
+    markdown = memory_document(paragraphs)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tree = markdown_to_html_node(markdown)
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del tree
+    return {
+        "traced_peak_kb": peak // 1024,
+        "tree_retained_kb": current // 1024,
+        "live_blocks": sum(stat.count for stat in snapshot.statistics("filename")),
+    }
+
+def _build_benchmarks(root):
+    from main import main as build_main
+
+    def build(*argv):
+        cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            with redirect_stdout(StringIO()):
+                build_main(list(argv))
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "main_clean": lambda: build("/", "--clean"),
+        "main_noop": lambda: build("/"),
+    }
+
+def run_suite(shapes, size=1, repeat=5, seed=0):
+    """
+    Run every benchmark on every requested corpus shape.
+
+    Returns:
+        Dict with "meta" and "results" ({"shape.benchmark": timing stats})
+    """
+    results = {}
+    for key, func in {**_tree_benchmarks(size), **_inline_benchmarks(size)}.items():
+        results[key] = time_call(func, repeat)
+        print(f"{key:<40} {results[key]['median'] * 1000:>10.2f} ms", file=sys.stderr)
+    for shape in shapes:
+        files = generate_corpus(shape, size, seed)
+        benchmarks = _stage_benchmarks(list(files.values()))
+        with tempfile.TemporaryDirectory() as root:
+            write_corpus(files, root)
+            benchmarks.update(_build_benchmarks(root))
+            for name, func in benchmarks.items():
+                key = f"{shape}.{name}"
+                func()  # warm up caches and the build manifest
+                results[key] = time_call(func, repeat)
+                print(f"{key:<40} {results[key]['median'] * 1000:>10.2f} ms", file=sys.stderr)
+    # Memory is deterministic, so one measurement is recorded in the same
+    # shape as a timing, with its unit
+    for name, value in measure_memory(5000 * size).items():
+        key = f"memory.{name}"
+        unit = "KB" if name.endswith("_kb") else "blocks"
+        results[key] = {"min": value, "median": value, "runs": 1, "unit": unit}
+        print(f"{key:<40} {value:>10} {unit}", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "size": size,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+def compare(current, baseline, threshold=0.10):
+    """
+    Compare two suite outputs by median time.
+
+    Args:
+        current: Output of run_suite
+        baseline: A previous output of run_suite
+        threshold: Allowed slowdown as a fraction (0.10 = 10%)
+
+    Returns:
+        List of (name, baseline_median, current_median, ratio) for every
+        benchmark present in both runs, and the subset that regressed
+    """
+    rows = []
+    regressions = []
+    for name, stats in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base["median"]:
+            continue
+        ratio = stats["median"] / base["median"]
+        row = (name, base["median"], stats["median"], ratio)
+        rows.append(row)
+        if ratio > 1 + threshold:
+            regressions.append(row)
+    return rows, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the performance benchmark suite.")
+    parser.add_argument("--size", type=int, default=1, help="corpus scale factor")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="corpus random seed")
+    parser.add_argument("--shapes", default=",".join(CORPORA), help="comma-separated corpus shapes")
+    parser.add_argument("--output", default="bench_output.json", help="where to write results")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--history", help="append this run to a JSON-lines history file")
+    args = parser.parse_args(argv)
+
+    shapes = [shape for shape in args.shapes.split(",") if shape]
+    unknown = [shape for shape in shapes if shape not in CORPORA]
+    if unknown:
+        parser.error(f"unknown shapes: {', '.join(unknown)}")
+
+    report = run_suite(shapes, args.size, args.repeat, args.seed)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"Wrote {args.output}")
+
+    if args.history:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(report) + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(report, baseline, args.threshold / 100)
+        for name, base, current, ratio in rows:
+            flag = "  REGRESSION" if (name, base, current, ratio) in regressions else ""
+            unit = report["results"][name].get("unit")
+            if unit is None:
+                base, current, unit = f"{base * 1000:.2f}", f"{current * 1000:.2f}", "ms"
+            print(f"{name:<40} {base:>10} -> {current:>10} {unit} {ratio:>6.2f}x{flag}")
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than {args.threshold:g}% over baseline")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,174 @@
+import json
+import os
+from collections import OrderedDict
+from rawnode import RawNode
+from manifest import hash_bytes, hash_file
+
+CACHE_VERSION = 1
+
+# Upper bound on the total size of cached HTML (in characters)
+DEFAULT_MAX_BYTES = 64 << 20
+
+# Modules whose code decides what HTML a block renders to; editing any of
+# them changes the fingerprint and discards the persisted cache
+RENDERER_MODULES = (
+    "splitter.py",
+    "inline.py",
+    "textnode.py",
+    "htmlnode.py",
+    "leafnode.py",
+    "rawnode.py",
+    "parentnode.py",
+    "urls.py",
+)
+
+def renderer_fingerprint():
+    """
+    Hash the source of the rendering modules, so a cache written by a
+    different version of the renderer is never reused.
+    """
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    digests = [hash_file(os.path.join(src_dir, name)) for name in RENDERER_MODULES]
+    return hash_bytes("".join(digests).encode("ascii"))
+
+class BlockCache:
+    """
+    Content-addressed cache from (block text, BlockType, basepath) to the
+    block's rendered HTML, shared by every page in a build and persisted
+    between builds.
+
+    Entries are kept in least-recently-used order and evicted once their
+    total size exceeds max_bytes. Hits, misses and evictions are counted for
+    the end-of-build report.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Entries created since the last take_added(), used to ship new
+        # entries from worker processes back to the parent
+        self.added = {}
+        self._entries = OrderedDict()
+        self._size = 0
+
+    @staticmethod
+    def key(block, block_type, basepath):
+        # The basepath is part of the key because link and image URLs are
+        # resolved against it while rendering
+        return hash_bytes(f"{block_type.value}\0{basepath}\0{block}".encode("utf-8"))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        html = self._entries.get(key)
+        if html is not None:
+            self._entries.move_to_end(key)
+        return html
+
+    def put(self, key, html):
+        if key in self._entries:
+            self._size -= len(key) + len(self._entries.pop(key))
+        self._entries[key] = html
+        self._size += len(key) + len(html)
+        while self._size > self.max_bytes and self._entries:
+            old_key, old_html = self._entries.popitem(last=False)
+            self._size -= len(old_key) + len(old_html)
+            self.evictions += 1
+
+    def render(self, block, basepath, render_block):
+        """
+        Return a node for the block, rendering it only on a cache miss.
+
+        Args:
+            block: Block record
+            basepath: Base path the block is rendered against
+            render_block: Function (block, basepath) -> HTMLNode
+
+        Returns:
+            A RawNode holding the block's HTML
+        """
+        key = self.key(block.text, block.block_type, basepath)
+        html = self.get(key)
+        if html is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            html = render_block(block, basepath).to_html()
+            self.put(key, html)
+            self.added[key] = html
+        return RawNode(html)
+
+    def take_added(self):
+        """
+        Return and forget the entries created since the last call.
+        """
+        added, self.added = self.added, {}
+        return added
+
+    def merge(self, entries, hits=0, misses=0):
+        """
+        Fold entries and counters gathered by another process into this cache.
+        """
+        for key, html in entries.items():
+            self.put(key, html)
+        self.hits += hits
+        self.misses += misses
+
+    @classmethod
+    def load(cls, path, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Load a persisted cache, starting empty if the file is missing,
+        corrupt or was written by a different renderer.
+        """
+        cache = cls(path, max_bytes)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cache
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != CACHE_VERSION
+            or data.get("renderer") != renderer_fingerprint()
+        ):
+            return cache
+        for key, html in data.get("entries", []):
+            cache.put(key, html)
+        # Loading is not eviction caused by this build
+        cache.evictions = 0
+        return cache
+
+    def save(self):
+        """
+        Persist the cache (oldest entry first) atomically.
+        """
+        data = {
+            "version": CACHE_VERSION,
+            "renderer": renderer_fingerprint(),
+            "entries": list(self._entries.items()),
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._size,
+        }
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0.0
+        return (
+            f"Block cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), "
+            f"{self.evictions} evictions, {len(self._entries)} entries"
+        )
\ No newline at end of file
@@ -0,0 +1,459 @@
+import os
+from contextlib import nullcontext
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from htmlnode import escape_text
+from splitter import markdown_to_html_node, extract_title, find_title, iter_markdown_html
+from manifest import BuildManifest, generator_fingerprint, hash_file, hash_text
+from blockcache import DEFAULT_MAX_BYTES, BlockCache
+from staticsync import prune_empty_dirs
+from template import default_loader, find_layout
+from fingerprint import ASSET_MANIFEST_NAME, AssetMap
+from imagesize import ImageSizes
+from search import SearchIndex, remove_search_index, update_search_index
+from pipeline import DEFAULT_READERS, generate_pages_pipelined
+from output import PageBuildError, write_atomic
+from timelimit import time_limit
+from walk import walk_tree
+import splitter
+
+MANIFEST_PATH = ".build-manifest.json"
+
+# Sources larger than this are rendered block by block straight from the
+# file instead of being read into memory whole
+STREAMING_THRESHOLD = 8 << 20
+
+# Functions timed as their own stages while profiling; they are looked up
+# through splitter's globals, so wrapping the module attribute is enough
+SPLITTER_STAGES = {
+    "markdown_to_blocks": "blocks",
+    "classify_block": "classify",
+    "text_to_textnodes": "inline",
+}
+
+def generate_page(from_path, template_path, dest_path, basepath, block_cache=None, profiler=None,
+                  previous_hash=None, search=None, images_used=None):
+    """
+    Generate an HTML page from a markdown file using a template.
+    
+    Args:
+        from_path: Path to the markdown source file
+        template_path: Path to the HTML template file
+        dest_path: Path to write the generated HTML file
+        basepath: Base path for the site (e.g., "/" or "/blog/")
+        block_cache: Optional BlockCache shared across pages
+        profiler: Optional Profiler recording the page's stage timings
+        previous_hash: Hash of the HTML the last build wrote to dest_path
+        search: Optional SearchIndex collecting the page's terms
+        images_used: Optional dict recording the URL and size of every
+            image annotated with its size
+
+    Returns:
+        (output_hash, status) as returned by write_atomic
+    """
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    if profiler is None:
+        return render_page_to_file(from_path, template_path, dest_path, basepath, block_cache,
+                                   previous_hash=previous_hash, search=search, images_used=images_used)
+    with profiler.page(from_path):
+        return render_page_to_file(from_path, template_path, dest_path, basepath, block_cache, profiler,
+                                   previous_hash, search, images_used)
+
+def _no_stage(name):
+    return nullcontext()
+
+def render_page_to_file(from_path, template_path, dest_path, basepath, block_cache=None, profiler=None,
+                        previous_hash=None, search=None, images_used=None):
+    """
+    Do the work of generate_page without logging, so it can run in a
+    worker process without interleaving output.
+    """
+    stage = profiler.stage if profiler is not None else _no_stage
+
+    if os.path.getsize(from_path) > STREAMING_THRESHOLD:
+        with stage("stream"):
+            return stream_page_to_file(
+                from_path, template_path, dest_path, basepath, block_cache, previous_hash, search, images_used
+            )
+
+    # Read the markdown file
+    with stage("read"):
+        with open(from_path, "r") as f:
+            markdown = f.read()
+
+    # Compiled once per process and reused for every page, with its
+    # root-relative URLs already resolved against the basepath
+    with stage("load_template"):
+        template = default_loader.get(template_path, basepath)
+
+    # Convert markdown to HTML; link and image URLs get the basepath as
+    # their nodes are created
+    with stage("nodes"):
+        html_node = markdown_to_html_node(markdown, basepath, block_cache)
+
+    # Extract the title
+    with stage("title"):
+        title = extract_title(markdown)
+
+    if profiler is None:
+        # Stream the filled template straight to disk
+        content = html_node.iter_html()
+        if search is not None:
+            content = search.collect(from_path, title, content)
+        page = template.iter_render({"Title": escape_text(title), "Content": content}, images_used)
+        return write_atomic(dest_path, page, previous_hash)
+
+    # Streaming interleaves rendering, substitution and writing; when
+    # profiling, materialise each step so it can be timed on its own
+    with stage("to_html"):
+        content = html_node.to_html()
+    if search is not None:
+        with stage("search"):
+            content = "".join(search.collect(from_path, title, (content,)))
+    with stage("template"):
+        page = template.render({"Title": escape_text(title), "Content": content}, images_used)
+    with stage("write"):
+        return write_atomic(dest_path, (page,), previous_hash)
+
+def stream_page_to_file(from_path, template_path, dest_path, basepath, block_cache=None, previous_hash=None,
+                        search=None, images_used=None):
+    """
+    Render a page without holding its source in memory: one pass over the
+    file finds the title, a second reads, renders and writes each block in
+    turn, so memory is bounded by the largest block.
+    """
+    template = default_loader.get(template_path, basepath)
+    with open(from_path, "r") as f:
+        title = find_title(f)
+        f.seek(0)
+        content = iter_markdown_html(f, basepath, block_cache)
+        if search is not None:
+            content = search.collect(from_path, title, content)
+        page = template.iter_render({"Title": escape_text(title), "Content": content}, images_used)
+        return write_atomic(dest_path, page, previous_hash)
+
+def iter_pages(dir_path_content, dest_dir_path):
+    """
+    Lazily crawl the content directory for markdown pages to build.
+
+    Args:
+        dir_path_content: Path to the content directory to crawl
+        dest_dir_path: Path to the destination directory for generated pages
+
+    Yields:
+        (source_path, dest_path) tuples in sorted source order, each as soon
+        as the walk reaches it
+    """
+    for entry, dest_path in walk_tree(dir_path_content, dest_dir_path, sort=True):
+        # Only process markdown files
+        if entry.name.endswith(".md") and not entry.is_dir():
+            # Change .md extension to .html
+            dest_filename = entry.name.replace(".md", ".html")
+            yield entry.path, os.path.join(os.path.dirname(dest_path), dest_filename)
+
+def remove_output(dest_path, dest_root):
+    """
+    Delete a generated file and prune any directories it leaves empty,
+    stopping at dest_root.
+    """
+    if os.path.exists(dest_path):
+        print(f"Removing stale page: {dest_path}")
+        os.remove(dest_path)
+    prune_empty_dirs(os.path.dirname(dest_path), dest_root)
+
+# Each worker process's copy of the block cache, loaded by _init_worker
+_worker_block_cache = None
+
+def _init_worker(block_cache_path, block_cache_size, asset_mapping=None, image_sizes=None):
+    global _worker_block_cache
+    default_loader.set_assets(AssetMap(asset_mapping) if asset_mapping else None)
+    default_loader.set_images(ImageSizes(image_sizes) if image_sizes is not None else None)
+    if block_cache_path is not None:
+        _worker_block_cache = BlockCache.load(block_cache_path, block_cache_size)
+
+def _generate_page_batch(batch, basepath, search=False, page_timeout=None):
+    """
+    Process-pool worker: render a batch of (source, dest, template,
+    previous output hash) pages in order, wrapping any failure (including
+    a page running past page_timeout seconds) in a PageBuildError naming
+    the source file.
+
+    Returns each page's (output_hash, status), the block cache entries and
+    counters gathered by the batch so the parent can merge them into its
+    cache, (with search) the pages' collected search terms, and the images
+    each page showed.
+    """
+    cache = _worker_block_cache
+    hits = cache.hits if cache else 0
+    misses = cache.misses if cache else 0
+    index = SearchIndex() if search else None
+    outputs = {}
+    image_refs = {}
+    for src_path, dest_path, template_path, previous_hash in batch:
+        images_used = image_refs[src_path] = {}
+        try:
+            with time_limit(page_timeout):
+                outputs[src_path] = render_page_to_file(
+                    src_path, template_path, dest_path, basepath, cache, previous_hash=previous_hash, search=index,
+                    images_used=images_used,
+                )
+        except Exception as e:
+            raise PageBuildError(src_path, f"{type(e).__name__}: {e}") from None
+    terms = index.pages if index is not None else {}
+    if cache is None:
+        return outputs, {}, 0, 0, terms, image_refs
+    return outputs, cache.take_added(), cache.hits - hits, cache.misses - misses, terms, image_refs
+
+def generate_pages_parallel(pages, basepath, jobs, block_cache=None, search=None, page_timeout=None,
+                            image_refs=None):
+    """
+    Render pages across a pool of worker processes.
+
+    Pages are split into contiguous batches to amortise inter-process
+    overhead. Every page writes only its own output file, so the result is
+    identical to a sequential build regardless of scheduling. On a failure
+    the pending batches after it are cancelled, those before it are waited
+    for, and the error for the earliest failing page (in build order) is
+    raised, whichever failed first by the clock.
+
+    Args:
+        pages: Sorted list of (source_path, dest_path, template_path,
+            previous_output_hash) tuples
+        basepath: Base path for the site (e.g., "/" or "/blog/")
+        jobs: Number of worker processes
+        block_cache: Optional BlockCache; workers start from its persisted
+            state and their new entries are merged back into it
+        search: Optional SearchIndex; the terms workers collect are merged
+            into it
+        page_timeout: Optional limit in seconds on rendering each page; a
+            page running past it fails the build like any other error, so
+            one pathological source cannot stall the workers
+        image_refs: Optional dict filled with the images each page showed,
+            by source path
+
+    Returns:
+        Dict mapping each source path to its (output_hash, status)
+
+    Raises:
+        PageBuildError: If any page fails to render
+    """
+    if not pages:
+        return {}
+    batch_size = max(1, min(32, len(pages) // (jobs * 4)))
+    batches = [pages[i:i + batch_size] for i in range(0, len(pages), batch_size)]
+
+    for src_path, dest_path, template_path, _ in pages:
+        print(f"Generating page from {src_path} to {dest_path} using {template_path}")
+
+    cache_path = block_cache.path if block_cache is not None else None
+    cache_size = block_cache.max_bytes if block_cache is not None else DEFAULT_MAX_BYTES
+    asset_mapping = default_loader.assets.mapping if default_loader.assets else None
+    image_sizes = default_loader.images.sizes if default_loader.images is not None else None
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker,
+        initargs=(cache_path, cache_size, asset_mapping, image_sizes),
+    ) as executor:
+        futures = [
+            executor.submit(_generate_page_batch, batch, basepath, search is not None, page_timeout)
+            for batch in batches
+        ]
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        failed = [i for i, future in enumerate(futures) if future in done and future.exception() is not None]
+        if failed:
+            # Batches after the first to fail cannot hold an earlier failure,
+            # but those before it must finish so their errors take precedence
+            for future in futures[failed[0] + 1:]:
+                future.cancel()
+            for future in futures[:failed[0] + 1]:
+                if future.exception() is not None:
+                    raise future.exception()
+
+    outputs = {}
+    for future in futures:
+        batch_outputs, entries, hits, misses, terms, images_used = future.result()
+        outputs.update(batch_outputs)
+        if search is not None:
+            search.pages.update(terms)
+        if image_refs is not None:
+            image_refs.update(images_used)
+        if block_cache is not None:
+            block_cache.merge(entries, hits, misses)
+    return outputs
+
+def build_pages(dir_path_content, template_path, dest_dir_path, basepath, manifest_path=MANIFEST_PATH, jobs=1,
+                block_cache=None, profiler=None, queue_depth=None, readers=DEFAULT_READERS, assets=None,
+                images=None, search=False, page_timeout=None):
+    """
+    Incrementally generate pages, rebuilding only those whose source,
+    template or basepath changed since the last build, or (with images)
+    the size of an image they show.
+
+    Each page is rendered with the nearest layout.html in its section of the
+    content tree, falling back to template_path.
+
+    Args:
+        dir_path_content: Path to the content directory to crawl
+        template_path: Path to the site-wide HTML template file
+        dest_dir_path: Path to the destination directory for generated pages
+        basepath: Base path for the site (e.g., "/" or "/blog/")
+        manifest_path: Path to the persistent build manifest
+        jobs: Number of worker processes; 1 renders in this process
+        block_cache: Optional BlockCache reused across pages; it is saved
+            (if it has a path) and its statistics printed at the end
+        profiler: Optional Profiler; pages are then rendered in this process
+            so every stage can be timed
+        queue_depth: If set (and jobs is 1), overlap reading, rendering and
+            writing in a pipeline with this many pages queued per stage
+        readers: Number of reader threads in pipeline mode
+        assets: Optional AssetMap of fingerprinted static assets; href and
+            src URLs in templates and pages are rewritten through it
+        images: Optional ImageSizes; <img> tags are then given their width,
+            height and (after a page's first image) lazy-loading attributes
+        search: Maintain a sharded search index under dest_dir_path; the
+            terms of rebuilt pages are collected as they are rendered.
+            Without it, an index left by an earlier build is removed
+        page_timeout: Optional limit in seconds on rendering each page, in
+            parallel and sequential builds; pipeline mode renders in a
+            thread, where the limit cannot be enforced
+
+    Returns:
+        Dict with the lists of "built", "skipped" and "removed" source
+        paths, and under "outputs" the lists of "added", "changed",
+        "unchanged" and "deleted" output paths
+    """
+    manifest = BuildManifest.load(manifest_path)
+    # Settings that change every page's output; fingerprinted asset names
+    # are part of them, so pages follow their assets, and so is the
+    # generator's own code, so upgrading it rebuilds every page. Image sizes
+    # are checked per page, against the images each one showed
+    settings = [basepath, generator_fingerprint()]
+    if assets is not None:
+        settings.append(assets.digest)
+    if images is not None:
+        settings.append("images")
+    basepath_hash = hash_text("\0".join(settings))
+    image_urls = images.urls(basepath, assets) if images is not None else None
+    default_loader.set_assets(assets)
+    default_loader.set_images(images)
+    template_hashes = {}
+    layouts = {}
+
+    summary = {"built": [], "skipped": [], "removed": []}
+    changes = {"added": [], "changed": [], "unchanged": [], "deleted": []}
+    index = SearchIndex() if search else None
+    # Pages missing from the search index are rendered again to collect them
+    indexed = manifest.search.get("pages", {}) if search else None
+
+    pages = []
+    inputs = {}
+    image_refs = {}
+
+    def discover():
+        # Pages are checked against the manifest as the content walk finds
+        # them, so rendering starts before a large tree is fully walked
+        for src_path, dest_path in iter_pages(dir_path_content, dest_dir_path):
+            pages.append((src_path, dest_path))
+            layout = find_layout(src_path, dir_path_content, template_path, layouts)
+            if layout not in template_hashes:
+                template_hashes[layout] = hash_file(layout)
+            src_hash = hash_file(src_path)
+            inputs[src_path] = (src_hash, template_hashes[layout])
+            if (
+                manifest.needs_build(
+                    src_path, src_hash, dest_path, template_hashes[layout], basepath_hash, image_urls
+                )
+                or (indexed is not None and src_path not in indexed)
+            ):
+                summary["built"].append(src_path)
+                yield src_path, dest_path, layout, manifest.output_hash(src_path, dest_path)
+            else:
+                summary["skipped"].append(src_path)
+
+    to_build = discover()
+    if profiler is not None and jobs > 1:
+        print("Profiling renders pages in this process; ignoring --jobs")
+        jobs = 1
+    if jobs > 1:
+        # Batches for the workers are sized by the number of pages, so the
+        # walk is finished first
+        to_build = list(to_build)
+
+    if jobs > 1 and len(to_build) > 1:
+        outputs = generate_pages_parallel(to_build, basepath, jobs, block_cache, index, page_timeout, image_refs)
+    elif queue_depth and profiler is None:
+        outputs = generate_pages_pipelined(
+            to_build, basepath, queue_depth, readers, block_cache, index, image_refs
+        )
+    else:
+        outputs = {}
+        instrument = profiler.instrument(splitter, SPLITTER_STAGES) if profiler is not None else nullcontext()
+        with instrument:
+            for src_path, dest_path, layout, previous_hash in to_build:
+                images_used = image_refs[src_path] = {}
+                try:
+                    with time_limit(page_timeout):
+                        outputs[src_path] = generate_page(
+                            src_path, layout, dest_path, basepath, block_cache, profiler, previous_hash, index,
+                            images_used,
+                        )
+                except Exception as e:
+                    raise PageBuildError(src_path, f"{type(e).__name__}: {e}") from e
+
+    # Only record pages once they have all been written, so a failed build
+    # is retried in full next time
+    for src_path, dest_path in pages:
+        src_hash, template_hash = inputs[src_path]
+        output_hash, status = outputs.get(src_path, (None, None))
+        # Rebuilt pages replace the images they showed; skipped ones keep them
+        images_used = image_refs.get(src_path, {}) if status is not None else None
+        manifest.record(src_path, src_hash, dest_path, template_hash, output_hash, images_used)
+        if status is not None:
+            changes[status].append(dest_path)
+
+    for src_path in manifest.stale_sources({src for src, _ in pages}):
+        dest_path = manifest.forget(src_path)
+        if dest_path:
+            remove_output(dest_path, dest_dir_path)
+            changes["deleted"].append(dest_path)
+        summary["removed"].append(src_path)
+
+    if index is not None:
+        collected = {src_path: (dest_path, index.pages[src_path]) for src_path, dest_path in pages
+                     if src_path in index.pages}
+        search_changes = update_search_index(manifest, collected, summary["removed"], dest_dir_path, basepath)
+        for status, paths in search_changes.items():
+            changes[status].extend(paths)
+    elif manifest.search:
+        changes["deleted"].extend(remove_search_index(manifest, dest_dir_path))
+    summary["outputs"] = changes
+
+    manifest.basepath_hash = basepath_hash
+    manifest.save()
+
+    print(
+        f"\nPages: {len(summary['built'])} built, "
+        f"{len(summary['skipped'])} skipped, "
+        f"{len(summary['removed'])} removed"
+    )
+    print(
+        f"Outputs: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+        f"{len(changes['unchanged'])} unchanged, {len(changes['deleted'])} deleted"
+    )
+    if block_cache is not None:
+        if block_cache.path:
+            block_cache.save()
+        print(block_cache.summary())
+    return summary
+
+def write_asset_manifest(dest_root, asset_map, assets):
+    """
+    Write the logical -> fingerprinted asset lookup to dest_root, so clients
+    and deploy tooling can find assets by their logical names. A new or
+    rewritten file is added to the sync_static summary.
+    """
+    path = os.path.join(dest_root, ASSET_MANIFEST_NAME)
+    previous_hash = hash_file(path) if os.path.exists(path) else None
+    _, status = write_atomic(path, (asset_map.to_json(),), previous_hash)
+    if status != "unchanged":
+        assets["copied"].append(ASSET_MANIFEST_NAME)
+    if status == "added":
+        assets["added"].append(ASSET_MANIFEST_NAME)
\ No newline at end of file
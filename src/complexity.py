@@ -0,0 +1,159 @@
+"""
+Adversarial-input complexity checks for the markdown renderer.
+
+Usage: python3 src/complexity.py [--size N] [--factor K] [--slack X]
+                                 [--fuzz N] [--seed N] [--repeat N]
+
+Untrusted markdown can aim at the slow paths of a parser: paragraphs full of
+unmatched link brackets, long runs of emphasis delimiters, lists that fail
+validation only on their last line. Each stress case generates such an input
+from a repetition count n, and every case is expected to render in time
+linear in n. The input is rendered at n (K times) and at K * n (once); the
+ratio of the two, 1.0 for linear growth and K for quadratic, must stay below
+the slack. Fuzz cases draw random inputs from small alphabets of the same
+dangerous fragments. Exit status 1 if any case grows too fast.
+"""
+import argparse
+import random
+import sys
+import timeit
+
+from splitter import markdown_to_html_node, text_to_textnodes
+
+# What each case renders: inline text alone, or a whole document
+TARGETS = {
+    "inline": text_to_textnodes,
+    "document": markdown_to_html_node,
+}
+
+def _failing_ordered_list(n):
+    return "\n".join(f"{i + 1}. item" for i in range(n)) + "\n1. item"
+
+STRESS_CASES = {
+    "open_brackets": ("inline", lambda n: "[" * n),
+    "bracket_paren_fragments": ("inline", lambda n: "](" * n),
+    "unclosed_links": ("inline", lambda n: "[a](" * n),
+    "unclosed_images": ("inline", lambda n: "![a](" * n),
+    "images_in_link_urls": ("inline", lambda n: "[a](x ![b](" * n + ")"),
+    "bangs_before_link": ("inline", lambda n: "!" * n + "[a](b)"),
+    "starred_link_text": ("inline", lambda n: "[" + "*a" * n + "](b"),
+    "underscore_run": ("inline", lambda n: "_" * n),
+    "asterisk_run": ("inline", lambda n: "*" * n),
+    "backtick_run": ("inline", lambda n: "`" * n),
+    "mixed_delimiters": ("inline", lambda n: "_a**b`c" * n),
+    "links": ("inline", lambda n: "[a](b) " * n),
+    "ordered_list_failing_last_line": ("document", _failing_ordered_list),
+    "unordered_list_failing_last_line": ("document", lambda n: "- item\n" * n + "item"),
+    "quote_failing_last_line": ("document", lambda n: "> quote\n" * n + "quote"),
+    "many_blocks": ("document", lambda n: "a\n\n" * n),
+    "whitespace_lines": ("document", lambda n: " \n" * n + "a"),
+    "heading_hashes": ("document", lambda n: "#" * n + " heading"),
+    "unclosed_fences": ("document", lambda n: "```\n" * n),
+}
+
+# Alphabets the fuzz cases draw their inputs from
+INLINE_FRAGMENTS = ("[", "]", "(", ")", "](", "![", "!", "_", "**", "*", "`", "a", " ", "[a](b)", "![a](b)")
+LINE_FRAGMENTS = ("# a", "> a", "- a", "1. a", "2. a", "```", "a", "", " ", "[a](", "_")
+
+def fuzz_cases(count, seed=0):
+    """
+    Generate random cases, each drawing its input from a random handful of
+    fragments, so that combinations the stress cases miss are tried too.
+
+    A case's input for n is a seeded sequence of n fragments, so larger
+    inputs extend smaller ones rather than being unrelated.
+
+    Returns:
+        Dict mapping case names to (target, generate) like STRESS_CASES
+    """
+    rng = random.Random(seed)
+    cases = {}
+    for i in range(count):
+        target = rng.choice(sorted(TARGETS))
+        if target == "inline":
+            alphabet, separator = INLINE_FRAGMENTS, ""
+        else:
+            alphabet, separator = LINE_FRAGMENTS, "\n"
+        fragments = rng.sample(alphabet, rng.randint(2, 4))
+        case_seed = rng.randrange(1 << 32)
+
+        def generate(n, fragments=fragments, separator=separator, case_seed=case_seed):
+            case_rng = random.Random(case_seed)
+            return separator.join(case_rng.choice(fragments) for _ in range(n))
+
+        cases[f"fuzz_{i}_{target}"] = (target, generate)
+    return cases
+
+def render_time(func, text, number=1, repeat=3):
+    """
+    Return the best time in seconds to render text number times. Inputs the
+    renderer rejects (unclosed delimiters raise ValueError) still count:
+    rejecting them must be just as fast.
+    """
+    def run():
+        for _ in range(number):
+            try:
+                func(text)
+            except ValueError:
+                pass
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+def growth(func, generate, size, factor, repeat=3):
+    """
+    Measure how much faster than linear a case's render time grows.
+
+    Args:
+        func: Function rendering an input
+        generate: Function returning the input for a repetition count
+        size: Repetition count of the small input
+        factor: How many times larger the large input is
+        repeat: Timing repetitions; the best is kept
+
+    Returns:
+        Tuple of (growth, small_seconds, large_seconds), where growth is the
+        time for the large input over factor times the time for the small
+        one: about 1 for linear cost, about factor for quadratic
+    """
+    small_time = render_time(func, generate(size), factor, repeat)
+    large_time = render_time(func, generate(size * factor), 1, repeat)
+    return large_time / small_time, small_time / factor, large_time
+
+def check_cases(cases, size, factor, slack, repeat=3):
+    """
+    Measure every case and return a list of (name, target, growth,
+    small_seconds, large_seconds, ok) rows.
+    """
+    rows = []
+    for name, (target, generate) in cases.items():
+        ratio, small_time, large_time = growth(TARGETS[target], generate, size, factor, repeat)
+        rows.append((name, target, ratio, small_time, large_time, ratio <= slack))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that adversarial markdown renders in linear time.")
+    parser.add_argument("--size", type=int, default=2000, help="repetition count of the small inputs")
+    parser.add_argument("--factor", type=int, default=8, help="how many times larger the large inputs are")
+    parser.add_argument("--slack", type=float, default=3.0, help="largest growth accepted as linear")
+    parser.add_argument("--fuzz", type=int, default=20, help="number of random cases")
+    parser.add_argument("--seed", type=int, default=0, help="fuzz random seed")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per input")
+    args = parser.parse_args()
+
+    cases = dict(STRESS_CASES)
+    cases.update(fuzz_cases(args.fuzz, args.seed))
+    rows = check_cases(cases, args.size, args.factor, args.slack, args.repeat)
+
+    print(f"{'case':<34} {'target':<9} {'n':>10} {f'{args.factor}n':>10} {'growth':>7}")
+    for name, target, ratio, small_time, large_time, ok in rows:
+        print(
+            f"{name:<34} {target:<9} {small_time * 1000:>8.2f}ms {large_time * 1000:>8.2f}ms "
+            f"{ratio:>6.2f}x{'' if ok else '  TOO SLOW'}"
+        )
+    failures = [row for row in rows if not row[-1]]
+    if failures:
+        print(f"\n{len(failures)} case(s) grew faster than linear (growth over {args.slack:g})")
+        sys.exit(1)
+    print(f"\nAll {len(rows)} cases render in linear time")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
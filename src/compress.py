@@ -0,0 +1,175 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from manifest import BuildManifest, hash_bytes
+from staticsync import prune_empty_dirs
+
+# Text formats worth precompressing; images and fonts are already compressed
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".txt", ".xml")
+
+DEFAULT_LEVEL = 9
+
+# Fraction of the original size a sidecar must save to be kept
+DEFAULT_MIN_SAVINGS = 0.1
+
+def compress_file(path, level=DEFAULT_LEVEL, min_savings=DEFAULT_MIN_SAVINGS, previous=None):
+    """
+    Bring path's .gz sidecar up to date.
+
+    The file is hashed first; if its content and the settings match the
+    previous entry and the sidecar is in the state that entry recorded,
+    nothing is compressed. Otherwise the file is gzipped (with a zero
+    header timestamp, so identical input gives identical bytes) and the
+    sidecar is written only if it saves at least min_savings of the size;
+    if not, any old sidecar is removed.
+
+    Args:
+        path: File to compress
+        level: gzip compression level (1-9)
+        min_savings: Fraction of the size the sidecar must save
+        previous: The file's entry from the last build, if any
+
+    Returns:
+        (entry, action) where entry is the state to record and action is
+        "compressed", "skipped" or "unchanged"
+    """
+    gz_path = path + ".gz"
+    with open(path, "rb") as f:
+        data = f.read()
+    settings = [level, min_savings]
+    entry = {"hash": hash_bytes(data), "settings": settings, "gz": False}
+    if (
+        previous is not None
+        and previous.get("hash") == entry["hash"]
+        and previous.get("settings") == settings
+        and previous.get("gz") == os.path.exists(gz_path)
+    ):
+        return previous, "unchanged"
+
+    compressed = gzip.compress(data, compresslevel=level, mtime=0)
+    if len(compressed) > len(data) * (1 - min_savings):
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+        return entry, "skipped"
+
+    tmp_path = gz_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(compressed)
+    stat = os.stat(path)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(tmp_path, gz_path)
+    entry["gz"] = True
+    entry["saved"] = len(data) - len(compressed)
+    return entry, "compressed"
+
+def compress_site(root, manifest_path, level=DEFAULT_LEVEL, min_savings=DEFAULT_MIN_SAVINGS, jobs=None,
+                  paths=None):
+    """
+    Write .gz sidecars next to every compressible file under root.
+
+    Files are compressed on a thread pool; zlib releases the GIL while it
+    compresses, so this scales across cores without the cost of worker
+    processes. Per-file state is kept in the build manifest so unchanged
+    files are neither recompressed nor re-evaluated, and sidecars of files
+    that no longer exist are removed.
+
+    Args:
+        root: Output directory (e.g. docs)
+        manifest_path: Path to the build manifest
+        level: gzip compression level (1-9)
+        min_savings: Fraction of a file's size its sidecar must save
+        jobs: Number of threads (default: one per CPU)
+        paths: Optional paths relative to root of the only files to bring
+            up to date (e.g. those a watch rebuild wrote or removed); the
+            rest of the tree is not walked and keeps its entries
+
+    Returns:
+        Dict with the lists of "compressed" sidecars (and the "added"
+        subset that did not exist before), source files "skipped" for too
+        little gain or "unchanged", and "removed" sidecars, all relative to
+        root
+    """
+    manifest = BuildManifest.load(manifest_path)
+    previous = manifest.compressed
+    summary = {"compressed": [], "added": [], "skipped": [], "unchanged": [], "removed": []}
+
+    if paths is None:
+        files = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                    files.append(os.path.relpath(os.path.join(dirpath, filename), root))
+        stale = sorted(set(previous) - set(files))
+        current = {}
+    else:
+        paths = set(paths)
+        files = sorted(
+            rel for rel in paths
+            if rel.endswith(COMPRESSIBLE_EXTENSIONS) and os.path.isfile(os.path.join(root, rel))
+        )
+        stale = sorted(rel for rel in paths if rel in previous and rel not in files)
+        current = {rel: entry for rel, entry in previous.items() if rel not in stale}
+    existed = {rel for rel in files if os.path.exists(os.path.join(root, rel + ".gz"))}
+
+    def work(rel_path):
+        return compress_file(os.path.join(root, rel_path), level, min_savings, previous.get(rel_path))
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        results = list(executor.map(work, files))
+
+    saved = 0
+    for rel_path, (entry, action) in zip(files, results):
+        current[rel_path] = entry
+        if action == "compressed":
+            summary["compressed"].append(rel_path + ".gz")
+            if rel_path not in existed:
+                summary["added"].append(rel_path + ".gz")
+            saved += entry["saved"]
+        else:
+            summary[action].append(rel_path)
+            if action == "skipped" and rel_path in existed:
+                summary["removed"].append(rel_path + ".gz")
+
+    for rel_path in stale:
+        gz_path = os.path.join(root, rel_path + ".gz")
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+            summary["removed"].append(rel_path + ".gz")
+        prune_empty_dirs(os.path.dirname(gz_path), root)
+
+    manifest.compressed = current
+    manifest.save()
+
+    print(
+        f"Compression: {len(summary['compressed'])} compressed ({saved / 1024:.1f} KiB saved), "
+        f"{len(summary['skipped'])} too small a gain, "
+        f"{len(summary['unchanged'])} unchanged, "
+        f"{len(summary['removed'])} removed"
+    )
+    return summary
+
+def remove_compressed(root, manifest_path):
+    """
+    Delete the .gz sidecars written by an earlier build, for a build
+    without compression.
+
+    Returns:
+        A summary shaped like compress_site's, listing the deleted sidecars
+        under "removed"
+    """
+    manifest = BuildManifest.load(manifest_path)
+    summary = {"compressed": [], "added": [], "skipped": [], "unchanged": [], "removed": []}
+    if not manifest.compressed:
+        return summary
+    for rel_path in sorted(manifest.compressed):
+        gz_path = os.path.join(root, rel_path + ".gz")
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+            summary["removed"].append(rel_path + ".gz")
+        prune_empty_dirs(os.path.dirname(gz_path), root)
+    manifest.compressed = {}
+    manifest.save()
+    if summary["removed"]:
+        print(f"Compression: {len(summary['removed'])} sidecars removed")
+    return summary
\ No newline at end of file
@@ -0,0 +1,85 @@
+import json
+import os
+import re
+from manifest import hash_text
+
+# Written to the output root, mapping logical asset paths to fingerprinted ones
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+
+# Hex digits of the content hash kept in fingerprinted file names
+HASH_LENGTH = 10
+
+# A start tag in rendered HTML; escaped text never contains a raw "<", so
+# markup shown in code blocks or prose is not matched
+TAG_PATTERN = re.compile(r"""<[A-Za-z](?:[^>"']|"[^"]*"|'[^']*')*>""")
+
+# An href or src attribute inside a start tag
+URL_ATTRIBUTE_PATTERN = re.compile(r'(\s)(href|src)="([^"]*)"')
+
+def fingerprinted_path(rel_path, digest):
+    """
+    Insert a content hash before a path's extension, e.g.
+    "images/a.png" -> "images/a.0123456789.png".
+    """
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+class AssetMap:
+    """
+    Lookup from logical asset paths (as written in templates and markdown)
+    to their fingerprinted names in the output.
+
+    Paths are relative to the output root and always use "/" separators.
+    """
+
+    def __init__(self, mapping=None):
+        self.mapping = dict(mapping or {})
+        self.digest = hash_text(json.dumps(sorted(self.mapping.items())))
+        self._urls = {}
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def urls(self, basepath="/"):
+        """
+        Return the lookup from resolved logical URLs to fingerprinted URLs
+        for a basepath, e.g. "/site/index.css" -> "/site/index.0123456789.css".
+        """
+        urls = self._urls.get(basepath)
+        if urls is None:
+            urls = {basepath + logical: basepath + hashed for logical, hashed in self.mapping.items()}
+            self._urls[basepath] = urls
+        return urls
+
+    def rewrite(self, html, basepath="/"):
+        """
+        Point every href and src attribute in html that names an asset at
+        its fingerprinted URL, keeping any query string or fragment.
+
+        URLs are matched after basepath resolution, so this runs on
+        rendered output rather than on markdown. Only attributes of real
+        tags are rewritten, never text that merely looks like one.
+        """
+        if not self.mapping or ("href" not in html and "src" not in html):
+            return html
+        urls = self.urls(basepath)
+
+        def replace(match):
+            url = match.group(3)
+            end = len(url)
+            for mark in "?#":
+                index = url.find(mark)
+                if index != -1 and index < end:
+                    end = index
+            hashed = urls.get(url[:end])
+            if hashed is None:
+                return match.group(0)
+            return f'{match.group(1)}{match.group(2)}="{hashed}{url[end:]}"'
+
+        def replace_in_tag(match):
+            return URL_ATTRIBUTE_PATTERN.sub(replace, match.group(0))
+
+        return TAG_PATTERN.sub(replace_in_tag, html)
+
+    def to_json(self):
+        return json.dumps(dict(sorted(self.mapping.items())), indent=1)
\ No newline at end of file
@@ -1,6 +1,38 @@
+import sys
 from typing import Optional, List, Dict
 
+def escape_text(text):
+    """
+    Escape a string for use as element text: only the characters that can
+    start or end markup are replaced.
+
+    Most text contains nothing to escape, so the string is first scanned
+    for the special characters (each scan is a single C-level search) and
+    returned as is if none occur. Otherwise chained str.replace calls are
+    used; str.translate falls off its fast path when a character maps to
+    several, which makes it several times slower here.
+    """
+    if "&" in text or "<" in text or ">" in text:
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text
+
+def escape_attribute(value):
+    """
+    Escape a string for use inside a double-quoted attribute value; quotes
+    are replaced as well.
+    """
+    if "&" in value or "<" in value or ">" in value or '"' in value or "'" in value:
+        return (
+            value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace('"', "&quot;").replace("'", "&#x27;")
+        )
+    return value
+
 class HTMLNode:
+    # Documents create hundreds of thousands of nodes; slots drop the
+    # per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(
         self,
         tag: Optional[str] = None,
@@ -8,18 +40,34 @@ class HTMLNode:
         children: Optional[List["HTMLNode"]] = None,
         props: Optional[Dict[str, str]] = None,
     ):
-        self.tag = tag
+        # Interned so the many nodes sharing a tag share one string
+        self.tag = sys.intern(tag) if tag is not None else None
         self.value = value
         self.children = children
         self.props = props
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        """
+        Yield the node's HTML in chunks, so callers can stream it without
+        building the whole string.
+        """
         raise NotImplementedError("to_html method must be implemented by subclasses")
 
+    def write_html(self, out):
+        """
+        Write the node's HTML to a file-like object chunk by chunk.
+        """
+        write = out.write
+        for chunk in self.iter_html():
+            write(chunk)
+
     def props_to_html(self):
         if not self.props:
             return ""
-        return " " + " ".join(f'{key}="{value}"' for key, value in self.props.items())
+        return " " + " ".join(f'{key}="{escape_attribute(value)}"' for key, value in self.props.items())
 
     def __repr__(self):
         return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
\ No newline at end of file
@@ -0,0 +1,191 @@
+import json
+import os
+import re
+import struct
+from manifest import BuildManifest, hash_file, hash_text
+
+IMAGE_EXTENSIONS = (".png", ".gif", ".jpg", ".jpeg")
+
+# An <img> opening tag; quoted attribute values may contain ">"
+IMG_TAG_PATTERN = re.compile(r"""<img\b((?:[^>"']|"[^"]*"|'[^']*')*?)(\s*/?)>""")
+SRC_PATTERN = re.compile(r'\bsrc="([^"]*)"')
+# One attribute of a tag; its value is consumed so that text inside quotes
+# (alt="width=3") is never taken for an attribute name
+ATTRIBUTE_PATTERN = re.compile(r"""\s([^\s"'=/>]+)(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'>]*))?""")
+
+# JPEG start-of-frame markers, which carry the image dimensions (DHT, JPG
+# and DAC share the range but are not frames)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def _jpeg_size(f):
+    """
+    Walk a JPEG's marker segments up to the first start-of-frame, seeking
+    past each segment instead of reading it.
+    """
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            # Standalone markers have no length
+            continue
+        header = f.read(2)
+        if len(header) < 2:
+            return None
+        (length,) = struct.unpack(">H", header)
+        if marker in _JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        if marker == 0xD9 or length < 2:
+            return None
+        f.seek(length - 2, os.SEEK_CUR)
+
+def read_image_size(path):
+    """
+    Read a PNG, GIF or JPEG's intrinsic size from its header, without
+    decoding any pixels.
+
+    Returns:
+        (width, height), or None if the file is not a recognised image
+    """
+    with open(path, "rb") as f:
+        head = f.read(26)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            if len(head) < 24:
+                return None
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            if len(head) < 10:
+                return None
+            return struct.unpack("<HH", head[6:10])
+        if head.startswith(b"\xff\xd8"):
+            return _jpeg_size(f)
+    return None
+
+def scan_image_sizes(static_dir, manifest_path):
+    """
+    Measure every image under static_dir.
+
+    Sizes are cached in the build manifest by content hash, so a file is
+    only hashed again when its size or mtime changes and only parsed again
+    when its content is new.
+
+    Args:
+        static_dir: Static asset directory
+        manifest_path: Path to the build manifest
+
+    Returns:
+        ImageSizes for the images found
+    """
+    manifest = BuildManifest.load(manifest_path)
+    previous = manifest.images
+    by_hash = {entry["hash"]: entry["size"] for entry in previous.values()}
+    current = {}
+    sizes = {}
+    for dirpath, dirnames, filenames in os.walk(static_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(path, static_dir).replace(os.sep, "/")
+            stat = os.stat(path)
+            entry = previous.get(rel_path)
+            if entry is None or entry.get("bytes") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+                digest = hash_file(path)
+                size = by_hash.get(digest)
+                if size is None:
+                    size = read_image_size(path)
+                    by_hash[digest] = size
+                entry = {"bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest, "size": size}
+            current[rel_path] = entry
+            if entry["size"]:
+                sizes[rel_path] = tuple(entry["size"])
+    manifest.images = current
+    manifest.save()
+    return ImageSizes(sizes)
+
+class ImageSizes:
+    """
+    Intrinsic sizes of the site's images, keyed by path relative to the
+    static directory ("/"-separated), used to annotate rendered <img> tags.
+    """
+
+    def __init__(self, sizes=None):
+        self.sizes = dict(sizes or {})
+        self.digest = hash_text(json.dumps(sorted(self.sizes.items())))
+        self._urls = {}
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def urls(self, basepath="/", assets=None):
+        """
+        Return the lookup from resolved image URLs to sizes for a basepath,
+        including the fingerprinted URLs of an AssetMap.
+        """
+        key = (basepath, assets.digest if assets else None)
+        urls = self._urls.get(key)
+        if urls is None:
+            urls = {basepath + rel_path: size for rel_path, size in self.sizes.items()}
+            if assets:
+                hashed = assets.urls(basepath)
+                urls.update({hashed[url]: size for url, size in list(urls.items()) if url in hashed})
+            self._urls[key] = urls
+        return urls
+
+    def annotator(self, basepath="/", assets=None, used=None):
+        """
+        Return a function that annotates the <img> tags in successive chunks
+        of one page: width and height are added where the image's size is
+        known, and every image after the page's first also gets
+        loading="lazy" and decoding="async". Attributes already present are
+        kept.
+
+        Args:
+            basepath: Base path the page's URLs are resolved against
+            assets: Optional AssetMap, so fingerprinted URLs are recognised
+            used: Optional dict in which the src URL of every image is
+                recorded with the size it was annotated with (None if
+                unknown), so the page can be rebuilt when one changes
+
+        Returns:
+            A function taking an HTML chunk and returning it annotated
+        """
+        urls = self.urls(basepath, assets)
+        seen = 0
+
+        def annotate_tag(match):
+            nonlocal seen
+            attrs, close = match.group(1), match.group(2)
+            extra = ""
+            src = SRC_PATTERN.search(attrs)
+            size = urls.get(src.group(1)) if src else None
+            if used is not None and src:
+                used[src.group(1)] = size
+            names = {name.lower() for name in ATTRIBUTE_PATTERN.findall(attrs)}
+            if size is not None and "width" not in names and "height" not in names:
+                extra += f' width="{size[0]}" height="{size[1]}"'
+            if seen:
+                if "loading" not in names:
+                    extra += ' loading="lazy"'
+                if "decoding" not in names:
+                    extra += ' decoding="async"'
+            seen += 1
+            return f"<img{attrs}{extra}{close}>"
+
+        def annotate(chunk):
+            if "<img" not in chunk:
+                return chunk
+            return IMG_TAG_PATTERN.sub(annotate_tag, chunk)
+
+        return annotate
\ No newline at end of file
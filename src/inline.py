@@ -0,0 +1,128 @@
+import re
+from textnode import TextNode, TextType
+
+# Characters inside an image or link: anything but brackets/parens and the
+# inline delimiters, which take precedence over link syntax (a "**" or "_"
+# inside a link splits it, exactly as the multi-pass splitter does)
+_LINK_ALT = r"([^\[\]_`*]*(?:\*(?!\*)[^\[\]_`*]*)*)"
+_LINK_URL = r"([^\(\)_`*]*(?:\*(?!\*)[^\(\)_`*]*)*)"
+
+# One alternation matching every inline token, so the text is scanned once
+_INLINE_TOKEN = re.compile(
+    r"\*\*|[_`]"
+    rf"|!\[{_LINK_ALT}\]\({_LINK_URL}\)"
+    rf"|(?<!!)\[{_LINK_ALT}\]\({_LINK_URL}\)"
+)
+
+_IMAGE = re.compile(rf"!\[{_LINK_ALT}\]\({_LINK_URL}\)")
+
+_DELIMITERS = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+
+def _delimiter_error(delimiter):
+    return ValueError(f"Invalid markdown syntax: closing delimiter '{delimiter}' not found")
+
+def _image_inside_link(text, match):
+    """
+    Return an image match starting inside a link's URL, if any. Images are
+    extracted before links, so such an image wins over the enclosing link.
+    """
+    end = match.end()
+    i = text.find("![", match.start(4), end)
+    while i != -1:
+        image = _IMAGE.match(text, i)
+        if image:
+            return image
+        i = text.find("![", i + 1, end)
+    return None
+
+def tokenize_inline(text):
+    """
+    Convert raw markdown text into TextNodes in a single left-to-right scan.
+
+    Nodes are emitted straight from match positions, so the cost is linear
+    in the length of the text however many links or images it contains.
+
+    Produces exactly the same nodes (and errors) as running
+    split_nodes_delimiter for "**", "_" and "`", then split_nodes_image and
+    split_nodes_link: "**" takes precedence over "_", which takes precedence
+    over "`"; the contents of a delimited span are not parsed further; images
+    and links are only recognised in plain text.
+
+    Args:
+        text: Raw inline markdown
+
+    Returns:
+        List of TextNode objects
+
+    Raises:
+        ValueError: If a delimiter is not closed
+    """
+    nodes = []
+    append = nodes.append
+    mode = TextType.TEXT
+    start = 0
+    italic_error = False
+    code_error = False
+
+    search = _INLINE_TOKEN.search
+    pos = 0
+    while True:
+        match = search(text, pos)
+        if match is None:
+            break
+        pos = match.end()
+
+        group = match.lastindex
+        if group is not None:
+            # Image (groups 1-2) or link (groups 3-4); literal unless in text
+            if mode is not TextType.TEXT:
+                continue
+            if group == 4 and "![" in match.group(4):
+                image = _image_inside_link(text, match)
+                if image is not None:
+                    match, group = image, 2
+                    pos = match.end()
+            if match.start() > start:
+                append(TextNode(text[start:match.start()], TextType.TEXT))
+            if group == 2:
+                append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+            else:
+                append(TextNode(match.group(3), TextType.LINK, match.group(4)))
+            start = match.end()
+            continue
+
+        delimiter_type = _DELIMITERS[match.group()]
+        if mode is TextType.TEXT:
+            if match.start() > start:
+                append(TextNode(text[start:match.start()], TextType.TEXT))
+            mode = delimiter_type
+            start = match.end()
+        elif mode is delimiter_type:
+            append(TextNode(text[start:match.start()], mode))
+            mode = TextType.TEXT
+            start = match.end()
+        elif mode is TextType.BOLD:
+            # "_" and "`" are literal inside bold
+            continue
+        elif mode is TextType.ITALIC:
+            if delimiter_type is TextType.CODE:
+                continue
+            # "**" ends the segment the italic span was opened in
+            italic_error = True
+            mode = TextType.BOLD
+            start = match.end()
+        else:
+            # "**" or "_" ends the segment the code span was opened in
+            code_error = True
+            mode = delimiter_type
+            start = match.end()
+
+    if mode is TextType.BOLD:
+        raise _delimiter_error("**")
+    if italic_error or mode is TextType.ITALIC:
+        raise _delimiter_error("_")
+    if code_error or mode is TextType.CODE:
+        raise _delimiter_error("`")
+    if start < len(text):
+        append(TextNode(text[start:], TextType.TEXT))
+    return nodes
\ No newline at end of file
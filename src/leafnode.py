@@ -1,7 +1,9 @@
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, escape_text
 from typing import Optional, Dict
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, value: str, props: Optional[Dict[str, str]] = None):
         super().__init__(tag=tag, value=value, children=None, props=props)
         if value is None:
@@ -12,9 +14,12 @@ class LeafNode(HTMLNode):
             raise ValueError("LeafNode must have a value")
         
         if self.tag is None:
-            return self.value
+            return escape_text(self.value)
         
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{escape_text(self.value)}</{self.tag}>"
+
+    def iter_html(self):
+        yield self.to_html()
 
     def __repr__(self):
         return f"LeafNode(tag={self.tag}, value={self.value}, props={self.props})"
\ No newline at end of file
@@ -1,122 +1,255 @@
+import argparse
+import json
 import os
 import shutil
 import sys
 from textnode import TextNode, TextType
-from splitter import markdown_to_html_node, extract_title
+from blockcache import DEFAULT_MAX_BYTES, BlockCache
+from staticsync import sync_static
+from profiling import Profiler
+from fingerprint import ASSET_MANIFEST_NAME, AssetMap
+from imagesize import scan_image_sizes
+from compress import DEFAULT_LEVEL, DEFAULT_MIN_SAVINGS, compress_site, remove_compressed
+from pipeline import DEFAULT_QUEUE_DEPTH, DEFAULT_READERS
+from output import PageBuildError
+from build import MANIFEST_PATH, build_pages, write_asset_manifest
+from watch import watch_site
 
-def copy_files_recursive(src_dir, dst_dir):
-    """
-    Recursively copy all files and subdirectories from src_dir to dst_dir.
-    First deletes all contents of dst_dir to ensure a clean copy.
-    
-    Args:
-        src_dir: Source directory path
-        dst_dir: Destination directory path
-    """
-    # Delete destination directory if it exists
-    if os.path.exists(dst_dir):
-        print(f"Deleting existing destination directory: {dst_dir}")
-        shutil.rmtree(dst_dir)
-    
-    # Create the destination directory
-    print(f"Creating destination directory: {dst_dir}")
-    os.mkdir(dst_dir)
-    
-    # Walk through source directory and copy all files and subdirectories
-    for filename in os.listdir(src_dir):
-        src_path = os.path.join(src_dir, filename)
-        dst_path = os.path.join(dst_dir, filename)
-        
-        if os.path.isfile(src_path):
-            # Copy file
-            print(f"Copying file: {src_path} -> {dst_path}")
-            shutil.copy(src_path, dst_path)
-        else:
-            # Recursively copy subdirectory
-            print(f"Copying directory: {src_path} -> {dst_path}")
-            copy_files_recursive(src_path, dst_path)
-
-def generate_page(from_path, template_path, dest_path, basepath):
+BLOCK_CACHE_PATH = ".block-cache.json"
+
+# Losslessly recompressed PNGs, keyed by the hash of the original
+IMAGE_CACHE_PATH = ".image-cache"
+PROFILE_REPORT_PATH = "build-profile.json"
+
+# Output paths added, changed and deleted by the last build, for deploying
+# only the delta
+CHANGES_PATH = "changed-files.json"
+
+def write_changes(path, dest_root, assets, outputs, compressed=None):
     """
-    Generate an HTML page from a markdown file using a template.
-    
+    Write the output files a build added, changed and deleted, as
+    "/"-separated paths relative to dest_root, so a deploy can upload only
+    the delta.
+
     Args:
-        from_path: Path to the markdown source file
-        template_path: Path to the HTML template file
-        dest_path: Path to write the generated HTML file
-        basepath: Base path for the site (e.g., "/" or "/blog/")
+        path: JSON file to write
+        dest_root: Output directory
+        assets: Summary returned by sync_static
+        outputs: The "outputs" summary returned by build_pages
+        compressed: Optional summary returned by compress_site or
+            remove_compressed
     """
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-
-    # Read the markdown file
-    with open(from_path, "r") as f:
-        markdown = f.read()
+    def relative(paths):
+        return [os.path.relpath(p, dest_root).replace(os.sep, "/") for p in paths]
 
-    # Read the template file
-    with open(template_path, "r") as f:
-        template = f.read()
+    def portable(paths):
+        return [p.replace(os.sep, "/") for p in paths]
 
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown)
-    html_content = html_node.to_html()
+    added_assets = set(assets["added"])
+    if compressed is not None:
+        added_assets.update(compressed["added"])
+        assets = {
+            "copied": assets["copied"] + compressed["compressed"],
+            "removed": assets["removed"] + compressed["removed"],
+        }
+    changes = {
+        "added": sorted(relative(outputs["added"]) + portable(added_assets)),
+        "changed": sorted(
+            relative(outputs["changed"]) + portable(p for p in assets["copied"] if p not in added_assets)
+        ),
+        "deleted": sorted(relative(outputs["deleted"]) + portable(assets["removed"])),
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(changes, f, indent=1)
+    os.replace(tmp_path, path)
+    return changes
 
-    # Extract the title
-    title = extract_title(markdown)
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the static site into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/", help='base path for the site (default: "/")')
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="number of worker processes for page generation (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--clean", action="store_true",
+        help="delete docs/ and the build manifest, then rebuild everything",
+    )
+    parser.add_argument(
+        "--checksum", action="store_true",
+        help="compare static assets by content hash instead of mtime",
+    )
+    parser.add_argument(
+        "--hardlink", action="store_true",
+        help="hardlink static assets into docs/ instead of copying them",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="after building, watch content/, static/ and template.html and rebuild what changes",
+    )
+    parser.add_argument(
+        "--no-block-cache", dest="block_cache", action="store_false",
+        help="render every block instead of reusing HTML cached by earlier builds",
+    )
+    parser.add_argument(
+        "--block-cache-size", type=int, default=DEFAULT_MAX_BYTES >> 20, metavar="MB",
+        help="maximum size of the block cache in megabytes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--profile", nargs="?", const=PROFILE_REPORT_PATH, metavar="REPORT",
+        help=f"time each build stage per page and write a JSON report (default: {PROFILE_REPORT_PATH})",
+    )
+    parser.add_argument(
+        "--profile-top", type=int, default=10, metavar="N",
+        help="number of slowest pages to report when profiling (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cprofile", metavar="FILE",
+        help="run the page build under cProfile and dump the stats to FILE (e.g. build.prof)",
+    )
+    parser.add_argument(
+        "--pipeline", nargs="?", type=int, const=DEFAULT_QUEUE_DEPTH, metavar="DEPTH",
+        help="overlap reading, rendering and writing pages, queueing up to DEPTH pages "
+             f"between stages (default depth: {DEFAULT_QUEUE_DEPTH})",
+    )
+    parser.add_argument(
+        "--readers", type=int, default=DEFAULT_READERS, metavar="N",
+        help="number of reader threads in pipeline mode (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--gzip", nargs="?", type=int, const=DEFAULT_LEVEL, metavar="LEVEL",
+        help=f"write .gz sidecars for HTML, CSS and text files in docs/ (default level: {DEFAULT_LEVEL})",
+    )
+    parser.add_argument(
+        "--gzip-min-savings", type=float, default=DEFAULT_MIN_SAVINGS, metavar="FRACTION",
+        help="only keep sidecars that save at least this fraction of the size (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--fingerprint", action="store_true",
+        help="copy static assets to content-hashed names and rewrite links to them",
+    )
+    parser.add_argument(
+        "--search", action="store_true",
+        help="write a sharded search index of the pages' text to docs/search/",
+    )
+    parser.add_argument(
+        "--optimize-images", action="store_true",
+        help=f"losslessly recompress PNG assets, caching the results in {IMAGE_CACHE_PATH}/",
+    )
+    parser.add_argument(
+        "--no-image-sizes", dest="image_sizes", action="store_false",
+        help="leave <img> tags without width, height and lazy-loading attributes",
+    )
+    parser.add_argument(
+        "--page-timeout", type=float, metavar="SECONDS",
+        help="fail the build if rendering any one page takes longer than SECONDS",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs must be zero or positive")
+    if args.pipeline is not None and args.pipeline < 1:
+        parser.error("--pipeline depth must be positive")
+    if args.gzip is not None and not 1 <= args.gzip <= 9:
+        parser.error("--gzip level must be between 1 and 9")
+    if not 0 <= args.gzip_min_savings < 1:
+        parser.error("--gzip-min-savings must be at least 0 and below 1")
+    if args.readers < 1:
+        parser.error("--readers must be positive")
+    if args.pipeline and args.jobs != 1:
+        parser.error("--pipeline renders in one process and cannot be combined with --jobs")
+    if args.page_timeout is not None and args.page_timeout <= 0:
+        parser.error("--page-timeout must be positive")
+    if args.pipeline and args.page_timeout is not None:
+        parser.error("--page-timeout cannot be enforced on --pipeline's render thread")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    return args
 
-    # Replace placeholders in template
-    full_html = template.replace("{{ Title }}", title)
-    full_html = full_html.replace("{{ Content }}", html_content)
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    basepath = args.basepath
+    print(f"Using basepath: {basepath}\n")
 
-    # Replace href and src paths with basepath
-    full_html = full_html.replace('href="/', f'href="{basepath}')
-    full_html = full_html.replace('src="/', f'src="{basepath}')
+    if args.clean:
+        # Start from scratch: wipe docs/ and forget what was built
+        for path in (MANIFEST_PATH, BLOCK_CACHE_PATH):
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.exists(IMAGE_CACHE_PATH):
+            shutil.rmtree(IMAGE_CACHE_PATH)
+        if os.path.exists("docs"):
+            print("Deleting existing destination directory: docs")
+            shutil.rmtree("docs")
 
-    # Create any necessary directories
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir:
-        os.makedirs(dest_dir, exist_ok=True)
+    # Sync changed static assets into docs without touching generated pages
+    image_cache = IMAGE_CACHE_PATH if args.optimize_images else None
+    assets = sync_static(
+        "static", "docs", MANIFEST_PATH,
+        checksum=args.checksum, hardlink=args.hardlink, fingerprint=args.fingerprint,
+        image_cache=image_cache,
+    )
+    asset_map = None
+    if args.fingerprint:
+        asset_map = AssetMap(assets["fingerprints"])
+        write_asset_manifest("docs", asset_map, assets)
+    elif os.path.exists(os.path.join("docs", ASSET_MANIFEST_NAME)):
+        os.remove(os.path.join("docs", ASSET_MANIFEST_NAME))
+        assets["removed"].append(ASSET_MANIFEST_NAME)
+    print("\nFile copy complete!\n")
 
-    # Write the output file
-    with open(dest_path, "w") as f:
-        f.write(full_html)
+    # Read image sizes from their headers, reusing those cached by hash
+    images = scan_image_sizes("static", MANIFEST_PATH) if args.image_sizes else None
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    """
-    Recursively crawl the content directory and generate an HTML page
-    for every markdown file found, preserving the directory structure.
-    
-    Args:
-        dir_path_content: Path to the content directory to crawl
-        template_path: Path to the HTML template file
-        dest_dir_path: Path to the destination directory for generated pages
-        basepath: Base path for the site (e.g., "/" or "/blog/")
-    """
-    for entry in os.listdir(dir_path_content):
-        src_path = os.path.join(dir_path_content, entry)
-        
-        if os.path.isfile(src_path):
-            # Only process markdown files
-            if entry.endswith(".md"):
-                # Change .md extension to .html
-                dest_filename = entry.replace(".md", ".html")
-                dest_path = os.path.join(dest_dir_path, dest_filename)
-                generate_page(src_path, template_path, dest_path, basepath)
-        else:
-            # Recurse into subdirectory
-            new_dest = os.path.join(dest_dir_path, entry)
-            generate_pages_recursive(src_path, template_path, new_dest, basepath)
-
-def main():
-    # Get basepath from CLI argument, default to "/"
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
-    print(f"Using basepath: {basepath}\n")
+    # Generate pages from all markdown files in content directory,
+    # skipping those whose inputs are unchanged since the last build
+    profiler = Profiler() if args.profile else None
+    cprofile = None
+    jobs = args.jobs
+    if args.cprofile:
+        import cProfile
+        cprofile = cProfile.Profile()
+        # cProfile only sees this process, so worker processes are not used
+        jobs = 1
+    try:
+        block_cache = None
+        if args.block_cache:
+            block_cache = BlockCache.load(BLOCK_CACHE_PATH, args.block_cache_size << 20)
+        if cprofile is not None:
+            cprofile.enable()
+        try:
+            pages = build_pages(
+                "content", "template.html", "docs", basepath,
+                jobs=jobs, block_cache=block_cache, profiler=profiler,
+                queue_depth=args.pipeline, readers=args.readers, assets=asset_map,
+                images=images, search=args.search, page_timeout=args.page_timeout,
+            )
+            if args.gzip is not None:
+                compressed = compress_site("docs", MANIFEST_PATH, args.gzip, args.gzip_min_savings)
+            else:
+                compressed = remove_compressed("docs", MANIFEST_PATH)
+            write_changes(CHANGES_PATH, "docs", assets, pages["outputs"], compressed)
+            print(f"Changed files written to {CHANGES_PATH}")
+        finally:
+            if cprofile is not None:
+                cprofile.disable()
+                cprofile.dump_stats(args.cprofile)
+                print(f"cProfile stats written to {args.cprofile}")
+    except PageBuildError as e:
+        print(f"Build failed: {e}", file=sys.stderr)
+        if not args.watch:
+            sys.exit(1)
 
-    # Copy static directory to docs directory
-    copy_files_recursive("static", "docs")
-    print("\nFile copy complete!\n")
+    if profiler is not None:
+        profiler.print_summary(args.profile_top)
+        profiler.write_json(args.profile, args.profile_top)
+        print(f"Profile report written to {args.profile}")
 
-    # Generate pages from all markdown files in content directory
-    generate_pages_recursive("content", "template.html", "docs", basepath)
+    if args.watch:
+        watch_site("content", "static", "template.html", "docs", basepath, MANIFEST_PATH,
+                   fingerprint=args.fingerprint, image_sizes=args.image_sizes, image_cache=image_cache,
+                   search=args.search, gzip=args.gzip, gzip_min_savings=args.gzip_min_savings,
+                   checksum=args.checksum, hardlink=args.hardlink)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 2
+
+def hash_bytes(data):
+    """
+    Return the hex digest used for every content hash in the build.
+
+    Args:
+        data: Bytes to hash
+
+    Returns:
+        Hex digest string
+    """
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path):
+    """
+    Hash a file's contents without loading it into memory in one piece.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_text(text):
+    """
+    Hash a string (e.g. the basepath) the same way file contents are hashed.
+    """
+    return hash_bytes(text.encode("utf-8"))
+
+def generator_fingerprint(src_dir=None):
+    """
+    Hash the source of every module of the generator, tests aside, so a
+    page written by a different version of any code that shapes its HTML
+    (renderer, templates, image sizes, asset rewriting, search) is rebuilt.
+
+    Args:
+        src_dir: Directory of the modules (default: this module's)
+
+    Returns:
+        Hex digest string
+    """
+    if src_dir is None:
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+    names = sorted(name for name in os.listdir(src_dir) if name.endswith(".py") and not name.startswith("test"))
+    return hash_text("".join(name + hash_file(os.path.join(src_dir, name)) for name in names))
+
+class BuildManifest:
+    """
+    Persistent record of the inputs each generated page was built from.
+
+    The manifest stores a hash of the basepath and, for every markdown
+    source, the hash of its contents, the hash of the template (layout) it
+    was rendered with, the output path it was rendered to and the hash of
+    the HTML written there, with the sizes of the images it showed when
+    image sizes were annotated. Comparing a fresh build against it tells us
+    which pages can be skipped and which outputs belong to deleted sources.
+    It also lists the static assets last synced into the output directory,
+    so stale assets can be removed without touching generated pages, the
+    files precompressed into .gz sidecars, the measured sizes of static
+    images and the terms of every page in the search index.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.basepath_hash = None
+        self.pages = {}
+        self.assets = {}
+        self.compressed = {}
+        self.images = {}
+        self.search = {}
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a manifest from disk, returning an empty one if the file is
+        missing, unreadable or written by an incompatible version.
+        """
+        manifest = cls(path)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return manifest
+
+        manifest.basepath_hash = data.get("basepath")
+        manifest.pages = dict(data.get("pages", {}))
+        manifest.assets = dict(data.get("assets", {}))
+        manifest.compressed = dict(data.get("compressed", {}))
+        manifest.images = dict(data.get("images", {}))
+        manifest.search = dict(data.get("search", {}))
+        return manifest
+
+    def save(self):
+        """
+        Write the manifest atomically so an interrupted build never leaves a
+        truncated file behind.
+        """
+        data = {
+            "version": MANIFEST_VERSION,
+            "basepath": self.basepath_hash,
+            "pages": dict(sorted(self.pages.items())),
+            "assets": dict(sorted(self.assets.items())),
+            "compressed": dict(sorted(self.compressed.items())),
+            "images": dict(sorted(self.images.items())),
+            "search": self.search,
+        }
+        manifest_dir = os.path.dirname(self.path)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def needs_build(self, src_path, src_hash, dest_path, template_hash, basepath_hash, image_urls=None):
+        """
+        Decide whether a page must be regenerated.
+
+        Args:
+            src_path: Path to the markdown source
+            src_hash: Hash of the source's current contents
+            dest_path: Path the page will be written to
+            template_hash: Hash of the template the page will be rendered with
+            basepath_hash: Hash of the current basepath
+            image_urls: Optional lookup from image URLs to their current
+                sizes, when images are annotated with them
+
+        Returns:
+            True if any input changed (including the size of an image the
+            page shows) or the output is missing
+        """
+        if basepath_hash != self.basepath_hash:
+            return True
+        entry = self.pages.get(src_path)
+        if entry is None:
+            return True
+        if entry.get("hash") != src_hash or entry.get("dest") != dest_path:
+            return True
+        if entry.get("template") != template_hash:
+            return True
+        if image_urls is not None:
+            for url, size in entry.get("images", {}).items():
+                current = image_urls.get(url)
+                if (list(current) if current else None) != size:
+                    return True
+        return not os.path.exists(dest_path)
+
+    def record(self, src_path, src_hash, dest_path, template_hash, output_hash=None, images=None):
+        """
+        Store a page's inputs; without an output_hash, the output hash from
+        the previous build of the same output is kept, and likewise the
+        images it shows without images (a dict from image URLs to the sizes
+        the page was annotated with).
+        """
+        entry = {"hash": src_hash, "dest": dest_path, "template": template_hash}
+        previous = self.pages.get(src_path)
+        if previous is not None and previous.get("dest") != dest_path:
+            previous = None
+        if output_hash is None and previous is not None:
+            output_hash = previous.get("output")
+        if output_hash is not None:
+            entry["output"] = output_hash
+        if images is None and previous is not None:
+            images = previous.get("images")
+        if images:
+            entry["images"] = {url: list(size) if size else None for url, size in sorted(images.items())}
+        self.pages[src_path] = entry
+
+    def output_hash(self, src_path, dest_path):
+        """
+        Return the hash of the HTML last written to dest_path for src_path,
+        or None if it is not known.
+        """
+        entry = self.pages.get(src_path)
+        if entry is None or entry.get("dest") != dest_path:
+            return None
+        return entry.get("output")
+
+    def forget(self, src_path):
+        """
+        Drop a source from the manifest and return the output it produced.
+        """
+        entry = self.pages.pop(src_path, None)
+        return entry.get("dest") if entry else None
+
+    def stale_sources(self, current_sources):
+        """
+        Return manifest entries whose sources no longer exist in the tree.
+        """
+        return sorted(src for src in self.pages if src not in current_sources)
\ No newline at end of file
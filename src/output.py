@@ -0,0 +1,59 @@
+import hashlib
+import os
+
+class PageBuildError(Exception):
+    """
+    Raised when a single page fails to build, naming the offending source.
+    """
+
+    def __init__(self, source, message):
+        super().__init__(source, message)
+        self.source = source
+        self.message = message
+
+    def __str__(self):
+        return f"{self.source}: {self.message}"
+
+def write_atomic(dest_path, chunks, previous_hash=None):
+    """
+    Write chunks to dest_path through a buffered temporary file that is
+    renamed into place, so a failed render never leaves a partial page.
+
+    The output is hashed as it is written. If it matches previous_hash (the
+    hash of what the last build wrote there) and the file still exists, the
+    temporary file is discarded and the existing file, with its mtime, is
+    left alone.
+
+    Args:
+        dest_path: File to write
+        chunks: Iterable of strings, written as UTF-8
+        previous_hash: Optional hash of the file's current contents
+
+    Returns:
+        (output_hash, status) where status is "added", "changed" or
+        "unchanged"
+    """
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+    tmp_path = dest_path + ".tmp"
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, "wb") as f:
+            write = f.write
+            update = digest.update
+            for chunk in chunks:
+                data = chunk.encode("utf-8")
+                update(data)
+                write(data)
+        output_hash = digest.hexdigest()
+        existed = os.path.exists(dest_path)
+        if existed and output_hash == previous_hash:
+            os.remove(tmp_path)
+            return output_hash, "unchanged"
+        os.replace(tmp_path, dest_path)
+        return output_hash, "changed" if existed else "added"
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
\ No newline at end of file
@@ -2,6 +2,8 @@ from htmlnode import HTMLNode
 from typing import List, Optional, Dict
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, children: List[HTMLNode], props: Optional[Dict[str, str]] = None):
         if tag is None:
             raise ValueError("ParentNode must have a tag")
@@ -9,14 +11,37 @@ class ParentNode(HTMLNode):
             raise ValueError("ParentNode must have children")
         super().__init__(tag=tag, value=None, children=children, props=props)
 
-    def to_html(self):
+    def iter_html(self):
+        """
+        Yield the opening tag, each descendant's chunks and the closing tag.
+
+        The tree is walked with an explicit stack of (children iterator,
+        closing tag) pairs instead of recursing, so rendering costs no
+        Python frame per nested element and deep trees never reach the
+        recursion limit. Only the stack is held, so memory grows with tree
+        depth rather than output size.
+        """
+        self._check()
+        yield f"<{self.tag}{self.props_to_html()}>"
+        stack = [(iter(self.children), f"</{self.tag}>")]
+        while stack:
+            children, closing = stack[-1]
+            for child in children:
+                if isinstance(child, ParentNode):
+                    child._check()
+                    yield f"<{child.tag}{child.props_to_html()}>"
+                    stack.append((iter(child.children), f"</{child.tag}>"))
+                    break
+                yield child.to_html()
+            else:
+                stack.pop()
+                yield closing
+
+    def _check(self):
         if self.tag is None:
             raise ValueError("ParentNode must have a tag")
         if self.children is None:
             raise ValueError("ParentNode must have children")
-        
-        children_html = "".join(child.to_html() for child in self.children)
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
 
     def __repr__(self):
         return f"ParentNode(tag={self.tag}, children={self.children}, props={self.props})"
\ No newline at end of file
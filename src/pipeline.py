@@ -0,0 +1,122 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from splitter import markdown_to_html_node, extract_title
+from htmlnode import escape_text
+from template import default_loader
+from output import PageBuildError, write_atomic
+
+# Pages read ahead of the renderer, and rendered pages waiting to be written
+DEFAULT_QUEUE_DEPTH = 8
+
+# Threads reading sources; reads mostly wait on the disk, so several can be
+# in flight even though only one thread renders
+DEFAULT_READERS = 4
+
+def read_source(path):
+    with open(path, "r") as f:
+        return f.read()
+
+def render_page(markdown, template_path, basepath, block_cache=None, search=None, src_path=None, images_used=None):
+    """
+    Render a page's markdown into its template.
+
+    Returns:
+        The complete page as a string
+    """
+    template = default_loader.get(template_path, basepath)
+    html_node = markdown_to_html_node(markdown, basepath, block_cache)
+    title = extract_title(markdown)
+    content = html_node.to_html()
+    if search is not None:
+        content = search.collect(src_path, title, (content,))
+    return template.render({"Title": escape_text(title), "Content": content}, images_used)
+
+def generate_pages_pipelined(pages, basepath, queue_depth=DEFAULT_QUEUE_DEPTH, readers=DEFAULT_READERS,
+                             block_cache=None, search=None, image_refs=None):
+    """
+    Render pages in three overlapping stages: reader threads prefetch
+    sources, this thread renders, and a writer thread flushes finished
+    pages to disk while the next ones are parsed.
+
+    Both hand-offs are bounded by queue_depth. Reads are only scheduled
+    while fewer than queue_depth are pending, and the renderer waits for
+    the oldest write once queue_depth pages are waiting to be written, so
+    memory stays bounded however far one stage falls behind.
+
+    Pages are rendered in the order given and the first failure (in that
+    order) is raised after cancelling the reads not yet started.
+
+    Args:
+        pages: Sorted iterable of (source_path, dest_path, template_path,
+            previous_output_hash) tuples, consumed only as pages are read,
+            so it may still be discovering pages
+        basepath: Base path for the site (e.g., "/" or "/blog/")
+        queue_depth: Maximum pages read ahead, and waiting to be written
+        readers: Number of reader threads
+        block_cache: Optional BlockCache, only used from this thread
+        search: Optional SearchIndex collecting the pages' terms
+        image_refs: Optional dict filled with the images each page showed,
+            by source path
+
+    Returns:
+        Dict mapping each source path to its (output_hash, status)
+
+    Raises:
+        PageBuildError: If any page fails to read, render or write
+    """
+
+    def write_page(src_path, dest_path, html, previous_hash):
+        try:
+            return src_path, write_atomic(dest_path, (html,), previous_hash)
+        except Exception as e:
+            raise PageBuildError(src_path, f"{type(e).__name__}: {e}") from e
+
+    queue_depth = max(1, queue_depth)
+    todo = iter(pages)
+    reads = deque()
+    writes = deque()
+    outputs = {}
+
+    def finish_write():
+        src_path, result = writes.popleft().result()
+        outputs[src_path] = result
+
+    with ThreadPoolExecutor(max_workers=max(1, readers), thread_name_prefix="reader") as read_pool, \
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="writer") as write_pool:
+
+        def schedule_reads():
+            while len(reads) < queue_depth:
+                page = next(todo, None)
+                if page is None:
+                    return
+                reads.append((page, read_pool.submit(read_source, page[0])))
+
+        try:
+            schedule_reads()
+            while reads:
+                (src_path, dest_path, template_path, previous_hash), future = reads.popleft()
+                try:
+                    markdown = future.result()
+                except Exception as e:
+                    raise PageBuildError(src_path, f"{type(e).__name__}: {e}") from e
+                schedule_reads()
+
+                print(f"Generating page from {src_path} to {dest_path} using {template_path}")
+                try:
+                    images_used = image_refs.setdefault(src_path, {}) if image_refs is not None else None
+                    html = render_page(markdown, template_path, basepath, block_cache, search, src_path, images_used)
+                except Exception as e:
+                    raise PageBuildError(src_path, f"{type(e).__name__}: {e}") from e
+
+                # Backpressure: let the writer catch up before queueing more
+                while len(writes) >= queue_depth:
+                    finish_write()
+                writes.append(write_pool.submit(write_page, src_path, dest_path, html, previous_hash))
+
+            while writes:
+                finish_write()
+        except BaseException:
+            for _, future in reads:
+                future.cancel()
+            raise
+    return outputs
\ No newline at end of file
@@ -0,0 +1,272 @@
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Ancillary chunks that change how the image is displayed; every other
+# ancillary chunk (text, timestamps, physical size, ...) is dropped
+KEPT_ANCILLARY = frozenset({b"tRNS", b"gAMA", b"cHRM", b"sRGB", b"iCCP", b"cICP"})
+
+# Samples per pixel for each PNG colour type
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# zlib strategies tried on the best filtering
+STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+
+# Cost of a filtered byte for adaptive filter selection: its distance
+# from zero as a signed value (the "minimum sum of absolute differences"
+# heuristic from the PNG specification)
+_COST = bytes(min(v, 256 - v) for v in range(256))
+
+def read_chunks(data):
+    """
+    Split a PNG file into its chunks, checking every CRC.
+
+    Returns:
+        List of (type, body) pairs, ending with IEND
+
+    Raises:
+        ValueError: If data is not a well-formed PNG file
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG file")
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos + 12 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        end = pos + 8 + length
+        if end + 4 > len(data):
+            raise ValueError(f"truncated {chunk_type!r} chunk")
+        body = data[pos + 8:end]
+        if zlib.crc32(chunk_type + body) != struct.unpack(">I", data[end:end + 4])[0]:
+            raise ValueError(f"bad CRC in {chunk_type!r} chunk")
+        chunks.append((chunk_type, body))
+        pos = end + 4
+        if chunk_type == b"IEND":
+            return chunks
+    raise ValueError("missing IEND chunk")
+
+def write_chunk(chunk_type, body):
+    return struct.pack(">I", len(body)) + chunk_type + body + struct.pack(">I", zlib.crc32(chunk_type + body))
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+def unfilter(data, height, stride, bpp):
+    """
+    Undo the per-row filters of non-interlaced image data.
+
+    Args:
+        data: Decompressed IDAT contents: each row is a filter type byte
+            followed by stride bytes
+        height: Number of rows
+        stride: Bytes per row, excluding the filter type byte
+        bpp: Bytes per complete pixel (at least 1)
+
+    Returns:
+        List of the raw rows as bytes
+    """
+    if len(data) != height * (stride + 1):
+        raise ValueError("image data does not match the header")
+    rows = []
+    prev = bytes(stride)
+    for pos in range(0, len(data), stride + 1):
+        filter_type = data[pos]
+        row = bytearray(data[pos + 1:pos + 1 + stride])
+        if filter_type == 1:
+            for i in range(bpp, stride):
+                row[i] = (row[i] + row[i - bpp]) & 255
+        elif filter_type == 2:
+            row = bytearray((x + b) & 255 for x, b in zip(row, prev))
+        elif filter_type == 3:
+            for i in range(stride):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + prev[i]) >> 1)) & 255
+        elif filter_type == 4:
+            for i in range(stride):
+                if i >= bpp:
+                    row[i] = (row[i] + _paeth(row[i - bpp], prev[i], prev[i - bpp])) & 255
+                else:
+                    row[i] = (row[i] + prev[i]) & 255
+        elif filter_type != 0:
+            raise ValueError(f"unknown filter type {filter_type}")
+        prev = bytes(row)
+        rows.append(prev)
+    return rows
+
+def filter_row(filter_type, row, prev, bpp):
+    """
+    Apply one PNG filter to a raw row, given the raw row above it.
+    """
+    if filter_type == 0:
+        return row
+    left = bytes(bpp) + row[:-bpp]
+    if filter_type == 1:
+        return bytes((x - a) & 255 for x, a in zip(row, left))
+    if filter_type == 2:
+        return bytes((x - b) & 255 for x, b in zip(row, prev))
+    if filter_type == 3:
+        return bytes((x - ((a + b) >> 1)) & 255 for x, a, b in zip(row, left, prev))
+    up_left = bytes(bpp) + prev[:-bpp]
+    return bytes((x - _paeth(a, b, c)) & 255 for x, a, b, c in zip(row, left, prev, up_left))
+
+def filter_rows(rows, bpp, adaptive):
+    """
+    Filter raw rows into an IDAT stream, either with no filtering or by
+    picking, for each row, the filter whose output is cheapest.
+    """
+    out = bytearray()
+    prev = bytes(len(rows[0])) if rows else b""
+    for row in rows:
+        if not adaptive:
+            out.append(0)
+            out += row
+            continue
+        best_type, best, best_cost = 0, row, None
+        for filter_type in range(5):
+            filtered = filter_row(filter_type, row, prev, bpp)
+            cost = sum(filtered.translate(_COST))
+            if best_cost is None or cost < best_cost:
+                best_type, best, best_cost = filter_type, filtered, cost
+        out.append(best_type)
+        out += best
+        prev = row
+    return bytes(out)
+
+def _deflate(data, strategy):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(data) + compressor.flush()
+
+def optimize_png(data):
+    """
+    Losslessly recompress a PNG file.
+
+    Ancillary chunks that do not affect display are dropped, and the image
+    data is re-deflated at the highest zlib level for each of several
+    filterings (the original, none, and adaptive per-row selection) and
+    zlib strategies, keeping the smallest. Interlaced images keep their
+    original filtering. Animated PNGs are left alone.
+
+    Args:
+        data: Contents of a PNG file
+
+    Returns:
+        The recompressed file, or None if it would not be smaller
+
+    Raises:
+        ValueError: If data is not a well-formed PNG file
+    """
+    chunks = read_chunks(data)
+    if chunks[0][0] != b"IHDR" or any(chunk_type == b"acTL" for chunk_type, _ in chunks):
+        return None
+    width, height, depth, colour_type, _, _, interlace = struct.unpack(">IIBBBBB", chunks[0][1])
+    if colour_type not in CHANNELS:
+        raise ValueError(f"unknown colour type {colour_type}")
+    filtered = zlib.decompress(b"".join(body for chunk_type, body in chunks if chunk_type == b"IDAT"))
+
+    candidates = [filtered]
+    if not interlace:
+        bits = CHANNELS[colour_type] * depth
+        rows = unfilter(filtered, height, (width * bits + 7) // 8, max(1, bits // 8))
+        candidates.append(filter_rows(rows, max(1, bits // 8), adaptive=False))
+        # The specification recommends no filtering for palette and
+        # sub-byte images, where adaptive selection rarely pays off
+        if colour_type != 3 and depth >= 8:
+            candidates.append(filter_rows(rows, bits // 8, adaptive=True))
+    # Filterings are compared with the default strategy, then the other
+    # strategies are only tried on the winner
+    idat, best = min(
+        ((_deflate(candidate, STRATEGIES[0]), candidate) for candidate in candidates), key=lambda c: len(c[0])
+    )
+    idat = min([idat] + [_deflate(best, strategy) for strategy in STRATEGIES[1:]], key=len)
+
+    out = [PNG_SIGNATURE]
+    for chunk_type, body in chunks:
+        if chunk_type == b"IDAT":
+            if idat is not None:
+                out.append(write_chunk(b"IDAT", idat))
+                idat = None
+        elif chunk_type[0] & 0x20 == 0 or chunk_type in KEPT_ANCILLARY:
+            # Critical chunks have an upper-case first letter
+            out.append(write_chunk(chunk_type, body))
+    result = b"".join(out)
+    return result if len(result) < len(data) else None
+
+def _optimize_file(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        return len(data), optimize_png(data)
+    except (ValueError, zlib.error):
+        return len(data), None
+
+def optimize_pngs(images, cache_dir, jobs=None):
+    """
+    Recompress PNG files, once per unique content.
+
+    Results are cached in cache_dir by the hash of the input: an optimized
+    file is stored as <hash>.png, and an empty <hash>.keep marks an image
+    that could not be made smaller. Images not cached yet are optimized
+    across worker processes; cache entries for hashes no longer in images
+    are removed.
+
+    Args:
+        images: Dict mapping each image's content hash to its path
+        cache_dir: Directory holding the cached results
+        jobs: Number of worker processes (default: one per CPU)
+
+    Returns:
+        Dict mapping each hash to the path of its optimized file, or None
+        where the original should be used
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    results = {}
+    pending = []
+    for digest, path in sorted(images.items()):
+        cached = os.path.join(cache_dir, digest + ".png")
+        if os.path.exists(cached):
+            results[digest] = cached
+        elif os.path.exists(os.path.join(cache_dir, digest + ".keep")):
+            results[digest] = None
+        else:
+            pending.append((digest, path))
+
+    paths = [path for _, path in pending]
+    if len(pending) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+            optimized = list(executor.map(_optimize_file, paths))
+    else:
+        optimized = [_optimize_file(path) for path in paths]
+
+    saved = 0
+    for (digest, path), (size, data) in zip(pending, optimized):
+        if data is None:
+            open(os.path.join(cache_dir, digest + ".keep"), "wb").close()
+            results[digest] = None
+            continue
+        cached = os.path.join(cache_dir, digest + ".png")
+        tmp_path = cached + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, cached)
+        results[digest] = cached
+        saved += size - len(data)
+
+    for filename in os.listdir(cache_dir):
+        digest, _ = os.path.splitext(filename)
+        if digest not in images:
+            os.remove(os.path.join(cache_dir, filename))
+
+    smaller = sum(1 for digest, _ in pending if results[digest] is not None)
+    print(
+        f"Images: {smaller} optimized ({saved / 1024:.1f} KiB saved), "
+        f"{len(pending) - smaller} kept as is, "
+        f"{len(images) - len(pending)} cached"
+    )
+    return results
\ No newline at end of file
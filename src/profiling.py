@@ -0,0 +1,147 @@
+import functools
+import json
+import time
+from contextlib import contextmanager
+
+class Profiler:
+    """
+    Collects wall time and call counts per build stage, per page and in
+    total.
+
+    Stages nest: time spent in an inner stage (such as inline parsing inside
+    node building) is charged to the inner stage only, so the stage times of
+    a page add up to the page's total.
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.pages = {}
+        self.started = time.perf_counter()
+        self._stack = []
+        self._page = None
+
+    def _enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self):
+        name, start, child_time = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        self._record(self.totals, name, elapsed - child_time)
+        if self._page is not None:
+            self._record(self._page["stages"], name, elapsed - child_time)
+
+    @staticmethod
+    def _record(table, name, seconds):
+        entry = table.get(name)
+        if entry is None:
+            table[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    @contextmanager
+    def stage(self, name):
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    @contextmanager
+    def page(self, src_path):
+        """
+        Attribute every stage entered inside the block to src_path.
+        """
+        previous = self._page
+        self._page = {"stages": {}}
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._page["total"] = time.perf_counter() - start
+            self.pages[src_path] = self._page
+            self._page = previous
+
+    def timed(self, name, func):
+        """
+        Wrap func so every call is recorded as the given stage.
+        """
+        enter = self._enter
+        exit_ = self._exit
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                exit_()
+        return wrapper
+
+    @contextmanager
+    def instrument(self, module, stages):
+        """
+        Temporarily replace module-level functions with timed wrappers.
+
+        Args:
+            module: Module whose functions are looked up by global name
+                (e.g. splitter, where markdown_to_html_node calls
+                markdown_to_blocks)
+            stages: Dict mapping function names to stage names
+        """
+        originals = {name: getattr(module, name) for name in stages}
+        for name, stage in stages.items():
+            setattr(module, name, self.timed(stage, originals[name]))
+        try:
+            yield
+        finally:
+            for name, func in originals.items():
+                setattr(module, name, func)
+
+    def report(self, top=10):
+        """
+        Build the JSON-serialisable report.
+
+        Args:
+            top: Number of slowest pages to include
+
+        Returns:
+            Dict with the total wall time, per-stage totals and the slowest pages
+        """
+        def stage_table(table):
+            return {
+                name: {"seconds": round(seconds, 6), "calls": calls}
+                for name, (seconds, calls) in sorted(table.items(), key=lambda item: -item[1][0])
+            }
+
+        slowest = sorted(self.pages.items(), key=lambda item: -item[1]["total"])[:top]
+        return {
+            "wall_seconds": round(time.perf_counter() - self.started, 6),
+            "pages": len(self.pages),
+            "stages": stage_table(self.totals),
+            "slowest_pages": [
+                {"page": page, "seconds": round(data["total"], 6), "stages": stage_table(data["stages"])}
+                for page, data in slowest
+            ],
+        }
+
+    def write_json(self, path, top=10):
+        with open(path, "w") as f:
+            json.dump(self.report(top), f, indent=1)
+
+    def print_summary(self, top=10):
+        report = self.report(top)
+        staged = sum(stage["seconds"] for stage in report["stages"].values()) or 1.0
+        print(f"\nProfile: {report['pages']} pages in {report['wall_seconds'] * 1000:.1f} ms")
+        print(f"{'stage':<12} {'ms':>10} {'calls':>10} {'share':>7}")
+        for name, stage in report["stages"].items():
+            print(
+                f"{name:<12} {stage['seconds'] * 1000:>10.2f} {stage['calls']:>10} "
+                f"{stage['seconds'] / staged * 100:>6.1f}%"
+            )
+        if report["slowest_pages"]:
+            print(f"\nSlowest {len(report['slowest_pages'])} pages:")
+            for entry in report["slowest_pages"]:
+                print(f"{entry['seconds'] * 1000:>10.2f} ms  {entry['page']}")
\ No newline at end of file
@@ -0,0 +1,22 @@
+from htmlnode import HTMLNode
+
+class RawNode(HTMLNode):
+    """
+    A fragment of HTML that is already rendered (such as a block from the
+    block cache) and is emitted exactly as given, without escaping.
+    """
+    __slots__ = ()
+
+    def __init__(self, html: str):
+        super().__init__(tag=None, value=html, children=None, props=None)
+        if html is None:
+            raise ValueError("RawNode must have HTML")
+
+    def to_html(self):
+        return self.value
+
+    def iter_html(self):
+        yield self.value
+
+    def __repr__(self):
+        return f"RawNode(html={self.value!r})"
\ No newline at end of file
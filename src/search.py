@@ -0,0 +1,186 @@
+import html
+import json
+import os
+import re
+from collections import Counter
+from output import write_atomic
+from staticsync import prune_empty_dirs
+
+# Written under the output root: index.json holds the page list
+# ({"docs": [[url, title], ...], "shards": [key, ...]}, where a page's id is
+# its position), and each shard <key>.json maps the terms starting with
+# that key to [[page id, count], ...]
+SEARCH_DIR = "search"
+SEARCH_INDEX_NAME = "index.json"
+SEARCH_VERSION = 1
+
+# Terms are sharded by their first characters
+PREFIX_LENGTH = 2
+
+TAG_PATTERN = re.compile(r"<[^>]*>")
+
+# Words of at least two letters or digits; shorter terms match too much of
+# the index to be worth shipping
+WORD_PATTERN = re.compile(r"[^\W_]{2,}")
+
+def tokenize(text):
+    """
+    Split plain text into lower-cased search terms.
+    """
+    return WORD_PATTERN.findall(text.lower())
+
+def html_terms(chunk):
+    """
+    Return the search terms in the text of an HTML chunk; tags (and so
+    attribute values) are skipped.
+    """
+    if "<" in chunk:
+        chunk = TAG_PATTERN.sub(" ", chunk)
+    if "&" in chunk:
+        chunk = html.unescape(chunk)
+    return tokenize(chunk)
+
+def shard_key(term):
+    """
+    Return the name of the shard holding term: its first PREFIX_LENGTH
+    characters, hex-encoded when they are not plain ASCII letters or
+    digits, so every key is a safe file name.
+    """
+    prefix = term[:PREFIX_LENGTH]
+    if prefix.isascii() and prefix.isalnum():
+        return prefix
+    return "x" + prefix.encode("utf-8").hex()
+
+def page_url(dest_path, dest_root, basepath):
+    """
+    Return the URL a generated page is served at, e.g.
+    docs/blog/tom/index.html -> /blog/tom/.
+    """
+    rel_path = os.path.relpath(dest_path, dest_root).replace(os.sep, "/")
+    if rel_path == "index.html":
+        return basepath
+    if rel_path.endswith("/index.html"):
+        return basepath + rel_path[:-len("index.html")]
+    return basepath + rel_path
+
+class SearchIndex:
+    """
+    Collects the search terms of pages as they are rendered.
+
+    Renderers pass each page's content chunks through collect(), which
+    counts the terms in their text on the way to the template, so pages
+    are tokenized without being parsed or rendered a second time.
+    """
+
+    def __init__(self):
+        self.pages = {}
+
+    def collect(self, src_path, title, chunks):
+        """
+        Yield the HTML chunks of a page's content unchanged, recording the
+        page's title and term counts once they have all been consumed.
+        """
+        counts = Counter(tokenize(title))
+        for chunk in chunks:
+            counts.update(html_terms(chunk))
+            yield chunk
+        self.pages[src_path] = {"title": title, "terms": dict(sorted(counts.items()))}
+
+def update_search_index(manifest, collected, removed, dest_root, basepath):
+    """
+    Bring the sharded index under dest_root/search up to date.
+
+    Each page's title, URL and term counts are kept in the build manifest,
+    so only pages rendered in this build need collected terms. Only the
+    shards holding a term whose postings changed are rewritten; shards left
+    without terms are deleted. Pages keep their numeric ids across builds
+    and the ids of removed pages are reused.
+
+    Args:
+        manifest: BuildManifest of the build; its "search" section is
+            updated but not saved
+        collected: Dict mapping source paths to (dest_path, page) for the
+            pages rendered, with page as recorded by SearchIndex
+        removed: Source paths whose pages no longer exist
+        dest_root: Output directory
+        basepath: Base path for the site
+
+    Returns:
+        Dict with the lists of search files "added", "changed" and
+        "deleted", as paths under dest_root
+    """
+    state = manifest.search
+    pages = state.setdefault("pages", {})
+    shard_hashes = state.setdefault("shards", {})
+    changes = {"added": [], "changed": [], "deleted": []}
+    affected = set()
+
+    for src_path in removed:
+        entry = pages.pop(src_path, None)
+        if entry is not None:
+            affected.update(shard_key(term) for term in entry["terms"])
+
+    used = {entry["id"] for entry in pages.values()}
+    free_ids = (i for i in range(len(pages) + len(collected) + 1) if i not in used)
+    for src_path, (dest_path, page) in sorted(collected.items()):
+        old = pages.get(src_path)
+        old_terms = old["terms"] if old is not None else {}
+        terms = page["terms"]
+        affected.update(
+            shard_key(term) for term in old_terms.keys() | terms.keys() if old_terms.get(term) != terms.get(term)
+        )
+        pages[src_path] = {
+            "id": old["id"] if old is not None else next(free_ids),
+            "url": page_url(dest_path, dest_root, basepath),
+            "title": page["title"],
+            "terms": terms,
+        }
+
+    search_dir = os.path.join(dest_root, SEARCH_DIR)
+
+    def write(path, data, previous_hash):
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        output_hash, status = write_atomic(path, (text,), previous_hash)
+        if status != "unchanged":
+            changes[status].append(path)
+        return output_hash
+
+    if affected:
+        postings = {}
+        for entry in pages.values():
+            for term, count in entry["terms"].items():
+                key = shard_key(term)
+                if key in affected:
+                    postings.setdefault(key, {}).setdefault(term, []).append([entry["id"], count])
+        for key in sorted(affected):
+            path = os.path.join(search_dir, key + ".json")
+            if key in postings:
+                shard = {term: sorted(posting) for term, posting in sorted(postings[key].items())}
+                shard_hashes[key] = write(path, shard, shard_hashes.get(key))
+            elif shard_hashes.pop(key, None) is not None and os.path.exists(path):
+                os.remove(path)
+                changes["deleted"].append(path)
+
+    docs = [None] * (max((entry["id"] for entry in pages.values()), default=-1) + 1)
+    for entry in pages.values():
+        docs[entry["id"]] = [entry["url"], entry["title"]]
+    meta = {"version": SEARCH_VERSION, "prefix": PREFIX_LENGTH, "docs": docs, "shards": sorted(shard_hashes)}
+    state["index"] = write(os.path.join(search_dir, SEARCH_INDEX_NAME), meta, state.get("index"))
+    return changes
+
+def remove_search_index(manifest, dest_root):
+    """
+    Delete the search index written by an earlier build, returning the
+    deleted files.
+    """
+    deleted = []
+    search_dir = os.path.join(dest_root, SEARCH_DIR)
+    names = [key + ".json" for key in manifest.search.get("shards", {})] + [SEARCH_INDEX_NAME]
+    for name in names:
+        path = os.path.join(search_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+            deleted.append(path)
+    prune_empty_dirs(search_dir, dest_root)
+    manifest.search = {}
+    return deleted
\ No newline at end of file
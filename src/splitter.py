@@ -1,6 +1,7 @@
 import re
 from enum import Enum
 from textnode import TextNode, TextType
+from inline import tokenize_inline
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     """
@@ -114,7 +115,15 @@ def text_to_textnodes(text):
     """
     Convert raw markdown text into a list of TextNode objects.
     
-    Processes bold, italic, code, images, and links in order.
+    Processes bold, italic, code, images, and links in a single scan
+    (see inline.tokenize_inline).
+    """
+    return tokenize_inline(text)
+
+def text_to_textnodes_multipass(text):
+    """
+    Reference implementation of text_to_textnodes that runs one splitter
+    pass per inline syntax. Kept for equivalence tests and benchmarks.
     """
     nodes = [TextNode(text, TextType.TEXT)]
     nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
@@ -132,7 +141,7 @@ def markdown_to_blocks(markdown):
         markdown: Raw markdown string
     
     Returns:
-        List of block strings
+        List of Block records, classified as they are split
     """
     # Split on double newlines
     blocks = markdown.split("\n\n")
@@ -142,10 +151,56 @@ def markdown_to_blocks(markdown):
     for block in blocks:
         stripped = block.strip()
         if stripped:
-            result.append(stripped)
+            result.append(Block(stripped, *classify_block(stripped)))
     
     return result
 
+def iter_markdown_blocks(lines):
+    """
+    Lazily split a markdown document into blocks, yielding each block as
+    soon as the blank line that ends it is read.
+
+    Produces the same blocks as markdown_to_blocks on the joined text, but
+    only holds the lines of the current block, so a file object can be
+    passed directly without reading it into memory.
+
+    Args:
+        lines: Iterable of lines, each ending in "\n" except possibly the
+            last (e.g. a file opened in text mode)
+
+    Yields:
+        Block records, stripped of surrounding whitespace
+    """
+    # split("\n\n") breaks the document at every empty line; lines made of
+    # other whitespace stay inside their block
+    block_lines = []
+    for line in lines:
+        if line == "\n":
+            if block_lines:
+                block = _lines_to_block(block_lines)
+                block_lines = []
+                if block is not None:
+                    yield block
+        else:
+            block_lines.append(line[:-1] if line.endswith("\n") else line)
+    if block_lines:
+        block = _lines_to_block(block_lines)
+        if block is not None:
+            yield block
+
+def _lines_to_block(lines):
+    """
+    Build the Block for a run of lines, reusing the lines as the block's
+    own unless stripping the block changed them.
+    """
+    joined = "\n".join(lines)
+    text = joined.strip()
+    if not text:
+        return None
+    if len(text) != len(joined):
+        lines = None
+    return Block(text, *classify_block(text, lines))
+
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
     HEADING = "heading"
@@ -154,44 +209,96 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
-def block_to_block_type(block):
+class Block:
     """
-    Determine the type of a markdown block.
+    A block of a markdown document, classified once when it is split.
+
+    Attributes:
+        text: The block's markdown, stripped of surrounding whitespace
+        block_type: The block's BlockType
+        lines: text split into lines for the block types rendered line by
+            line (quotes, lists and paragraphs), None for headings and code
+    """
+    __slots__ = ("text", "block_type", "lines")
+
+    def __init__(self, text, block_type, lines):
+        self.text = text
+        self.block_type = block_type
+        self.lines = lines
+
+    def __eq__(self, other):
+        if not isinstance(other, Block):
+            return NotImplemented
+        return (
+            self.text == other.text and
+            self.block_type == other.block_type and
+            self.lines == other.lines
+        )
+
+    def __repr__(self):
+        return f"Block({self.text!r}, {self.block_type.value})"
+
+# 1-6 # followed by a space
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+
+def classify_block(block, lines=None):
+    """
+    Determine the type of a markdown block in a single scan of its lines.
+    
+    Quote, list and ordered-list markers are told apart by the first line,
+    so only the one type it could be is checked against the other lines.
     
     Args:
         block: A single block of markdown text (already stripped)
+        lines: The block's lines, if they are already split
     
     Returns:
-        BlockType enum value
+        Tuple of the BlockType and the block's lines (None for headings and
+        code, which are rendered from the text as a whole)
     """
     # Heading: starts with 1-6 # followed by a space
-    if re.match(r"^#{1,6} ", block):
-        return BlockType.HEADING
+    if block.startswith("#") and HEADING_PATTERN.match(block):
+        return BlockType.HEADING, None
 
     # Code: starts with ``` and ends with ```
     if block.startswith("```") and block.endswith("```"):
-        return BlockType.CODE
+        return BlockType.CODE, None
 
-    lines = block.split("\n")
+    if lines is None:
+        lines = block.split("\n")
+    first = lines[0]
 
     # Quote: every line starts with >
-    if all(line.startswith(">") for line in lines):
-        return BlockType.QUOTE
+    if first.startswith(">"):
+        if all(line.startswith(">") for line in lines):
+            return BlockType.QUOTE, lines
 
     # Unordered list: every line starts with "- "
-    if all(line.startswith("- ") for line in lines):
-        return BlockType.UNORDERED_LIST
+    elif first.startswith("- "):
+        if all(line.startswith("- ") for line in lines):
+            return BlockType.UNORDERED_LIST, lines
 
     # Ordered list: every line starts with "N. " where N increments from 1
-    is_ordered = True
-    for i, line in enumerate(lines):
-        if not line.startswith(f"{i + 1}. "):
-            is_ordered = False
-            break
-    if is_ordered:
-        return BlockType.ORDERED_LIST
+    elif first.startswith("1. "):
+        for i, line in enumerate(lines):
+            if not line.startswith(f"{i + 1}. "):
+                break
+        else:
+            return BlockType.ORDERED_LIST, lines
 
-    return BlockType.PARAGRAPH
+    return BlockType.PARAGRAPH, lines
+
+def block_to_block_type(block):
+    """
+    Determine the type of a markdown block.
+    
+    Args:
+        block: A single block of markdown text (already stripped)
+    
+    Returns:
+        BlockType enum value
+    """
+    return classify_block(block)[0]
 
 def extract_title(markdown):
     """
@@ -206,16 +313,26 @@ def extract_title(markdown):
     Raises:
         ValueError: If no h1 header is found
     """
-    lines = markdown.split("\n")
+    return find_title(markdown.split("\n"))
+
+def find_title(lines):
+    """
+    Return the text of the first h1 line in an iterable of lines, such as a
+    file object, reading no further than that line.
+
+    Raises:
+        ValueError: If no h1 header is found
+    """
     for line in lines:
         if line.startswith("# "):
             return line[2:].strip()
     raise ValueError("No h1 header found in markdown")
 
-def text_to_children(text):
+def text_to_children(text, basepath="/"):
     """
     Convert markdown text into a list of HTMLNode children.
-    Processes inline markdown (bold, italic, code, links, images).
+    Processes inline markdown (bold, italic, code, links, images), resolving
+    root-relative URLs against basepath.
     """
     from parentnode import ParentNode
     from textnode import text_node_to_html_node
@@ -223,89 +340,132 @@ def text_to_children(text):
     text_nodes = text_to_textnodes(text)
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, basepath)
         children.append(html_node)
     return children
 
-def markdown_to_html_node(markdown):
+def block_to_html_node(block, basepath="/"):
+    """
+    Convert a single classified markdown block into an HTMLNode.
+    
+    Args:
+        block: A Block record, whose pre-split lines are reused
+        basepath: Base path that root-relative link and image URLs resolve to
+    
+    Returns:
+        The HTMLNode for the block
+    """
+    from parentnode import ParentNode
+    from leafnode import LeafNode
+    
+    block_type = block.block_type
+    
+    if block_type == BlockType.HEADING:
+        level = block.text.index(" ")
+        text = block.text[level + 1:]  # Remove the "# " prefix
+        children_nodes = text_to_children(text, basepath)
+        heading_node = ParentNode(f"h{level}", children_nodes)
+        return heading_node
+    
+    elif block_type == BlockType.CODE:
+        # Remove the ``` markers
+        code_text = block.text[3:-3].strip()
+        # Don't parse inline markdown in code blocks
+        code_leaf = LeafNode("code", code_text)
+        pre_node = ParentNode("pre", [code_leaf])
+        return pre_node
+    
+    elif block_type == BlockType.QUOTE:
+        # Remove > from each line and join with spaces
+        quote_lines = []
+        for line in block.lines:
+            if line.startswith("> "):
+                quote_lines.append(line[2:])
+            else:
+                quote_lines.append(line[1:])
+        quote_text = " ".join(quote_lines)
+        children_nodes = text_to_children(quote_text, basepath)
+        quote_node = ParentNode("blockquote", children_nodes)
+        return quote_node
+    
+    elif block_type == BlockType.UNORDERED_LIST:
+        # Create li items for each line
+        list_items = []
+        for line in block.lines:
+            item_text = line[2:]  # Remove "- "
+            item_children = text_to_children(item_text, basepath)
+            li_node = ParentNode("li", item_children)
+            list_items.append(li_node)
+        ul_node = ParentNode("ul", list_items)
+        return ul_node
+    
+    elif block_type == BlockType.ORDERED_LIST:
+        # Create li items for each line
+        list_items = []
+        for line in block.lines:
+            # Remove "N. " prefix
+            dot_index = line.index(". ")
+            item_text = line[dot_index + 2:]
+            item_children = text_to_children(item_text, basepath)
+            li_node = ParentNode("li", item_children)
+            list_items.append(li_node)
+        ol_node = ParentNode("ol", list_items)
+        return ol_node
+    
+    elif block_type == BlockType.PARAGRAPH:
+        # Join the lines with spaces for paragraph text
+        paragraph_text = " ".join(block.lines)
+        children_nodes = text_to_children(paragraph_text, basepath)
+        p_node = ParentNode("p", children_nodes)
+        return p_node
+    
+    raise ValueError(f"Invalid block type: {block_type}")
+
+def render_block(block, basepath="/", block_cache=None):
+    """
+    Render one classified block, through the block cache if given.
+    """
+    if block_cache is not None:
+        return block_cache.render(block, basepath, block_to_html_node)
+    return block_to_html_node(block, basepath)
+
+def markdown_to_html_node(markdown, basepath="/", block_cache=None):
     """
     Convert a full markdown document into a single parent HTMLNode.
     
     Args:
         markdown: Full markdown document string
+        basepath: Base path that root-relative link and image URLs resolve to
+        block_cache: Optional BlockCache; cached blocks come back as raw
+            HTML leaves instead of being re-rendered
     
     Returns:
         A parent HTMLNode (div) containing all block HTMLNodes
     """
     from parentnode import ParentNode
-    from leafnode import LeafNode
     
     blocks = markdown_to_blocks(markdown)
     children = []
     
     for block in blocks:
-        block_type = block_to_block_type(block)
-        
-        if block_type == BlockType.HEADING:
-            level = len(block.split(" ")[0])
-            text = block[level + 1:]  # Remove the "# " prefix
-            children_nodes = text_to_children(text)
-            heading_node = ParentNode(f"h{level}", children_nodes)
-            children.append(heading_node)
-        
-        elif block_type == BlockType.CODE:
-            # Remove the ``` markers
-            code_text = block[3:-3].strip()
-            # Don't parse inline markdown in code blocks
-            code_leaf = LeafNode("code", code_text)
-            pre_node = ParentNode("pre", [code_leaf])
-            children.append(pre_node)
-        
-        elif block_type == BlockType.QUOTE:
-            # Remove > from each line and join with newlines
-            lines = block.split("\n")
-            quote_lines = []
-            for line in lines:
-                if line.startswith("> "):
-                    quote_lines.append(line[2:])
-                elif line.startswith(">"):
-                    quote_lines.append(line[1:])
-            quote_text = " ".join(quote_lines)
-            children_nodes = text_to_children(quote_text)
-            quote_node = ParentNode("blockquote", children_nodes)
-            children.append(quote_node)
-        
-        elif block_type == BlockType.UNORDERED_LIST:
-            # Create li items for each line
-            lines = block.split("\n")
-            list_items = []
-            for line in lines:
-                item_text = line[2:]  # Remove "- "
-                item_children = text_to_children(item_text)
-                li_node = ParentNode("li", item_children)
-                list_items.append(li_node)
-            ul_node = ParentNode("ul", list_items)
-            children.append(ul_node)
-        
-        elif block_type == BlockType.ORDERED_LIST:
-            # Create li items for each line
-            lines = block.split("\n")
-            list_items = []
-            for line in lines:
-                # Remove "N. " prefix
-                dot_index = line.index(". ")
-                item_text = line[dot_index + 2:]
-                item_children = text_to_children(item_text)
-                li_node = ParentNode("li", item_children)
-                list_items.append(li_node)
-            ol_node = ParentNode("ol", list_items)
-            children.append(ol_node)
-        
-        elif block_type == BlockType.PARAGRAPH:
-            # Replace newlines with spaces for paragraph text
-            paragraph_text = block.replace("\n", " ")
-            children_nodes = text_to_children(paragraph_text)
-            p_node = ParentNode("p", children_nodes)
-            children.append(p_node)
-    
-    return ParentNode("div", children)
\ No newline at end of file
+        children.append(render_block(block, basepath, block_cache))
+    
+    return ParentNode("div", children)
+
+def iter_markdown_html(lines, basepath="/", block_cache=None):
+    """
+    Stream the HTML of a markdown document block by block.
+
+    Yields the same chunks as markdown_to_html_node(...).iter_html(), but
+    each block is read, rendered and released before the next is read, so
+    memory is bounded by the largest block rather than the document.
+
+    Args:
+        lines: Iterable of lines, such as a file object
+        basepath: Base path that root-relative link and image URLs resolve to
+        block_cache: Optional BlockCache shared across pages
+    """
+    yield "<div>"
+    for block in iter_markdown_blocks(lines):
+        yield from render_block(block, basepath, block_cache).iter_html()
+    yield "</div>"
\ No newline at end of file
@@ -0,0 +1,239 @@
+import os
+import shutil
+from fingerprint import fingerprinted_path
+from manifest import BuildManifest, hash_file
+from pngopt import optimize_pngs
+
+# Files at least this large are copied with copy_file_range/sendfile so the
+# data never passes through Python buffers
+LARGE_FILE_THRESHOLD = 1 << 20
+
+def prune_empty_dirs(start_dir, root_dir):
+    """
+    Remove start_dir and its ancestors while they are empty, stopping at
+    root_dir (which is never removed).
+    """
+    root = os.path.abspath(root_dir)
+    current = start_dir
+    while current and os.path.abspath(current) != root and os.path.isdir(current):
+        if os.listdir(current):
+            break
+        os.rmdir(current)
+        current = os.path.dirname(current)
+
+def _kernel_copy(in_fd, out_fd, size):
+    """
+    Copy size bytes between file descriptors inside the kernel.
+
+    Tries os.copy_file_range (which can also reflink on copy-on-write
+    filesystems) and then os.sendfile. Returns False if neither is available
+    or both fail, leaving out_fd truncated and both offsets rewound.
+    """
+    for name in ("copy_file_range", "sendfile"):
+        if not hasattr(os, name):
+            continue
+        copied = 0
+        try:
+            while copied < size:
+                if name == "copy_file_range":
+                    n = os.copy_file_range(in_fd, out_fd, size - copied)
+                else:
+                    n = os.sendfile(out_fd, in_fd, copied, size - copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError:
+            pass
+        if copied == size:
+            return True
+        os.lseek(in_fd, 0, os.SEEK_SET)
+        os.lseek(out_fd, 0, os.SEEK_SET)
+        os.ftruncate(out_fd, 0)
+    return False
+
+def copy_file(src_path, dst_path, threshold=LARGE_FILE_THRESHOLD):
+    """
+    Copy a file's contents, mode and timestamps.
+
+    The copy is written to a temporary file and renamed into place, so a
+    destination that is a hardlink to the source is replaced rather than
+    written through.
+
+    Args:
+        src_path: File to copy
+        dst_path: Destination path
+        threshold: Size in bytes from which kernel-side copying is used
+    """
+    tmp_path = dst_path + ".tmp"
+    size = os.path.getsize(src_path)
+    if size < threshold:
+        shutil.copyfile(src_path, tmp_path)
+    else:
+        with open(src_path, "rb") as fsrc, open(tmp_path, "wb") as fdst:
+            if not _kernel_copy(fsrc.fileno(), fdst.fileno(), size):
+                shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src_path, tmp_path)
+    os.replace(tmp_path, dst_path)
+
+def link_file(src_path, dst_path):
+    """
+    Hardlink dst_path to src_path, returning False if the filesystem does not
+    allow it (e.g. the paths are on different devices).
+    """
+    tmp_path = dst_path + ".tmp"
+    try:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        os.link(src_path, tmp_path)
+    except OSError:
+        return False
+    os.replace(tmp_path, dst_path)
+    return True
+
+def needs_copy(src_path, dst_path, checksum=False):
+    """
+    Decide whether dst_path is out of date with respect to src_path.
+
+    The quick check compares size and modification time. With checksum=True
+    files of equal size are compared by content hash instead of mtime.
+    """
+    try:
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return True
+    src_stat = os.stat(src_path)
+    if src_stat.st_size != dst_stat.st_size:
+        return True
+    if os.path.samestat(src_stat, dst_stat):
+        return False
+    if checksum:
+        return hash_file(src_path) != hash_file(dst_path)
+    return src_stat.st_mtime_ns != dst_stat.st_mtime_ns
+
+def sync_static(src_dir, dst_dir, manifest_path, checksum=False, hardlink=False,
+                threshold=LARGE_FILE_THRESHOLD, fingerprint=False, image_cache=None, jobs=None):
+    """
+    Bring the static assets in dst_dir up to date with src_dir.
+
+    Only new or changed files are copied. Assets that were synced by a
+    previous build but are no longer produced (their source was removed,
+    or their fingerprinted name changed) are removed; anything else in
+    dst_dir (such as generated pages) is left alone.
+
+    With fingerprint=True each asset is copied to name.<hash>.ext, so it
+    can be cached forever; the hash is of the bytes published, which for an
+    optimized PNG are those of the optimized file. Hashes are reused from
+    the manifest while an asset's size and mtime are unchanged.
+
+    With an image_cache directory, PNG assets are losslessly recompressed
+    (once per unique content, see optimize_pngs) and the smaller result is
+    copied instead of the source.
+
+    Args:
+        src_dir: Static source directory
+        dst_dir: Output directory
+        manifest_path: Path to the build manifest that tracks synced assets
+        checksum: Compare equal-sized files by content hash instead of mtime
+        hardlink: Hardlink assets to their sources instead of copying them
+        threshold: Size in bytes from which kernel-side copying is used
+        fingerprint: Copy assets to content-hashed names
+        image_cache: Directory caching optimized PNGs; None copies PNGs as is
+        jobs: Number of processes optimizing PNGs (default: one per CPU)
+
+    Returns:
+        Dict with the lists of "copied", "unchanged" and "removed" asset paths,
+        relative to dst_dir; "added" lists the copied assets that did not
+        exist in dst_dir before. With fingerprinting, "fingerprints" maps
+        each logical asset path to its fingerprinted path ("/"-separated)
+    """
+    manifest = BuildManifest.load(manifest_path)
+    summary = {"copied": [], "added": [], "unchanged": [], "removed": [], "fingerprints": {}}
+    current = {}
+    sources = {}
+
+    os.makedirs(dst_dir, exist_ok=True)
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        dirnames.sort()
+        rel_dir = os.path.relpath(dirpath, src_dir)
+        out_dir = dst_dir if rel_dir == "." else os.path.join(dst_dir, rel_dir)
+        os.makedirs(out_dir, exist_ok=True)
+
+        for filename in sorted(filenames):
+            src_path = os.path.join(dirpath, filename)
+            rel_path = os.path.normpath(os.path.join(rel_dir, filename))
+            src_stat = os.stat(src_path)
+            entry = {"size": src_stat.st_size, "mtime_ns": src_stat.st_mtime_ns}
+
+            if fingerprint or (image_cache is not None and filename.lower().endswith(".png")):
+                previous = manifest.assets.get(rel_path, {})
+                if (
+                    "hash" in previous
+                    and previous.get("size") == entry["size"]
+                    and previous.get("mtime_ns") == entry["mtime_ns"]
+                ):
+                    entry["hash"] = previous["hash"]
+                else:
+                    entry["hash"] = hash_file(src_path)
+            current[rel_path] = entry
+            sources[rel_path] = src_path
+
+    # Optimized PNGs are copied from the cache instead of from static/
+    optimized = {}
+    if image_cache is not None:
+        images = {
+            entry["hash"]: sources[rel_path]
+            for rel_path, entry in current.items()
+            if rel_path.lower().endswith(".png")
+        }
+        optimized = optimize_pngs(images, image_cache, jobs)
+
+    if fingerprint:
+        # The name is derived from the bytes published under it, so an
+        # optimized PNG gets a different name than its source would
+        for rel_path, entry in current.items():
+            digest = entry["hash"]
+            if optimized.get(digest):
+                previous = manifest.assets.get(rel_path, {})
+                if previous.get("hash") == digest and "published" in previous:
+                    entry["published"] = previous["published"]
+                else:
+                    entry["published"] = hash_file(optimized[digest])
+                digest = entry["published"]
+            entry["dest"] = fingerprinted_path(rel_path, digest)
+            summary["fingerprints"][rel_path.replace(os.sep, "/")] = entry["dest"].replace(os.sep, "/")
+
+    for rel_path, entry in current.items():
+        src_path = optimized.get(entry.get("hash")) or sources[rel_path]
+        out_rel = entry.get("dest", rel_path)
+        dst_path = os.path.join(dst_dir, out_rel)
+        if needs_copy(src_path, dst_path, checksum):
+            if not os.path.exists(dst_path):
+                summary["added"].append(out_rel)
+            if hardlink and link_file(src_path, dst_path):
+                print(f"Linking file: {src_path} -> {dst_path}")
+            else:
+                print(f"Copying file: {src_path} -> {dst_path}")
+                copy_file(src_path, dst_path, threshold)
+            summary["copied"].append(out_rel)
+        else:
+            summary["unchanged"].append(out_rel)
+
+    produced = {entry.get("dest", rel_path) for rel_path, entry in current.items()}
+    stale = {entry.get("dest", rel_path) for rel_path, entry in manifest.assets.items()} - produced
+    for out_rel in sorted(stale):
+        dst_path = os.path.join(dst_dir, out_rel)
+        if os.path.exists(dst_path):
+            print(f"Removing stale asset: {dst_path}")
+            os.remove(dst_path)
+        prune_empty_dirs(os.path.dirname(dst_path), dst_dir)
+        summary["removed"].append(out_rel)
+
+    manifest.assets = current
+    manifest.save()
+
+    print(
+        f"\nAssets: {len(summary['copied'])} copied, "
+        f"{len(summary['unchanged'])} unchanged, "
+        f"{len(summary['removed'])} removed"
+    )
+    return summary
\ No newline at end of file
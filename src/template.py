@@ -0,0 +1,207 @@
+import os
+import re
+from urls import resolve_url
+
+# Placeholders look like "{{ Title }}"; whitespace inside the braces is optional
+SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# Root-relative URLs in the template's own attributes, e.g. href="/index.css"
+ROOT_URL_PATTERN = re.compile(r'\b(href|src)="(/(?!/)[^"]*)"')
+
+# A file with this name in a content directory is the layout for every page
+# in that directory and below, overriding the site-wide template
+LAYOUT_FILENAME = "layout.html"
+
+class Template:
+    """
+    A template parsed once into alternating literal segments and slots.
+
+    Rendering joins the literals with the slot values in a single pass
+    instead of scanning the whole page once per placeholder. Root-relative
+    href and src URLs written in the template are resolved against basepath
+    when it is compiled.
+
+    With an AssetMap, asset URLs in the template are pointed at their
+    fingerprinted names when it is compiled, and those in slot values as
+    they are rendered; otherwise slot values are never rewritten. With
+    ImageSizes, every rendered <img> tag (in the template or a slot) is
+    annotated with its size and lazy-loading attributes.
+    """
+
+    def __init__(self, source, basepath="/", assets=None, images=None):
+        if basepath != "/":
+            source = ROOT_URL_PATTERN.sub(
+                lambda m: f'{m.group(1)}="{resolve_url(m.group(2), basepath)}"', source
+            )
+        self.basepath = basepath
+        self.assets = assets if assets else None
+        self.images = images
+        if self.assets is not None:
+            source = self.assets.rewrite(source, basepath)
+        self.literals = []
+        self.slots = []
+        self.placeholders = []
+        pos = 0
+        for match in SLOT_PATTERN.finditer(source):
+            self.literals.append(source[pos:match.start()])
+            self.slots.append(match.group(1))
+            self.placeholders.append(match.group(0))
+            pos = match.end()
+        self.literals.append(source[pos:])
+
+    def render(self, values, images_used=None):
+        """
+        Fill the template's slots.
+
+        Args:
+            values: Dict mapping slot names (e.g. "Title") to strings
+            images_used: Optional dict recording the URL and size of every
+                image annotated with ImageSizes
+
+        Returns:
+            The rendered page; slots without a value are left as written
+        """
+        return "".join(self.iter_render(values, images_used))
+
+    def iter_render(self, values, images_used=None):
+        """
+        Yield the rendered page in chunks.
+
+        A slot value may be a string or an iterable of string chunks (such
+        as HTMLNode.iter_html()), which is streamed through without being
+        joined first.
+        """
+        if self.assets is not None or self.images is not None:
+            yield from self._iter_rewritten(values, images_used)
+            return
+        yield self.literals[0]
+        for name, placeholder, literal in zip(self.slots, self.placeholders, self.literals[1:]):
+            value = values.get(name, placeholder)
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+            yield literal
+
+    def _iter_rewritten(self, values, images_used=None):
+        # Each chunk holds whole tags (a leaf node or cached block), so
+        # attributes are never split across chunks
+        assets = self.assets
+        basepath = self.basepath
+        annotate = self.images.annotator(basepath, assets, images_used) if self.images is not None else None
+
+        def rewrite(chunk):
+            if assets is not None:
+                chunk = assets.rewrite(chunk, basepath)
+            if annotate is not None:
+                chunk = annotate(chunk)
+            return chunk
+
+        # Literals were rewritten when the template was compiled
+        yield annotate(self.literals[0]) if annotate is not None else self.literals[0]
+        for name, placeholder, literal in zip(self.slots, self.placeholders, self.literals[1:]):
+            value = values.get(name, placeholder)
+            if isinstance(value, str):
+                yield rewrite(value)
+            else:
+                for chunk in value:
+                    yield rewrite(chunk)
+            yield annotate(literal) if annotate is not None else literal
+
+    def __repr__(self):
+        return f"Template(slots={self.slots})"
+
+def find_layout(src_path, content_root, default_path, cache=None):
+    """
+    Find the layout for a page: the nearest layout.html in the page's
+    directory or any parent up to content_root, else default_path.
+
+    Args:
+        src_path: Path to the markdown source
+        content_root: Root of the content directory
+        default_path: Site-wide template path
+        cache: Optional dict reused across calls within one build, so each
+            directory is only checked once
+
+    Returns:
+        Path of the template to render the page with
+    """
+    if cache is None:
+        cache = {}
+    root = os.path.abspath(content_root)
+    directory = os.path.dirname(src_path)
+    visited = []
+    layout = default_path
+    while True:
+        if directory in cache:
+            layout = cache[directory]
+            break
+        visited.append(directory)
+        candidate = os.path.join(directory, LAYOUT_FILENAME)
+        if os.path.isfile(candidate):
+            layout = candidate
+            break
+        parent = os.path.dirname(directory)
+        if not directory or os.path.abspath(directory) == root or parent == directory:
+            break
+        directory = parent
+    for path in visited:
+        cache[path] = layout
+    return layout
+
+class TemplateLoader:
+    """
+    Compiles templates on first use and reuses them for the rest of the build.
+
+    Entries are keyed by path and basepath, and invalidated when the file's
+    mtime or size changes, so a long-running process (such as watch mode)
+    picks up edits. Templates are compiled with the loader's AssetMap and
+    ImageSizes, if they are set.
+    """
+
+    def __init__(self):
+        self._templates = {}
+        self.assets = None
+        self.images = None
+
+    def set_assets(self, assets):
+        """
+        Use an AssetMap (or None) for templates compiled from now on,
+        dropping those compiled with a different one.
+        """
+        current = self.assets.digest if self.assets else None
+        new = assets.digest if assets else None
+        if new != current:
+            self._templates.clear()
+        self.assets = assets if assets else None
+
+    def set_images(self, images):
+        """
+        Use ImageSizes (or None) for templates compiled from now on,
+        dropping those compiled with different ones.
+        """
+        current = self.images.digest if self.images is not None else None
+        new = images.digest if images is not None else None
+        if new != current:
+            self._templates.clear()
+        self.images = images
+
+    def get(self, path, basepath="/"):
+        """
+        Return the compiled template for path, compiling it if needed.
+        """
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._templates.get((path, basepath))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with open(path, "r") as f:
+            template = Template(f.read(), basepath, self.assets, self.images)
+        self._templates[(path, basepath)] = (key, template)
+        return template
+
+    def clear(self):
+        self._templates.clear()
+
+# Shared by every page rendered in this process
+default_loader = TemplateLoader()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import unittest
+import leafnode
+from benchmark import (
+    CORPORA, _inline_benchmarks, _tree_benchmarks, _unescaped, compare, generate_corpus, measure_memory,
+)
+from leafnode import LeafNode
+
+
+def report(**medians):
+    return {"results": {name: {"median": value} for name, value in medians.items()}}
+
+
+class TestCorpus(unittest.TestCase):
+    def test_corpus_is_deterministic(self):
+        for shape in CORPORA:
+            self.assertEqual(generate_corpus(shape, 1, seed=3), generate_corpus(shape, 1, seed=3))
+
+    def test_seed_changes_corpus(self):
+        self.assertNotEqual(
+            generate_corpus("link_dense", 1, seed=1),
+            generate_corpus("link_dense", 1, seed=2),
+        )
+
+    def test_size_scales_corpus(self):
+        small = generate_corpus("many_small_files", 1)
+        large = generate_corpus("many_small_files", 2)
+        self.assertEqual(len(large), 2 * len(small))
+
+    def test_pages_have_titles(self):
+        for shape in CORPORA:
+            for markdown in generate_corpus(shape, 1).values():
+                self.assertTrue(markdown.startswith("# "))
+
+
+class TestTreeBenchmarks(unittest.TestCase):
+    def test_paired_renderers_agree(self):
+        benchmarks = _tree_benchmarks(1)
+        for shape in ("wide", "deep"):
+            self.assertEqual(benchmarks[f"trees.{shape}.iterative"](), benchmarks[f"trees.{shape}.recursive"]())
+
+
+class TestInlineBenchmarks(unittest.TestCase):
+    def test_paired_tokenizers_agree(self):
+        benchmarks = _inline_benchmarks(1)
+        self.assertEqual(benchmarks["inline.links.single_pass"](), benchmarks["inline.links.multipass"]())
+
+
+class TestMeasureMemory(unittest.TestCase):
+    def test_larger_tree_holds_more(self):
+        small, large = measure_memory(50), measure_memory(200)
+        for key in ("traced_peak_kb", "tree_retained_kb", "live_blocks"):
+            self.assertGreater(large[key], small[key], key)
+        self.assertGreaterEqual(small["traced_peak_kb"], small["tree_retained_kb"])
+
+
+class TestUnescaped(unittest.TestCase):
+    def test_escaping_switched_off_only_while_running(self):
+        node = LeafNode("b", "a < b")
+        self.assertEqual(_unescaped(node.to_html)(), "<b>a < b</b>")
+        self.assertEqual(node.to_html(), "<b>a &lt; b</b>")
+        self.assertIsNot(leafnode.escape_text, str)
+
+
+class TestCompare(unittest.TestCase):
+    def test_flags_regression_over_threshold(self):
+        rows, regressions = compare(report(a=1.2, b=1.05), report(a=1.0, b=1.0), threshold=0.10)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual([row[0] for row in regressions], ["a"])
+
+    def test_ignores_benchmarks_missing_from_baseline(self):
+        rows, regressions = compare(report(a=5.0), report(b=1.0))
+        self.assertEqual(rows, [])
+        self.assertEqual(regressions, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,25 @@
+import random
+import re
 import unittest
-from splitter import block_to_block_type, BlockType
+from splitter import block_to_block_type, classify_block, BlockType
+
+
+def reference_block_type(block):
+    """
+    Classify a block with one check per type, as the splitter once did.
+    """
+    if re.match(r"^#{1,6} ", block):
+        return BlockType.HEADING
+    if block.startswith("```") and block.endswith("```"):
+        return BlockType.CODE
+    lines = block.split("\n")
+    if all(line.startswith(">") for line in lines):
+        return BlockType.QUOTE
+    if all(line.startswith("- ") for line in lines):
+        return BlockType.UNORDERED_LIST
+    if all(line.startswith(f"{i + 1}. ") for i, line in enumerate(lines)):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
 
 
 class TestBlockToBlockType(unittest.TestCase):
@@ -67,6 +87,19 @@ class TestBlockToBlockType(unittest.TestCase):
     def test_paragraph_multiline(self):
         self.assertEqual(block_to_block_type("Line 1\nLine 2\nLine 3"), BlockType.PARAGRAPH)
 
+    def test_classify_returns_lines_to_reuse(self):
+        self.assertEqual(classify_block("- a\n- b"), (BlockType.UNORDERED_LIST, ["- a", "- b"]))
+        self.assertEqual(classify_block("# Title"), (BlockType.HEADING, None))
+        lines = ["> a", "> b"]
+        self.assertIs(classify_block("> a\n> b", lines)[1], lines)
+
+    def test_single_scan_matches_separate_checks(self):
+        rng = random.Random(5)
+        pieces = ["# h", "####### h", "#h", "```", "> q", ">q", "- i", "-i", "1. a", "2. b", "3. c", "text"]
+        for _ in range(3000):
+            block = "\n".join(rng.choice(pieces) for _ in range(rng.randint(1, 4)))
+            self.assertEqual(block_to_block_type(block), reference_block_type(block), repr(block))
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+
+from blockcache import BlockCache
+from splitter import BlockType, markdown_to_html_node
+
+
+MARKDOWN = """# Title
+
+A paragraph with a [link](/page).
+
+- one
+- two
+
+A paragraph with a [link](/page)."""
+
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "cache.json")
+
+    def test_output_identical_with_cache(self):
+        cache = BlockCache(self.path)
+        expected = markdown_to_html_node(MARKDOWN, "/site/").to_html()
+        self.assertEqual(markdown_to_html_node(MARKDOWN, "/site/", cache).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(MARKDOWN, "/site/", cache).to_html(), expected)
+
+    def test_repeated_blocks_hit(self):
+        cache = BlockCache(self.path)
+        markdown_to_html_node(MARKDOWN, "/", cache)
+        self.assertEqual(cache.stats()["misses"], 3)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_key_includes_type_and_basepath(self):
+        key = BlockCache.key("text", BlockType.PARAGRAPH, "/")
+        self.assertNotEqual(key, BlockCache.key("text", BlockType.HEADING, "/"))
+        self.assertNotEqual(key, BlockCache.key("text", BlockType.PARAGRAPH, "/site/"))
+
+    def test_lru_eviction(self):
+        cache = BlockCache(self.path, max_bytes=3 * (64 + 10))
+        for name in "abc":
+            cache.put(name * 64, name * 10)
+        cache.get("a" * 64)
+        cache.put("d" * 64, "d" * 10)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get("b" * 64))
+        self.assertEqual(cache.get("a" * 64), "a" * 10)
+
+    def test_persistence(self):
+        cache = BlockCache(self.path)
+        markdown_to_html_node(MARKDOWN, "/", cache)
+        cache.save()
+
+        loaded = BlockCache.load(self.path)
+        self.assertEqual(len(loaded), 3)
+        markdown_to_html_node(MARKDOWN, "/", loaded)
+        self.assertEqual(loaded.stats()["misses"], 0)
+        self.assertEqual(loaded.stats()["hits"], 4)
+
+    def test_stale_renderer_discarded(self):
+        cache = BlockCache(self.path)
+        cache.put("k", "<p>x</p>")
+        cache.save()
+        with open(self.path) as f:
+            data = json.load(f)
+        data["renderer"] = "older"
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+        self.assertEqual(len(BlockCache.load(self.path)), 0)
+
+    def test_merge(self):
+        worker = BlockCache()
+        markdown_to_html_node(MARKDOWN, "/", worker)
+        parent = BlockCache(self.path)
+        parent.merge(worker.take_added(), worker.hits, worker.misses)
+        self.assertEqual(len(parent), 3)
+        self.assertEqual(parent.stats()["hits"], 1)
+        self.assertEqual(worker.take_added(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
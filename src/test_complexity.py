@@ -0,0 +1,51 @@
+import os
+import unittest
+
+from complexity import STRESS_CASES, check_cases, fuzz_cases, growth
+
+
+def quadratic(text):
+    pairs = 0
+    for i in range(len(text)):
+        for _ in range(i):
+            pairs += 1
+    return pairs
+
+
+# Growth ratios come from wall-clock timings, which a loaded machine can
+# skew, so they only run on request
+TIMING_TESTS = bool(os.environ.get("RUN_TIMING_TESTS"))
+
+
+@unittest.skipUnless(TIMING_TESTS, "set RUN_TIMING_TESTS=1 to run wall-clock timing tests")
+class TestComplexity(unittest.TestCase):
+    def assert_linear(self, cases):
+        rows = check_cases(cases, size=400, factor=8, slack=4.0)
+        slow = [row[0] for row in rows if not row[-1]]
+        if slow:
+            # Measure again so one noisy timing does not fail the suite
+            rows = check_cases({name: cases[name] for name in slow}, size=400, factor=8, slack=4.0, repeat=7)
+        self.assertEqual([row[:3] for row in rows if not row[-1]], [])
+
+    def test_stress_cases_render_in_linear_time(self):
+        self.assert_linear(STRESS_CASES)
+
+    def test_fuzz_cases_render_in_linear_time(self):
+        self.assert_linear(fuzz_cases(10, seed=1))
+
+    def test_quadratic_cost_detected(self):
+        ratio, _, _ = growth(quadratic, lambda n: "a" * n, 200, 8)
+        self.assertGreater(ratio, 4.0)
+
+
+class TestFuzzCases(unittest.TestCase):
+    def test_fuzz_inputs_deterministic_and_nested(self):
+        cases = fuzz_cases(5, seed=3)
+        self.assertEqual(list(cases), list(fuzz_cases(5, seed=3)))
+        for name, (target, generate) in cases.items():
+            self.assertEqual(generate(50), fuzz_cases(5, seed=3)[name][1](50))
+            self.assertTrue(generate(100).startswith(generate(50)), name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import gzip
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from compress import compress_site, remove_compressed
+from manifest import BuildManifest
+from testsupport import write
+
+
+class TestCompressSite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = os.path.join(self.tmp.name, "docs")
+        self.manifest = os.path.join(self.tmp.name, "manifest.json")
+        self.page = os.path.join(self.root, "blog", "index.html")
+        write(self.page, b"<p>hello hello hello hello hello hello</p>" * 50)
+        write(os.path.join(self.root, "index.css"), b"body { margin: 0 }\n" * 40)
+        write(os.path.join(self.root, "images", "a.png"), b"\x89PNG" + bytes(range(256)))
+
+    def compress(self, **kwargs):
+        with redirect_stdout(StringIO()):
+            return compress_site(self.root, self.manifest, jobs=2, **kwargs)
+
+    def test_writes_sidecars_for_text_files(self):
+        summary = self.compress()
+        self.assertEqual(summary["compressed"], ["index.css.gz", os.path.join("blog", "index.html.gz")])
+        self.assertEqual(summary["added"], summary["compressed"])
+        with open(self.page, "rb") as f, gzip.open(self.page + ".gz") as gz:
+            self.assertEqual(gz.read(), f.read())
+        self.assertFalse(os.path.exists(os.path.join(self.root, "images", "a.png.gz")))
+
+    def test_unchanged_files_not_recompressed(self):
+        self.compress()
+        os.utime(self.page + ".gz", ns=(1, 1))
+        summary = self.compress()
+        self.assertEqual(summary["compressed"], [])
+        self.assertEqual(len(summary["unchanged"]), 2)
+        self.assertEqual(os.stat(self.page + ".gz").st_mtime_ns, 1)
+
+    def test_changed_file_recompressed(self):
+        self.compress()
+        write(self.page, b"<p>changed changed changed changed</p>" * 50)
+        summary = self.compress()
+        self.assertEqual(summary["compressed"], [os.path.join("blog", "index.html.gz")])
+        self.assertEqual(summary["added"], [])
+
+    def test_small_gain_skipped(self):
+        tiny = os.path.join(self.root, "tiny.txt")
+        write(tiny, b"hi")
+        summary = self.compress()
+        self.assertEqual(summary["skipped"], ["tiny.txt"])
+        self.assertFalse(os.path.exists(tiny + ".gz"))
+
+    def test_deterministic_output(self):
+        self.compress()
+        with open(self.page + ".gz", "rb") as f:
+            first = f.read()
+        self.compress(level=6)
+        self.compress(level=9)
+        with open(self.page + ".gz", "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_sidecar_of_deleted_file_removed(self):
+        self.compress()
+        os.remove(self.page)
+        summary = self.compress()
+        self.assertEqual(summary["removed"], [os.path.join("blog", "index.html.gz")])
+        self.assertFalse(os.path.exists(os.path.join(self.root, "blog")))
+
+    def test_only_given_paths_updated(self):
+        self.compress()
+        css = os.path.join(self.root, "index.css")
+        write(self.page, b"<p>changed changed changed changed</p>" * 50)
+        write(css, b"body { margin: 1px }\n" * 40)
+        summary = self.compress(paths=[os.path.join("blog", "index.html")])
+        self.assertEqual(summary["compressed"], [os.path.join("blog", "index.html.gz")])
+        with open(self.page, "rb") as f, gzip.open(self.page + ".gz") as gz:
+            self.assertEqual(gz.read(), f.read())
+        with gzip.open(css + ".gz") as gz:
+            self.assertEqual(gz.read(), b"body { margin: 0 }\n" * 40)
+        self.assertIn("index.css", BuildManifest.load(self.manifest).compressed)
+
+    def test_only_given_removed_paths_pruned(self):
+        self.compress()
+        os.remove(self.page)
+        summary = self.compress(paths=[os.path.join("blog", "index.html")])
+        self.assertEqual(summary["removed"], [os.path.join("blog", "index.html.gz")])
+        self.assertEqual(list(BuildManifest.load(self.manifest).compressed), ["index.css"])
+
+    def test_remove_compressed(self):
+        self.compress()
+        with redirect_stdout(StringIO()):
+            summary = remove_compressed(self.root, self.manifest)
+        self.assertEqual(summary["removed"], [os.path.join("blog", "index.html.gz"), "index.css.gz"])
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+        self.assertEqual(BuildManifest.load(self.manifest).compressed, {})
+        with redirect_stdout(StringIO()):
+            self.assertEqual(remove_compressed(self.root, self.manifest)["removed"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
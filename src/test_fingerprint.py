@@ -0,0 +1,111 @@
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from fingerprint import AssetMap, fingerprinted_path
+from build import build_pages
+from manifest import hash_text
+from staticsync import sync_static
+from template import Template, default_loader
+from testsupport import SiteTestCase, read, write
+
+
+class TestAssetMap(unittest.TestCase):
+    def setUp(self):
+        self.assets = AssetMap({"index.css": "index.abc.css", "images/a.png": "images/a.def.png"})
+
+    def test_fingerprinted_path(self):
+        digest = hash_text("x")
+        self.assertEqual(fingerprinted_path("images/a.png", digest), f"images/a.{digest[:10]}.png")
+
+    def test_rewrite_with_basepath(self):
+        html = '<link href="/site/index.css"><img src="/site/images/a.png" alt="a">'
+        self.assertEqual(
+            self.assets.rewrite(html, "/site/"),
+            '<link href="/site/index.abc.css"><img src="/site/images/a.def.png" alt="a">',
+        )
+
+    def test_rewrite_keeps_query_and_fragment(self):
+        self.assertEqual(
+            self.assets.rewrite('<a href="/index.css?v=1#top">', "/"),
+            '<a href="/index.abc.css?v=1#top">',
+        )
+
+    def test_other_urls_untouched(self):
+        html = '<a href="/other.css"><a href="https://example.com/index.css"><a href="index.css">'
+        self.assertEqual(self.assets.rewrite(html, "/"), html)
+
+    def test_text_that_looks_like_a_tag_untouched(self):
+        html = '<pre><code>&lt;link href="/index.css"&gt;</code></pre><p>src="/images/a.png"</p>'
+        self.assertEqual(self.assets.rewrite(html, "/"), html)
+
+    def test_rewrite_skips_quoted_attribute_values(self):
+        html = '<img alt="a > b" data-x=\'1\' src="/images/a.png">'
+        self.assertEqual(
+            self.assets.rewrite(html, "/"),
+            '<img alt="a > b" data-x=\'1\' src="/images/a.def.png">',
+        )
+
+    def test_template_rewrites_literals_and_slots(self):
+        template = Template('<link href="/index.css">{{ Content }}', "/site/", self.assets)
+        self.assertEqual(
+            template.render({"Content": iter(['<img src="/site/images/a.png">'])}),
+            '<link href="/site/index.abc.css"><img src="/site/images/a.def.png">',
+        )
+
+
+class TestFingerprintedBuild(SiteTestCase):
+    template_text = '<link href="/index.css" rel="stylesheet"><article>{{ Content }}</article>'
+
+    def setUp(self):
+        super().setUp()
+        write(os.path.join(self.static, "index.css"), "body {}")
+        write(os.path.join(self.content, "index.md"), "# Home\n\n![tree](/index.css)")
+
+    def build(self):
+        with redirect_stdout(StringIO()):
+            assets = sync_static(self.static, self.dest, self.manifest, fingerprint=True)
+            asset_map = AssetMap(assets["fingerprints"])
+            pages = build_pages(self.content, self.template, self.dest, "/", self.manifest, assets=asset_map)
+        self.addCleanup(default_loader.set_assets, None)
+        return assets, pages
+
+    def test_assets_renamed_and_links_rewritten(self):
+        assets, _ = self.build()
+        hashed = assets["fingerprints"]["index.css"]
+        self.assertEqual(sorted(os.listdir(self.dest)), sorted([hashed, "index.html"]))
+        html = read(os.path.join(self.dest, "index.html"))
+        self.assertIn(f'href="/{hashed}"', html)
+        self.assertIn(f'src="/{hashed}"', html)
+        self.assertNotIn('"/index.css"', html)
+
+    def test_changed_asset_replaces_old_name_and_rebuilds_pages(self):
+        first, _ = self.build()
+        write(os.path.join(self.static, "index.css"), "body { color: red }")
+        second, pages = self.build()
+        old, new = first["fingerprints"]["index.css"], second["fingerprints"]["index.css"]
+        self.assertNotEqual(old, new)
+        self.assertEqual(second["removed"], [old])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, old)))
+        self.assertEqual(len(pages["built"]), 1)
+        self.assertIn(new, read(os.path.join(self.dest, "index.html")))
+
+    def test_code_and_prose_mentioning_assets_untouched(self):
+        write(
+            os.path.join(self.content, "index.md"),
+            '# Home\n\n```\n<link href="/index.css">\n```\n\nWrite src="/index.css" to load it.',
+        )
+        self.build()
+        html = read(os.path.join(self.dest, "index.html"))
+        self.assertIn('<code>&lt;link href="/index.css"&gt;', html)
+        self.assertIn('Write src="/index.css" to load it.', html)
+
+    def test_unchanged_assets_skip_rebuild(self):
+        self.build()
+        _, pages = self.build()
+        self.assertEqual(pages["built"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
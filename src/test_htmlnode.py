@@ -1,5 +1,5 @@
 import unittest
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, escape_attribute, escape_text
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -24,6 +24,16 @@ class TestHTMLNode(unittest.TestCase):
         result = node.props_to_html()
         self.assertEqual(result, "")
 
+    def test_escape_fast_path_returns_same_object(self):
+        text = "Plain prose, with 'quotes' and \"double quotes\"."
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attribute("/images/a.png"), "/images/a.png")
+
+    def test_escape_modes(self):
+        self.assertEqual(escape_text("<a href='x'>&"), "&lt;a href='x'&gt;&amp;")
+        self.assertEqual(escape_attribute("<a href='x'>&\""), "&lt;a href=&#x27;x&#x27;&gt;&amp;&quot;")
+        self.assertEqual(escape_text("&amp;"), "&amp;amp;")
+
     def test_to_html_not_implemented(self):
         node = HTMLNode(tag="p", value="Text")
         with self.assertRaises(NotImplementedError):
@@ -36,6 +46,12 @@ class TestHTMLNode(unittest.TestCase):
         self.assertIn("value=Hello", repr_str)
         self.assertIn("class", repr_str)
 
+    def test_slots_and_interned_tag(self):
+        tag = "".join(["s", "pan"])
+        node = HTMLNode(tag=tag, value="x")
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertIs(node.tag, HTMLNode(tag="span").tag)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
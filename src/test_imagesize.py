@@ -0,0 +1,227 @@
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+from contextlib import redirect_stdout
+from io import StringIO
+
+from fingerprint import AssetMap
+from imagesize import ImageSizes, read_image_size, scan_image_sizes
+from build import build_pages
+from main import parse_args
+from manifest import BuildManifest
+from template import Template, default_loader
+from testsupport import SiteTestCase, write
+from watch import rebuild_changes
+
+
+def png_bytes(width, height):
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    chunk = struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr
+    return b"\x89PNG\r\n\x1a\n" + chunk + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+
+
+def gif_bytes(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00\x00\x00;"
+
+
+def jpeg_bytes(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9)
+    # A DHT segment sits in the SOF marker range but carries no dimensions
+    dht = b"\xff\xc4" + struct.pack(">H", 5) + b"\x00\x00\x00"
+    sof = b"\xff\xc2" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + dht + sof + b"\xff\xd9"
+
+
+class TestReadImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def size_of(self, data):
+        path = os.path.join(self.tmp.name, "image")
+        write(path, data)
+        return read_image_size(path)
+
+    def test_png(self):
+        self.assertEqual(self.size_of(png_bytes(928, 468)), (928, 468))
+
+    def test_gif(self):
+        self.assertEqual(self.size_of(gif_bytes(300, 2)), (300, 2))
+
+    def test_jpeg_skips_to_frame(self):
+        self.assertEqual(self.size_of(jpeg_bytes(1024, 768)), (1024, 768))
+
+    def test_unknown_or_truncated(self):
+        self.assertIsNone(self.size_of(b"not an image"))
+        self.assertIsNone(self.size_of(jpeg_bytes(10, 10)[:30]))
+
+    def test_truncated_header(self):
+        self.assertIsNone(self.size_of(png_bytes(10, 10)[:20]))
+        self.assertIsNone(self.size_of(gif_bytes(10, 10)[:8]))
+
+
+class TestAnnotator(unittest.TestCase):
+    def setUp(self):
+        self.images = ImageSizes({"images/a.png": (640, 480)})
+
+    def test_first_image_eager_rest_lazy(self):
+        annotate = self.images.annotator("/")
+        self.assertEqual(
+            annotate('<img src="/images/a.png" alt="a"></img>'),
+            '<img src="/images/a.png" alt="a" width="640" height="480"></img>',
+        )
+        self.assertEqual(
+            annotate('<p><img src="/images/a.png" alt=">"></img><img src="/other.png"></p>'),
+            '<p><img src="/images/a.png" alt=">" width="640" height="480" loading="lazy" decoding="async"></img>'
+            '<img src="/other.png" loading="lazy" decoding="async"></p>',
+        )
+
+    def test_existing_attributes_kept(self):
+        annotate = self.images.annotator("/")
+        annotate("<img>")
+        self.assertEqual(
+            annotate('<img src="/images/a.png" width="10" loading="eager" />'),
+            '<img src="/images/a.png" width="10" loading="eager" decoding="async" />',
+        )
+
+    def test_attribute_names_not_values(self):
+        annotate = self.images.annotator("/")
+        annotate("<img>")
+        self.assertEqual(
+            annotate('<img src="/images/a.png" alt="width=3 loading=eager" data-height="1">'),
+            '<img src="/images/a.png" alt="width=3 loading=eager" data-height="1" width="640" height="480"'
+            ' loading="lazy" decoding="async">',
+        )
+        self.assertEqual(
+            annotate("<img src=\"/images/a.png\" HEIGHT='5' Decoding=sync>"),
+            "<img src=\"/images/a.png\" HEIGHT='5' Decoding=sync loading=\"lazy\">",
+        )
+
+    def test_basepath_and_fingerprinted_urls(self):
+        assets = AssetMap({"images/a.png": "images/a.0123456789.png"})
+        annotate = self.images.annotator("/site/", assets)
+        self.assertIn('width="640"', annotate('<img src="/site/images/a.0123456789.png">'))
+        self.assertNotIn("width", self.images.annotator("/")('<img src="/site/images/a.png">'))
+
+    def test_template_counts_images_across_literals_and_slots(self):
+        template = Template('<img src="/logo.png">{{ Content }}', "/", images=self.images)
+        html = template.render({"Content": iter(['<img src="/images/a.png" alt="a"></img>'])})
+        self.assertEqual(
+            html,
+            '<img src="/logo.png"><img src="/images/a.png" alt="a" width="640" height="480" '
+            'loading="lazy" decoding="async"></img>',
+        )
+        # Each render is a new page, so its first image is eager again
+        self.assertTrue(template.render({}).startswith('<img src="/logo.png">'))
+
+
+class TestImageSizeBuild(SiteTestCase):
+    template_text = "<article>{{ Content }}</article>"
+
+    def setUp(self):
+        super().setUp()
+        write(os.path.join(self.static, "images", "a.png"), png_bytes(40, 30))
+        write(os.path.join(self.static, "images", "b.gif"), gif_bytes(20, 10))
+        write(os.path.join(self.content, "index.md"), "# Home\n\n![a](/images/a.png)\n\n![b](/images/b.gif)")
+
+    def build(self, **kwargs):
+        with redirect_stdout(StringIO()):
+            images = scan_image_sizes(self.static, self.manifest)
+            pages = build_pages(self.content, self.template, self.dest, "/", self.manifest, images=images, **kwargs)
+        self.addCleanup(default_loader.set_images, None)
+        return images, pages
+
+    def read_page(self):
+        with open(os.path.join(self.dest, "index.html")) as f:
+            return f.read()
+
+    def test_pages_annotated(self):
+        self.build()
+        html = self.read_page()
+        self.assertIn('<img src="/images/a.png" alt="a" width="40" height="30"></img>', html)
+        self.assertIn(
+            '<img src="/images/b.gif" alt="b" width="20" height="10" loading="lazy" decoding="async"></img>', html
+        )
+
+    def test_parallel_build_matches(self):
+        write(os.path.join(self.content, "other.md"), "# Other\n\n![b](/images/b.gif)")
+        self.build(jobs=2)
+        self.assertIn('width="40"', self.read_page())
+
+    def test_sizes_cached_by_hash(self):
+        images, _ = self.build()
+        manifest = BuildManifest.load(self.manifest)
+        self.assertEqual(manifest.images["images/a.png"]["size"], [40, 30])
+        # A copy with the same content reuses the cached size without parsing
+        manifest.images["images/a.png"]["size"] = [1, 2]
+        manifest.images["images/a.png"]["mtime_ns"] = 0
+        manifest.save()
+        self.assertEqual(scan_image_sizes(self.static, self.manifest).sizes["images/a.png"], (1, 2))
+
+    def test_resized_image_rebuilds_pages(self):
+        self.build()
+        _, pages = self.build()
+        self.assertEqual(pages["built"], [])
+        write(os.path.join(self.static, "images", "a.png"), png_bytes(80, 60))
+        _, pages = self.build()
+        self.assertEqual(len(pages["built"]), 1)
+        self.assertIn('width="80" height="60"', self.read_page())
+
+    def test_resized_image_rebuilds_only_pages_showing_it(self):
+        other = os.path.join(self.content, "other.md")
+        write(other, "# Other\n\n![b](/images/b.gif)")
+        for width, kwargs in enumerate(({}, {"jobs": 2}, {"queue_depth": 2}), 50):
+            self.build(**kwargs)
+            write(os.path.join(self.static, "images", "b.gif"), gif_bytes(width, 10))
+            _, pages = self.build(**kwargs)
+            self.assertEqual(len(pages["built"]), 2, kwargs)
+            write(os.path.join(self.static, "images", "a.png"), png_bytes(width, 30))
+            _, pages = self.build(**kwargs)
+            self.assertEqual(pages["built"], [os.path.join(self.content, "index.md")], kwargs)
+
+    def test_unreferenced_image_skips_rebuild(self):
+        self.build()
+        write(os.path.join(self.static, "images", "c.png"), png_bytes(10, 10))
+        _, pages = self.build()
+        self.assertEqual(pages["built"], [])
+
+    def test_added_image_rebuilds_pages_showing_it(self):
+        write(os.path.join(self.content, "other.md"), "# Other\n\n![c](/images/c.png)")
+        self.build()
+        write(os.path.join(self.static, "images", "c.png"), png_bytes(10, 10))
+        _, pages = self.build()
+        self.assertEqual(pages["built"], [os.path.join(self.content, "other.md")])
+        with open(os.path.join(self.dest, "other.html")) as f:
+            self.assertIn('width="10" height="10"', f.read())
+
+    def test_watch_rebuilds_pages_showing_resized_image(self):
+        write(os.path.join(self.content, "other.md"), "# Other\n\n![b](/images/b.gif)")
+        self.build()
+        home = os.path.join(self.content, "index.md")
+        image = os.path.join(self.static, "images", "a.png")
+
+        def rebuild(path):
+            with redirect_stdout(StringIO()):
+                return rebuild_changes(
+                    {path}, self.content, self.static, self.template, self.dest, "/", self.manifest,
+                    image_sizes=True,
+                )
+
+        write(image, png_bytes(80, 60))
+        self.assertEqual(rebuild(image)["pages"], [home])
+        self.assertIn('width="80" height="60"', self.read_page())
+        # A page regenerated on its own records the images it now shows
+        write(home, "# Home\n\n![b](/images/b.gif)")
+        self.assertEqual(rebuild(home)["pages"], [home])
+        write(image, png_bytes(40, 30))
+        self.assertEqual(rebuild(image)["pages"], [])
+
+    def test_opt_out_flag(self):
+        self.assertTrue(parse_args([]).image_sizes)
+        self.assertFalse(parse_args(["--no-image-sizes"]).image_sizes)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+import random
+import unittest
+from inline import tokenize_inline
+from splitter import text_to_textnodes_multipass
+from textnode import TextNode, TextType
+
+
+def outcome(func, text):
+    try:
+        return func(text)
+    except ValueError as e:
+        return str(e)
+
+
+class TestTokenizeInline(unittest.TestCase):
+    def test_all_types(self):
+        text = "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)"
+        self.assertEqual(
+            tokenize_inline(text),
+            [
+                TextNode("This is ", TextType.TEXT),
+                TextNode("text", TextType.BOLD),
+                TextNode(" with an ", TextType.TEXT),
+                TextNode("italic", TextType.ITALIC),
+                TextNode(" word and a ", TextType.TEXT),
+                TextNode("code block", TextType.CODE),
+                TextNode(" and an ", TextType.TEXT),
+                TextNode("obi wan image", TextType.IMAGE, "https://i.imgur.com/fJRm4Vk.jpeg"),
+                TextNode(" and a ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "https://boot.dev"),
+            ],
+        )
+
+    def test_empty(self):
+        self.assertEqual(tokenize_inline(""), [])
+
+    def test_delimited_content_not_parsed(self):
+        self.assertEqual(
+            tokenize_inline("**a _b_ [c](d)**"),
+            [TextNode("a _b_ [c](d)", TextType.BOLD)],
+        )
+
+    def test_empty_spans_kept(self):
+        self.assertEqual(
+            tokenize_inline("a____b"),
+            [
+                TextNode("a", TextType.TEXT),
+                TextNode("", TextType.ITALIC),
+                TextNode("", TextType.ITALIC),
+                TextNode("b", TextType.TEXT),
+            ],
+        )
+
+    def test_bold_error_takes_precedence(self):
+        with self.assertRaisesRegex(ValueError, r"'\*\*'"):
+            tokenize_inline("_a **b")
+
+    def test_italic_broken_by_bold(self):
+        with self.assertRaisesRegex(ValueError, "'_'"):
+            tokenize_inline("_a **b** c_")
+
+    def test_code_broken_by_italic(self):
+        with self.assertRaisesRegex(ValueError, "'`'"):
+            tokenize_inline("`a_b_c`")
+
+    def test_delimiter_inside_link_splits_it(self):
+        with self.assertRaisesRegex(ValueError, "'_'"):
+            tokenize_inline("[a](http://x_y)")
+
+    def test_image_inside_link_url_wins(self):
+        self.assertEqual(
+            tokenize_inline("[a](![b](c)"),
+            [TextNode("[a](", TextType.TEXT), TextNode("b", TextType.IMAGE, "c")],
+        )
+
+    def test_matches_multipass_on_random_input(self):
+        rng = random.Random(4)
+        alphabet = ["*", "_", "`", "[", "]", "(", ")", "!", "a", " ", "**", "![", "]("]
+        for _ in range(20000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+            self.assertEqual(
+                outcome(tokenize_inline, text),
+                outcome(text_to_textnodes_multipass, text),
+                repr(text),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
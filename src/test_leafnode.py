@@ -1,5 +1,6 @@
 import unittest
 from leafnode import LeafNode
+from rawnode import RawNode
 
 
 class TestLeafNode(unittest.TestCase):
@@ -19,6 +20,23 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("b", "Bold text")
         self.assertEqual(node.to_html(), "<b>Bold text</b>")
 
+    def test_leaf_escapes_text(self):
+        node = LeafNode("code", 'if a < b && c > "d"')
+        self.assertEqual(node.to_html(), '<code>if a &lt; b &amp;&amp; c &gt; "d"</code>')
+        self.assertEqual(LeafNode(None, "< Back").to_html(), "&lt; Back")
+
+    def test_leaf_escapes_attributes(self):
+        node = LeafNode("img", "", {"src": "/a.png?x=1&y=2", "alt": 'say "hi" & <wave>'})
+        self.assertEqual(
+            node.to_html(),
+            '<img src="/a.png?x=1&amp;y=2" alt="say &quot;hi&quot; &amp; &lt;wave&gt;"></img>',
+        )
+
+    def test_raw_node_not_escaped(self):
+        node = RawNode("<p>a &amp; b</p>")
+        self.assertEqual(node.to_html(), "<p>a &amp; b</p>")
+        self.assertEqual(list(node.iter_html()), ["<p>a &amp; b</p>"])
+
     def test_leaf_no_value_raises(self):
         with self.assertRaises(ValueError):
             LeafNode("p", None)
@@ -0,0 +1,220 @@
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+
+from unittest import mock
+
+import build
+import pipeline
+from build import build_pages, render_page_to_file
+from main import parse_args, write_changes
+from output import PageBuildError, write_atomic
+from timelimit import time_limits_supported
+from testsupport import SiteTestCase, TEMPLATE, read_tree, write
+
+
+class TestParallelBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(20):
+            write(
+                os.path.join(self.content, f"section{i % 3}", f"page{i}", "index.md"),
+                f"# Page {i}\n\nSome **bold** text and a [link](/page{i}).",
+            )
+
+    def build(self, dest, jobs):
+        manifest = os.path.join(self.root, f"{os.path.basename(dest)}.json")
+        with redirect_stdout(StringIO()):
+            return build_pages(self.content, self.template, dest, "/base/", manifest, jobs=jobs)
+
+    def test_parallel_matches_sequential(self):
+        seq_dest = os.path.join(self.root, "seq")
+        par_dest = os.path.join(self.root, "par")
+        self.build(seq_dest, jobs=1)
+        summary = self.build(par_dest, jobs=4)
+        self.assertEqual(len(summary["built"]), 20)
+        self.assertEqual(read_tree(seq_dest), read_tree(par_dest))
+
+    def test_parallel_error_names_source(self):
+        bad = os.path.join(self.content, "section1", "page4", "index.md")
+        write(bad, "# Broken\n\nUnclosed **bold")
+        with self.assertRaises(PageBuildError) as ctx:
+            self.build(os.path.join(self.root, "out"), jobs=4)
+        self.assertEqual(ctx.exception.source, bad)
+        self.assertIn(bad, str(ctx.exception))
+
+    def test_parallel_error_is_earliest_in_build_order(self):
+        # The first page fails only after rendering a long body, well after
+        # the later page has failed
+        first = os.path.join(self.content, "section0", "page0", "index.md")
+        later = os.path.join(self.content, "section2", "page5", "index.md")
+        write(first, "# Slow\n\n" + "Some **bold** text.\n\n" * 5000 + "Unclosed **bold")
+        write(later, "# Broken\n\nUnclosed **bold")
+        with self.assertRaises(PageBuildError) as ctx:
+            self.build(os.path.join(self.root, "out"), jobs=4)
+        self.assertEqual(ctx.exception.source, first)
+
+    def test_sequential_error_names_source(self):
+        bad = os.path.join(self.content, "section0", "page0", "index.md")
+        write(bad, "No title here")
+        with self.assertRaises(PageBuildError) as ctx:
+            self.build(os.path.join(self.root, "out"), jobs=1)
+        self.assertEqual(ctx.exception.source, bad)
+
+    def test_rendering_starts_before_walk_ends(self):
+        events = []
+        iter_pages = build.iter_pages
+
+        def walked(*args):
+            for page in iter_pages(*args):
+                events.append("found")
+                yield page
+
+        def logged(render):
+            def rendered(*args, **kwargs):
+                events.append("rendered")
+                return render(*args, **kwargs)
+            return rendered
+
+        for kwargs in ({"jobs": 1}, {"jobs": 1, "queue_depth": 2}):
+            events.clear()
+            with mock.patch.object(build, "iter_pages", walked), \
+                    mock.patch.object(build, "render_page_to_file", logged(build.render_page_to_file)), \
+                    mock.patch.object(pipeline, "render_page", logged(pipeline.render_page)), \
+                    redirect_stdout(StringIO()):
+                dest = os.path.join(self.root, f"out{len(kwargs)}")
+                build_pages(self.content, self.template, dest, "/base/", dest + ".json", **kwargs)
+            self.assertEqual(events.count("rendered"), 20)
+            self.assertLess(events.index("rendered"), 5, kwargs)
+
+    @unittest.skipUnless(time_limits_supported(), "interval timers are not available")
+    def test_page_timeout_names_slow_source(self):
+        slow = os.path.join(self.content, "section2", "page5", "index.md")
+        write(slow, "# Slow\n\n" + "[a](b) " * 200000)
+        for jobs in (1, 4):
+            manifest = os.path.join(self.root, f"timeout{jobs}.json")
+            with self.assertRaises(PageBuildError) as ctx, redirect_stdout(StringIO()):
+                build_pages(self.content, self.template, os.path.join(self.root, f"out{jobs}"), "/base/",
+                            manifest, jobs=jobs, page_timeout=0.05)
+            self.assertEqual(ctx.exception.source, slow, jobs)
+            self.assertIn("PageTimeoutError", ctx.exception.message)
+
+
+class TestStreamingRender(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write(self.template, TEMPLATE)
+        self.src = os.path.join(self.tmp.name, "big.md")
+        blocks = [f"Paragraph {i} with **bold** and `code`, then _more_ text." for i in range(5000)]
+        write(self.src, "# Big\n\n" + "\n\n".join(blocks))
+
+    def render(self, name, threshold):
+        dest = os.path.join(self.tmp.name, name)
+        with mock.patch.object(build, "STREAMING_THRESHOLD", threshold):
+            render_page_to_file(self.src, self.template, dest, "/base/")
+        with open(dest) as f:
+            return f.read()
+
+    def test_streamed_output_identical(self):
+        self.assertEqual(self.render("streamed.html", 0), self.render("whole.html", 1 << 40))
+
+    def test_title_escaped(self):
+        write(self.src, "# Fish & <Chips>\n\nText")
+        for threshold in (0, 1 << 40):
+            self.assertIn("<title>Fish &amp; &lt;Chips&gt;</title>", self.render("page.html", threshold))
+
+    def test_streamed_memory_bounded_by_block(self):
+        size = os.path.getsize(self.src)
+        dest = os.path.join(self.tmp.name, "streamed.html")
+        tracemalloc.start()
+        try:
+            with mock.patch.object(build, "STREAMING_THRESHOLD", 0):
+                render_page_to_file(self.src, self.template, dest, "/base/")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, size // 2)
+
+
+class TestOutputChanges(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dest = os.path.join(self.tmp.name, "docs")
+
+    def test_write_atomic_statuses(self):
+        path = os.path.join(self.dest, "a.html")
+        output_hash, status = write_atomic(path, ["<p>", "x", "</p>"])
+        self.assertEqual(status, "added")
+        self.assertEqual(write_atomic(path, ["<p>x</p>"], output_hash), (output_hash, "unchanged"))
+        self.assertEqual(write_atomic(path, ["<p>y</p>"], output_hash)[1], "changed")
+        self.assertEqual(os.listdir(self.dest), ["a.html"])
+
+    def test_write_changes(self):
+        path = os.path.join(self.tmp.name, "changes.json")
+        assets = {"copied": [os.path.join("images", "a.png"), "index.css"], "added": ["index.css"],
+                  "unchanged": [], "removed": ["old.css"]}
+        outputs = {
+            "added": [os.path.join(self.dest, "blog", "index.html")],
+            "changed": [os.path.join(self.dest, "index.html")],
+            "unchanged": [os.path.join(self.dest, "about.html")],
+            "deleted": [],
+        }
+        write_changes(path, self.dest, assets, outputs)
+        with open(path) as f:
+            self.assertEqual(json.load(f), {
+                "added": ["blog/index.html", "index.css"],
+                "changed": ["images/a.png", "index.html"],
+                "deleted": ["old.css"],
+            })
+
+
+class TestParseArgs(unittest.TestCase):
+    def test_defaults(self):
+        args = parse_args([])
+        self.assertEqual(args.basepath, "/")
+        self.assertEqual(args.jobs, 1)
+
+    def test_basepath_and_jobs(self):
+        args = parse_args(["/static_site/", "--jobs", "3"])
+        self.assertEqual(args.basepath, "/static_site/")
+        self.assertEqual(args.jobs, 3)
+
+    def test_jobs_zero_uses_cpu_count(self):
+        self.assertGreaterEqual(parse_args(["-j", "0"]).jobs, 1)
+
+    def test_profile_report_path(self):
+        self.assertIsNone(parse_args([]).profile)
+        self.assertEqual(parse_args(["--profile"]).profile, "build-profile.json")
+        self.assertEqual(parse_args(["--profile=out.json"]).profile, "out.json")
+
+    def test_pipeline_depth(self):
+        self.assertIsNone(parse_args([]).pipeline)
+        self.assertEqual(parse_args(["--pipeline"]).pipeline, 8)
+        self.assertEqual(parse_args(["--pipeline", "3", "--readers", "2"]).pipeline, 3)
+        with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+            parse_args(["--pipeline", "-j", "4"])
+
+    def test_gzip_level(self):
+        self.assertIsNone(parse_args([]).gzip)
+        self.assertEqual(parse_args(["--gzip"]).gzip, 9)
+        self.assertEqual(parse_args(["--gzip", "6"]).gzip, 6)
+        with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+            parse_args(["--gzip", "12"])
+
+    def test_page_timeout(self):
+        self.assertIsNone(parse_args([]).page_timeout)
+        self.assertEqual(parse_args(["--page-timeout", "2.5"]).page_timeout, 2.5)
+        for argv in (["--page-timeout", "0"], ["--page-timeout", "5", "--pipeline"]):
+            with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+                parse_args(argv)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,178 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import build
+from manifest import BuildManifest, generator_fingerprint, hash_file, hash_text
+from build import build_pages
+from testsupport import SiteTestCase, TEMPLATE, write
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "manifest.json")
+
+    def test_load_missing_returns_empty(self):
+        manifest = BuildManifest.load(self.path)
+        self.assertEqual(manifest.pages, {})
+        self.assertIsNone(manifest.basepath_hash)
+
+    def test_load_corrupt_returns_empty(self):
+        write(self.path, "{not json")
+        manifest = BuildManifest.load(self.path)
+        self.assertEqual(manifest.pages, {})
+
+    def test_round_trip(self):
+        manifest = BuildManifest(self.path)
+        manifest.basepath_hash = "b"
+        manifest.record("content/index.md", "abc", "docs/index.html", "t")
+        manifest.save()
+
+        loaded = BuildManifest.load(self.path)
+        self.assertEqual(loaded.basepath_hash, "b")
+        self.assertEqual(loaded.pages["content/index.md"]["hash"], "abc")
+        self.assertEqual(loaded.pages["content/index.md"]["template"], "t")
+
+    def test_needs_build_on_template_change(self):
+        dest = os.path.join(self.tmp.name, "index.html")
+        write(dest, "")
+        manifest = BuildManifest(self.path)
+        manifest.basepath_hash = "b"
+        manifest.record("index.md", "abc", dest, "t")
+        self.assertFalse(manifest.needs_build("index.md", "abc", dest, "t", "b"))
+        self.assertTrue(manifest.needs_build("index.md", "abc", dest, "t2", "b"))
+        self.assertTrue(manifest.needs_build("index.md", "abc", dest, "t", "b2"))
+        self.assertTrue(manifest.needs_build("index.md", "abd", dest, "t", "b"))
+
+    def test_needs_build_when_output_missing(self):
+        dest = os.path.join(self.tmp.name, "missing.html")
+        manifest = BuildManifest(self.path)
+        manifest.record("index.md", "abc", dest, None)
+        self.assertTrue(manifest.needs_build("index.md", "abc", dest, None, None))
+
+    def test_hash_helpers(self):
+        file_path = os.path.join(self.tmp.name, "f.txt")
+        write(file_path, "hello")
+        self.assertEqual(hash_file(file_path), hash_text("hello"))
+
+    def test_generator_fingerprint_covers_every_module_but_tests(self):
+        src = os.path.join(self.tmp.name, "src")
+        for name in ("splitter.py", "template.py", "test_template.py", "testsupport.py"):
+            write(os.path.join(src, name), "")
+        first = generator_fingerprint(src)
+        # template.py is not one of the block cache's renderer modules
+        write(os.path.join(src, "template.py"), "# changed")
+        second = generator_fingerprint(src)
+        self.assertNotEqual(second, first)
+        write(os.path.join(src, "test_template.py"), "# changed")
+        write(os.path.join(src, "testsupport.py"), "# changed")
+        self.assertEqual(generator_fingerprint(src), second)
+        self.assertEqual(len(generator_fingerprint()), 64)
+
+
+class TestIncrementalBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        write(os.path.join(self.content, "index.md"), "# Home\n\nHello")
+        write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nBody")
+
+    def build(self, basepath="/"):
+        with redirect_stdout(StringIO()):
+            return build_pages(self.content, self.template, self.dest, basepath, self.manifest)
+
+    def test_first_build_builds_everything(self):
+        summary = self.build()
+        self.assertEqual(len(summary["built"]), 2)
+        self.assertEqual(summary["skipped"], [])
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "blog", "post", "index.html")))
+
+    def test_second_build_skips_everything(self):
+        self.build()
+        summary = self.build()
+        self.assertEqual(summary["built"], [])
+        self.assertEqual(len(summary["skipped"]), 2)
+
+    def test_changed_source_rebuilds_only_that_page(self):
+        self.build()
+        write(os.path.join(self.content, "index.md"), "# Home\n\nChanged")
+        summary = self.build()
+        self.assertEqual(summary["built"], [os.path.join(self.content, "index.md")])
+        with open(os.path.join(self.dest, "index.html")) as f:
+            self.assertIn("Changed", f.read())
+
+    def test_template_change_rebuilds_everything(self):
+        self.build()
+        write(self.template, TEMPLATE + "<!-- v2 -->")
+        self.assertEqual(len(self.build()["built"]), 2)
+
+    def test_section_layout_change_rebuilds_only_that_section(self):
+        self.build()
+        write(os.path.join(self.content, "blog", "layout.html"), "<main>{{ Content }}</main>")
+        summary = self.build()
+        self.assertEqual(summary["built"], [os.path.join(self.content, "blog", "post", "index.md")])
+        with open(os.path.join(self.dest, "blog", "post", "index.html")) as f:
+            self.assertEqual(f.read(), "<main><div><h1>Post</h1><p>Body</p></div></main>")
+
+    def test_basepath_change_rebuilds_everything(self):
+        self.build()
+        self.assertEqual(len(self.build("/site/")["built"]), 2)
+
+    def test_generator_change_rebuilds_everything(self):
+        src = os.path.join(self.tmp.name, "src")
+        write(os.path.join(src, "imagesize.py"), "")
+        with mock.patch.object(build, "generator_fingerprint", lambda: generator_fingerprint(src)):
+            self.build()
+            self.assertEqual(self.build()["built"], [])
+            # A module outside the block cache's renderer modules
+            write(os.path.join(src, "imagesize.py"), "# changed")
+            self.assertEqual(len(self.build()["built"]), 2)
+
+    def test_removed_source_deletes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        summary = self.build()
+        self.assertEqual(len(summary["removed"]), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+        self.assertEqual(
+            summary["outputs"]["deleted"], [os.path.join(self.dest, "blog", "post", "index.html")]
+        )
+
+    def test_identical_output_not_rewritten(self):
+        self.build()
+        home = os.path.join(self.dest, "index.html")
+        os.utime(home, ns=(1, 1))
+        # Extra blank lines change the source but not the rendered page
+        write(os.path.join(self.content, "index.md"), "# Home\n\n\n\nHello\n")
+        summary = self.build()
+        self.assertEqual(summary["built"], [os.path.join(self.content, "index.md")])
+        self.assertEqual(summary["outputs"]["unchanged"], [home])
+        self.assertEqual(summary["outputs"]["changed"], [])
+        self.assertEqual(os.stat(home).st_mtime_ns, 1)
+
+    def test_output_statuses(self):
+        summary = self.build()
+        self.assertEqual(len(summary["outputs"]["added"]), 2)
+        write(os.path.join(self.content, "index.md"), "# Home\n\nChanged")
+        summary = self.build()
+        self.assertEqual(summary["outputs"]["changed"], [os.path.join(self.dest, "index.html")])
+        self.assertEqual(summary["outputs"]["added"], [])
+
+    def test_output_hash_kept_for_skipped_pages(self):
+        self.build()
+        manifest = BuildManifest.load(self.manifest)
+        src = os.path.join(self.content, "index.md")
+        dest = os.path.join(self.dest, "index.html")
+        expected = hash_file(dest)
+        self.assertEqual(manifest.output_hash(src, dest), expected)
+        self.build()
+        self.assertEqual(BuildManifest.load(self.manifest).output_hash(src, dest), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -1,5 +1,11 @@
+import random
 import unittest
-from splitter import markdown_to_blocks
+from io import StringIO
+from splitter import Block, BlockType, iter_markdown_blocks, markdown_to_blocks
+
+
+def texts(blocks):
+    return [block.text for block in blocks]
 
 
 class TestMarkdownToBlocks(unittest.TestCase):
@@ -13,7 +19,7 @@ This is the same paragraph on a new line
 - This is a list
 - with items
 """
-        blocks = markdown_to_blocks(md)
+        blocks = texts(markdown_to_blocks(md))
         self.assertEqual(
             blocks,
             [
@@ -25,7 +31,7 @@ This is the same paragraph on a new line
 
     def test_markdown_to_blocks_single_block(self):
         md = "This is a single block"
-        blocks = markdown_to_blocks(md)
+        blocks = texts(markdown_to_blocks(md))
         self.assertEqual(blocks, ["This is a single block"])
 
     def test_markdown_to_blocks_multiple_blocks(self):
@@ -34,7 +40,7 @@ This is the same paragraph on a new line
 Paragraph 1
 
 Paragraph 2"""
-        blocks = markdown_to_blocks(md)
+        blocks = texts(markdown_to_blocks(md))
         self.assertEqual(
             blocks,
             ["# Heading", "Paragraph 1", "Paragraph 2"],
@@ -42,7 +48,7 @@ Paragraph 2"""
 
     def test_markdown_to_blocks_with_leading_trailing_whitespace(self):
         md = "   This is a block   \n\n   Another block   "
-        blocks = markdown_to_blocks(md)
+        blocks = texts(markdown_to_blocks(md))
         self.assertEqual(
             blocks,
             ["This is a block", "Another block"],
@@ -50,7 +56,7 @@ Paragraph 2"""
 
     def test_markdown_to_blocks_empty_blocks(self):
         md = "Block 1\n\n\n\nBlock 2"
-        blocks = markdown_to_blocks(md)
+        blocks = texts(markdown_to_blocks(md))
         self.assertEqual(blocks, ["Block 1", "Block 2"])
 
     def test_markdown_to_blocks_list(self):
@@ -59,7 +65,7 @@ Paragraph 2"""
 - Item 3
 
 Next paragraph"""
-        blocks = markdown_to_blocks(md)
+        blocks = texts(markdown_to_blocks(md))
         self.assertEqual(
             blocks,
             ["- Item 1\n- Item 2\n- Item 3", "Next paragraph"],
@@ -67,7 +73,7 @@ Next paragraph"""
 
     def test_markdown_to_blocks_heading_and_code(self):
         md = "# Heading\n\n```\ncode block\n```\n\nText"
-        blocks = markdown_to_blocks(md)
+        blocks = texts(markdown_to_blocks(md))
         self.assertEqual(
             blocks,
             ["# Heading", "```\ncode block\n```", "Text"],
@@ -75,17 +81,42 @@ Next paragraph"""
 
     def test_markdown_to_blocks_only_whitespace(self):
         md = "   \n\n   \n\n   "
-        blocks = markdown_to_blocks(md)
+        blocks = texts(markdown_to_blocks(md))
         self.assertEqual(blocks, [])
 
     def test_markdown_to_blocks_multiline_paragraph(self):
         md = "Line 1\nLine 2\nLine 3\n\nNew block"
-        blocks = markdown_to_blocks(md)
+        blocks = texts(markdown_to_blocks(md))
         self.assertEqual(
             blocks,
             ["Line 1\nLine 2\nLine 3", "New block"],
         )
 
+    def test_blocks_carry_type_and_lines(self):
+        md = "## Title\n\n> a\n>b\n\n```\nx\ny\n```\n\n1. one\n3. three"
+        self.assertEqual(
+            markdown_to_blocks(md),
+            [
+                Block("## Title", BlockType.HEADING, None),
+                Block("> a\n>b", BlockType.QUOTE, ["> a", ">b"]),
+                Block("```\nx\ny\n```", BlockType.CODE, None),
+                Block("1. one\n3. three", BlockType.PARAGRAPH, ["1. one", "3. three"]),
+            ],
+        )
+
+    def test_iter_blocks_from_file_object(self):
+        md = "# Title\n\nLine 1\nLine 2\n\n\n\n- a\n- b\n"
+        self.assertEqual(list(iter_markdown_blocks(StringIO(md))), markdown_to_blocks(md))
+
+    def test_iter_blocks_matches_split(self):
+        rng = random.Random(3)
+        pieces = ["a", "b c", "", "", " ", "  \t", "\r", "# h", "> q"]
+        for _ in range(2000):
+            md = "\n".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            self.assertEqual(
+                list(iter_markdown_blocks(StringIO(md))), markdown_to_blocks(md), repr(md)
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
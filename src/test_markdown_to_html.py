@@ -1,5 +1,6 @@
 import unittest
-from splitter import markdown_to_html_node
+from io import StringIO
+from splitter import iter_markdown_html, markdown_to_html_node
 
 
 class TestMarkdownToHtmlNode(unittest.TestCase):
@@ -105,6 +106,22 @@ This is a paragraph.
         self.assertIn("<li>Item with <b>bold</b></li>", html)
         self.assertIn("<li>Item with <i>italic</i></li>", html)
 
+    def test_basepath_applies_to_links_not_code(self):
+        md = 'See [home](/) and ![pic](/a.png)\n\n```\n<a href="/x">raw</a>\n```'
+        node = markdown_to_html_node(md, "/site/")
+        self.assertEqual(
+            node.to_html(),
+            '<div><p>See <a href="/site/">home</a> and <img src="/site/a.png" alt="pic"></img></p>'
+            '<pre><code>&lt;a href="/x"&gt;raw&lt;/a&gt;</code></pre></div>',
+        )
+
+    def test_iter_markdown_html_matches_tree(self):
+        md = "# Title\n\nSome **bold** [link](/a)\n\n```\ncode\n```\n\n1. one\n2. two\n\n> quote"
+        self.assertEqual(
+            "".join(iter_markdown_html(StringIO(md), "/site/")),
+            markdown_to_html_node(md, "/site/").to_html(),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
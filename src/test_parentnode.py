@@ -1,6 +1,25 @@
+import random
+import sys
 import unittest
+from io import StringIO
 from parentnode import ParentNode
 from leafnode import LeafNode
+from benchmark import render_recursive
+
+
+def random_tree(rng, depth=6):
+    """
+    A random mix of leaves and nested parents.
+    """
+    children = []
+    for _ in range(rng.randint(0, 4)):
+        if depth and rng.random() < 0.4:
+            children.append(random_tree(rng, depth - 1))
+        elif rng.random() < 0.3:
+            children.append(LeafNode(None, f"text{rng.randint(0, 9)}"))
+        else:
+            children.append(LeafNode("a", "link", {"href": f"/{rng.randint(0, 9)}"}))
+    return ParentNode(rng.choice(["div", "p", "ul", "li"]), children, rng.choice([None, {"class": "x"}]))
 
 
 class TestParentNode(unittest.TestCase):
@@ -65,6 +84,40 @@ class TestParentNode(unittest.TestCase):
             "<div><span><b>text</b></span></div>"
         )
 
+    def test_iter_html_streams_chunks(self):
+        parent_node = ParentNode("div", [ParentNode("p", [LeafNode("b", "x"), LeafNode(None, "y")])])
+        self.assertEqual(
+            list(parent_node.iter_html()),
+            ["<div>", "<p>", "<b>x</b>", "y", "</p>", "</div>"],
+        )
+
+    def test_write_html(self):
+        parent_node = ParentNode("div", [LeafNode("a", "link", {"href": "/x"})])
+        out = StringIO()
+        parent_node.write_html(out)
+        self.assertEqual(out.getvalue(), parent_node.to_html())
+
+    def test_matches_recursive_renderer(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            tree = random_tree(rng)
+            self.assertEqual(tree.to_html(), render_recursive(tree))
+
+    def test_deeper_than_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 2
+        node = LeafNode(None, "leaf")
+        for i in range(depth):
+            node = ParentNode("blockquote" if i % 2 else "div", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<blockquote><div><blockquote>"))
+        self.assertEqual(html.count("</blockquote>") + html.count("</div>"), depth)
+
+    def test_nested_parent_without_children_raises(self):
+        inner = ParentNode("span", [])
+        inner.children = None
+        with self.assertRaises(ValueError):
+            ParentNode("div", [inner]).to_html()
+
     def test_parent_repr(self):
         child_node = LeafNode("span", "child")
         parent_node = ParentNode("div", [child_node])
@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+import threading
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import pipeline
+from build import build_pages
+from output import PageBuildError
+from pipeline import generate_pages_pipelined
+from testsupport import SiteTestCase, TEMPLATE, read_tree, write
+
+
+class TestPipeline(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pages = []
+        for i in range(30):
+            src = os.path.join(self.content, f"page{i}", "index.md")
+            write(src, f"# Page {i}\n\nSome **bold** text and a [link](/page{i}).")
+            self.pages.append((src, os.path.join(self.root, "out", f"page{i}", "index.html"), self.template, None))
+
+    def build(self, dest, **kwargs):
+        manifest = os.path.join(self.root, f"{os.path.basename(dest)}.json")
+        with redirect_stdout(StringIO()):
+            return build_pages(self.content, self.template, dest, "/base/", manifest, **kwargs)
+
+    def test_matches_sequential(self):
+        seq_dest = os.path.join(self.root, "seq")
+        pipe_dest = os.path.join(self.root, "pipe")
+        self.build(seq_dest)
+        summary = self.build(pipe_dest, queue_depth=3, readers=2)
+        self.assertEqual(len(summary["built"]), 30)
+        self.assertEqual(read_tree(seq_dest), read_tree(pipe_dest))
+
+    def test_reads_bounded_by_queue_depth(self):
+        started = []
+        rendered = []
+        lock = threading.Lock()
+        read_source = pipeline.read_source
+        render_page = pipeline.render_page
+
+        def counting_read(path):
+            with lock:
+                started.append(path)
+            return read_source(path)
+
+        def checking_render(*args):
+            # Reads started beyond the page being rendered
+            with lock:
+                self.assertLessEqual(len(started) - len(rendered) - 1, 4)
+            rendered.append(args[0])
+            return render_page(*args)
+
+        with mock.patch.object(pipeline, "read_source", counting_read), \
+                mock.patch.object(pipeline, "render_page", checking_render), \
+                redirect_stdout(StringIO()):
+            generate_pages_pipelined(self.pages, "/", queue_depth=4, readers=3)
+        self.assertEqual(len(rendered), 30)
+
+    def test_render_error_names_earliest_source(self):
+        bad = self.pages[5][0]
+        write(bad, "No title here")
+        write(self.pages[9][0], "Also untitled")
+        with self.assertRaises(PageBuildError) as ctx, redirect_stdout(StringIO()):
+            generate_pages_pipelined(self.pages, "/", queue_depth=4)
+        self.assertEqual(ctx.exception.source, bad)
+
+    def test_read_error_names_source(self):
+        missing = self.pages[2][0]
+        os.remove(missing)
+        with self.assertRaises(PageBuildError) as ctx, redirect_stdout(StringIO()):
+            generate_pages_pipelined(self.pages, "/")
+        self.assertEqual(ctx.exception.source, missing)
+
+    def test_failure_reported_when_run_as_script(self):
+        # main.py runs as __main__, so the pipeline's errors must not come
+        # from a second copy of it imported as main
+        write(os.path.join(self.root, "template.html"), TEMPLATE)
+        write(os.path.join(self.root, "static", "index.css"), "")
+        write(self.pages[3][0], "No title here")
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        result = subprocess.run(
+            [sys.executable, script, "/", "--pipeline"], cwd=self.root, capture_output=True, text=True
+        )
+        self.assertEqual(result.returncode, 1)
+        self.assertIn(f"Build failed: {os.path.join('content', 'page3', 'index.md')}", result.stderr)
+        self.assertNotIn("Traceback", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
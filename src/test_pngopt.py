@@ -0,0 +1,140 @@
+import os
+import random
+import struct
+import unittest
+import zlib
+from contextlib import redirect_stdout
+from io import StringIO
+
+from fingerprint import fingerprinted_path
+from manifest import hash_bytes
+from pngopt import PNG_SIGNATURE, filter_row, optimize_png, optimize_pngs, read_chunks, unfilter, write_chunk
+from staticsync import sync_static
+from testsupport import SiteTestCase, write
+
+
+def make_png(width, height, extra_chunks=(), level=1):
+    """
+    Encode a smooth RGB gradient without filtering and with weak
+    compression, like a careless export.
+    """
+    rows = [bytes((x + y) % 256 for x in range(width) for _ in range(3)) for y in range(height)]
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    idat = zlib.compress(b"".join(b"\x00" + row for row in rows), level)
+    chunks = [write_chunk(b"IHDR", ihdr)]
+    chunks += [write_chunk(chunk_type, body) for chunk_type, body in extra_chunks]
+    # Image data split over several IDAT chunks, as encoders often do
+    chunks += [write_chunk(b"IDAT", idat[i:i + 100]) for i in range(0, len(idat), 100)]
+    chunks.append(write_chunk(b"IEND", b""))
+    return PNG_SIGNATURE + b"".join(chunks), rows
+
+
+def decode_rows(data):
+    chunks = read_chunks(data)
+    width, height = struct.unpack(">II", chunks[0][1][:8])
+    filtered = zlib.decompress(b"".join(body for chunk_type, body in chunks if chunk_type == b"IDAT"))
+    return unfilter(filtered, height, width * 3, 3)
+
+
+class TestFilters(unittest.TestCase):
+    def test_every_filter_round_trips(self):
+        rng = random.Random(7)
+        stride, bpp = 30, 3
+        rows = [bytes(rng.randrange(256) for _ in range(stride)) for _ in range(5)]
+        for filter_type in range(5):
+            data = b""
+            prev = bytes(stride)
+            for row in rows:
+                data += bytes([filter_type]) + filter_row(filter_type, row, prev, bpp)
+                prev = row
+            self.assertEqual(unfilter(data, len(rows), stride, bpp), rows, filter_type)
+
+    def test_unknown_filter_rejected(self):
+        with self.assertRaises(ValueError):
+            unfilter(b"\x05abc", 1, 3, 1)
+
+
+class TestOptimizePng(unittest.TestCase):
+    def test_smaller_and_lossless(self):
+        data, rows = make_png(64, 48)
+        optimized = optimize_png(data)
+        self.assertLess(len(optimized), len(data))
+        self.assertEqual(decode_rows(optimized), rows)
+
+    def test_strips_only_ancillary_chunks_that_do_not_affect_display(self):
+        data, _ = make_png(16, 16, [(b"gAMA", struct.pack(">I", 45455)), (b"tEXt", b"Software\x00export")])
+        types = [chunk_type for chunk_type, _ in read_chunks(optimize_png(data))]
+        self.assertEqual(types, [b"IHDR", b"gAMA", b"IDAT", b"IEND"])
+
+    def test_optimized_file_not_improved_again(self):
+        data, _ = make_png(32, 32)
+        self.assertIsNone(optimize_png(optimize_png(data)))
+
+    def test_animated_png_left_alone(self):
+        data, _ = make_png(8, 8, [(b"acTL", struct.pack(">II", 1, 0))])
+        self.assertIsNone(optimize_png(data))
+
+    def test_corrupt_file_rejected(self):
+        data, _ = make_png(8, 8)
+        with self.assertRaises(ValueError):
+            optimize_png(data[:20] + bytes([data[20] ^ 1]) + data[21:])
+
+
+class TestOptimizePngs(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = os.path.join(self.root, "cache")
+        self.data, self.rows = make_png(64, 48)
+        write(os.path.join(self.static, "images", "a.png"), self.data)
+        # Same content under another name is only optimized once
+        write(os.path.join(self.static, "images", "copy.png"), self.data)
+        write(os.path.join(self.static, "images", "broken.png"), b"\x89PNG not really")
+
+    def sync(self, **kwargs):
+        kwargs.setdefault("image_cache", self.cache)
+        output = StringIO()
+        with redirect_stdout(output):
+            summary = sync_static(self.static, self.dest, self.manifest, jobs=2, **kwargs)
+        return summary, output.getvalue()
+
+    def test_sync_copies_optimized_images(self):
+        _, output = self.sync()
+        self.assertIn("Images: 1 optimized", output)
+        self.assertIn("1 kept as is", output)
+        for name in ("a.png", "copy.png"):
+            with open(os.path.join(self.dest, "images", name), "rb") as f:
+                optimized = f.read()
+            self.assertLess(len(optimized), len(self.data))
+            self.assertEqual(decode_rows(optimized), self.rows)
+        with open(os.path.join(self.dest, "images", "broken.png"), "rb") as f:
+            self.assertEqual(f.read(), b"\x89PNG not really")
+
+    def test_results_cached_by_hash(self):
+        self.sync()
+        summary, output = self.sync()
+        self.assertIn("0 optimized", output)
+        self.assertIn("2 cached", output)
+        self.assertEqual(summary["copied"], [])
+
+    def test_fingerprint_names_published_bytes(self):
+        plain, _ = self.sync(image_cache=None, fingerprint=True)
+        optimized, _ = self.sync(fingerprint=True)
+        name = optimized["fingerprints"]["images/a.png"]
+        self.assertNotEqual(name, plain["fingerprints"]["images/a.png"])
+        with open(os.path.join(self.dest, name), "rb") as f:
+            self.assertEqual(fingerprinted_path("images/a.png", hash_bytes(f.read())), name)
+        # A PNG that could not be made smaller keeps its source's name
+        self.assertEqual(optimized["fingerprints"]["images/broken.png"], plain["fingerprints"]["images/broken.png"])
+        again, _ = self.sync(image_cache=None, fingerprint=True)
+        self.assertEqual(again["fingerprints"], plain["fingerprints"])
+
+    def test_cache_entries_of_removed_images_pruned(self):
+        self.sync()
+        self.assertEqual(len(os.listdir(self.cache)), 2)
+        with redirect_stdout(StringIO()):
+            optimize_pngs({}, self.cache)
+        self.assertEqual(os.listdir(self.cache), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+import json
+import os
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import splitter
+from build import SPLITTER_STAGES, build_pages
+from profiling import Profiler
+from testsupport import SiteTestCase, write
+
+
+class TestProfiler(unittest.TestCase):
+    def test_nested_stages_are_exclusive(self):
+        profiler = Profiler()
+        with profiler.page("a.md"):
+            with profiler.stage("outer"):
+                time.sleep(0.01)
+                with profiler.stage("inner"):
+                    time.sleep(0.02)
+        outer, inner = profiler.totals["outer"][0], profiler.totals["inner"][0]
+        self.assertLess(outer, inner)
+        self.assertAlmostEqual(outer + inner, profiler.pages["a.md"]["total"], delta=0.005)
+
+    def test_call_counts(self):
+        profiler = Profiler()
+        double = profiler.timed("double", lambda x: x * 2)
+        with profiler.page("a.md"):
+            self.assertEqual(double(2), 4)
+            double(3)
+        self.assertEqual(profiler.totals["double"][1], 2)
+        self.assertEqual(profiler.pages["a.md"]["stages"]["double"][1], 2)
+
+    def test_instrument_restores_functions(self):
+        profiler = Profiler()
+        original = splitter.markdown_to_blocks
+        with profiler.instrument(splitter, SPLITTER_STAGES):
+            self.assertIsNot(splitter.markdown_to_blocks, original)
+            splitter.markdown_to_html_node("# Title\n\nSome *text*")
+        self.assertIs(splitter.markdown_to_blocks, original)
+        self.assertEqual(profiler.totals["blocks"][1], 1)
+        self.assertEqual(profiler.totals["classify"][1], 2)
+
+    def test_report_slowest_pages(self):
+        profiler = Profiler()
+        for name, delay in (("fast.md", 0), ("slow.md", 0.1), ("mid.md", 0.05)):
+            with profiler.page(name):
+                with profiler.stage("read"):
+                    time.sleep(delay)
+        report = profiler.report(top=2)
+        self.assertEqual(report["pages"], 3)
+        self.assertEqual([entry["page"] for entry in report["slowest_pages"]], ["slow.md", "mid.md"])
+        self.assertEqual(report["stages"]["read"]["calls"], 3)
+
+
+class TestProfiledBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            write(os.path.join(self.content, f"page{i}", "index.md"), f"# Page {i}\n\nA [link](/p{i}).")
+
+    def build(self, dest, profiler=None, jobs=1):
+        manifest = os.path.join(self.root, f"{os.path.basename(dest)}.json")
+        with redirect_stdout(StringIO()):
+            build_pages(self.content, self.template, dest, "/", manifest, jobs=jobs, profiler=profiler)
+
+    def test_output_identical_and_report_written(self):
+        plain = os.path.join(self.root, "plain")
+        profiled = os.path.join(self.root, "profiled")
+        profiler = Profiler()
+        self.build(plain)
+        self.build(profiled, profiler, jobs=4)
+
+        for i in range(3):
+            rel = os.path.join(f"page{i}", "index.html")
+            with open(os.path.join(plain, rel)) as a, open(os.path.join(profiled, rel)) as b:
+                self.assertEqual(a.read(), b.read())
+
+        report_path = os.path.join(self.root, "profile.json")
+        profiler.write_json(report_path)
+        with open(report_path) as f:
+            report = json.load(f)
+        self.assertEqual(report["pages"], 3)
+        for stage in ("read", "blocks", "classify", "inline", "nodes", "to_html", "template", "write"):
+            self.assertIn(stage, report["stages"])
+        self.assertEqual(report["stages"]["write"]["calls"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,110 @@
+import json
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from build import build_pages
+from search import SEARCH_DIR, SearchIndex, html_terms, page_url, shard_key
+from testsupport import SiteTestCase, write
+
+
+class TestTokenize(unittest.TestCase):
+    def test_html_terms_skip_tags_and_attributes(self):
+        self.assertEqual(
+            html_terms('<p>Hobbits &amp; <a href="/elves">Elves</a> of Middle-earth, a b</p>'),
+            ["hobbits", "elves", "of", "middle", "earth"],
+        )
+
+    def test_shard_keys_are_safe_file_names(self):
+        self.assertEqual(shard_key("tolkien"), "to")
+        self.assertEqual(shard_key("éa"), "x" + "éa".encode("utf-8").hex())
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("docs", "index.html"), "docs", "/site/"), "/site/")
+        self.assertEqual(page_url(os.path.join("docs", "blog", "tom", "index.html"), "docs", "/"), "/blog/tom/")
+        self.assertEqual(page_url(os.path.join("docs", "about.html"), "docs", "/"), "/about.html")
+
+    def test_collect_passes_chunks_through(self):
+        index = SearchIndex()
+        chunks = list(index.collect("a.md", "The Title", iter(["<p>", "title text", "</p>"])))
+        self.assertEqual(chunks, ["<p>", "title text", "</p>"])
+        self.assertEqual(index.pages["a.md"], {"title": "The Title", "terms": {"text": 1, "the": 1, "title": 2}})
+
+
+class TestSearchBuild(SiteTestCase):
+    template_text = "<title>{{ Title }}</title>{{ Content }}"
+
+    def setUp(self):
+        super().setUp()
+        write(os.path.join(self.content, "index.md"), "# Home\n\nGandalf and **Bilbo**")
+        write(os.path.join(self.content, "blog", "tom", "index.md"), "# Tom\n\nBombadil sings to Bilbo")
+
+    def build(self, **kwargs):
+        kwargs.setdefault("search", True)
+        with redirect_stdout(StringIO()):
+            return build_pages(self.content, self.template, self.dest, "/", self.manifest, **kwargs)
+
+    def read(self, name):
+        with open(os.path.join(self.dest, SEARCH_DIR, name)) as f:
+            return json.load(f)
+
+    def search_files(self, summary):
+        return sorted(
+            os.path.relpath(path, os.path.join(self.dest, SEARCH_DIR))
+            for status in ("added", "changed", "deleted")
+            for path in summary["outputs"][status]
+            if not path.endswith(".html")
+        )
+
+    def test_index_and_shards_written(self):
+        self.build()
+        meta = self.read("index.json")
+        self.assertEqual(meta["docs"], [["/blog/tom/", "Tom"], ["/", "Home"]])
+        self.assertIn("bi", meta["shards"])
+        self.assertEqual(self.read("bi.json"), {"bilbo": [[0, 1], [1, 1]]})
+        self.assertEqual(self.read("ga.json"), {"gandalf": [[1, 1]]})
+
+    def test_only_affected_shards_rewritten(self):
+        self.build()
+        self.assertEqual(self.search_files(self.build()), [])
+        write(os.path.join(self.content, "index.md"), "# Home\n\nGandalf and **Frodo**")
+        summary = self.build()
+        self.assertEqual(self.search_files(summary), ["bi.json", "fr.json", "index.json"])
+        self.assertEqual(self.read("bi.json"), {"bilbo": [[0, 1]]})
+
+    def test_removed_page_dropped_and_empty_shards_deleted(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "tom", "index.md"))
+        summary = self.build()
+        self.assertIn("bo.json", self.search_files(summary))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, SEARCH_DIR, "bo.json")))
+        self.assertEqual(self.read("index.json")["docs"], [None, ["/", "Home"]])
+        write(os.path.join(self.content, "new.md"), "# New\n\nRivendell")
+        self.build()
+        self.assertEqual(self.read("index.json")["docs"][0], ["/new.html", "New"])
+
+    def test_enabling_search_indexes_existing_pages(self):
+        self.build(search=False)
+        summary = self.build()
+        self.assertEqual(len(summary["built"]), 2)
+        self.assertEqual(len(self.read("index.json")["docs"]), 2)
+
+    def test_parallel_and_pipelined_builds_match(self):
+        self.build()
+        expected = {name: self.read(name) for name in os.listdir(os.path.join(self.dest, SEARCH_DIR))}
+        for kwargs in ({"jobs": 2}, {"queue_depth": 2}):
+            os.remove(self.manifest)
+            self.build(**kwargs)
+            actual = {name: self.read(name) for name in os.listdir(os.path.join(self.dest, SEARCH_DIR))}
+            self.assertEqual(actual, expected, kwargs)
+
+    def test_disabling_search_removes_index(self):
+        self.build()
+        summary = self.build(search=False)
+        self.assertIn("index.json", self.search_files(summary))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, SEARCH_DIR)))
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
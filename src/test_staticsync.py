@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from staticsync import copy_file, needs_copy, sync_static
+from testsupport import SiteTestCase, read_bytes, write
+
+
+class TestSyncStatic(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        write(os.path.join(self.static, "index.css"), b"body {}")
+        write(os.path.join(self.static, "images", "a.png"), b"\x89PNG a")
+
+    def sync(self, **kwargs):
+        with redirect_stdout(StringIO()):
+            return sync_static(self.static, self.dest, self.manifest, **kwargs)
+
+    def test_first_sync_copies_everything(self):
+        summary = self.sync()
+        self.assertEqual(sorted(summary["copied"]), [os.path.join("images", "a.png"), "index.css"])
+        self.assertEqual(summary["added"], summary["copied"])
+        self.assertEqual(read_bytes(os.path.join(self.dest, "images", "a.png")), b"\x89PNG a")
+
+    def test_second_sync_copies_nothing(self):
+        self.sync()
+        summary = self.sync()
+        self.assertEqual(summary["copied"], [])
+        self.assertEqual(len(summary["unchanged"]), 2)
+
+    def test_changed_file_is_recopied(self):
+        self.sync()
+        write(os.path.join(self.static, "index.css"), b"body { color: red }")
+        summary = self.sync()
+        self.assertEqual(summary["copied"], ["index.css"])
+        self.assertEqual(summary["added"], [])
+        self.assertEqual(read_bytes(os.path.join(self.dest, "index.css")), b"body { color: red }")
+
+    def test_stale_asset_removed_but_generated_html_kept(self):
+        self.sync()
+        page = os.path.join(self.dest, "index.html")
+        write(page, b"<html></html>")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        summary = self.sync()
+        self.assertEqual(summary["removed"], [os.path.join("images", "a.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertTrue(os.path.exists(page))
+
+    def test_hardlink(self):
+        self.sync(hardlink=True)
+        src_stat = os.stat(os.path.join(self.static, "index.css"))
+        dst_stat = os.stat(os.path.join(self.dest, "index.css"))
+        self.assertTrue(os.path.samestat(src_stat, dst_stat))
+        self.assertEqual(self.sync(hardlink=True)["copied"], [])
+
+    def test_checksum_ignores_touched_identical_file(self):
+        self.sync()
+        os.utime(os.path.join(self.static, "index.css"), (0, 0))
+        self.assertEqual(self.sync(checksum=True)["copied"], [])
+        self.assertEqual(self.sync()["copied"], ["index.css"])
+
+
+class TestCopyFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_kernel_copy_path(self):
+        src = os.path.join(self.tmp.name, "big.bin")
+        dst = os.path.join(self.tmp.name, "copy.bin")
+        data = os.urandom(300_000)
+        write(src, data)
+        copy_file(src, dst, threshold=1)
+        self.assertEqual(read_bytes(dst), data)
+        self.assertFalse(needs_copy(src, dst))
+
+    def test_copy_replaces_hardlink_instead_of_writing_through(self):
+        src = os.path.join(self.tmp.name, "src.txt")
+        other = os.path.join(self.tmp.name, "other.txt")
+        dst = os.path.join(self.tmp.name, "dst.txt")
+        write(src, b"original")
+        os.link(src, dst)
+        write(other, b"replacement")
+        copy_file(other, dst)
+        self.assertEqual(read_bytes(src), b"original")
+        self.assertEqual(read_bytes(dst), b"replacement")
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
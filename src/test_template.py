@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from template import LAYOUT_FILENAME, Template, TemplateLoader, find_layout
+from testsupport import write
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_segments(self):
+        template = Template("<title>{{ Title }}</title><article>{{Content}}</article>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(template.literals, ["<title>", "</title><article>", "</article>"])
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        self.assertEqual(
+            template.render({"Title": "Hi", "Content": "<p>x</p>"}),
+            "<title>Hi</title><article><p>x</p></article>",
+        )
+
+    def test_repeated_slot(self):
+        template = Template("{{ Title }} - {{ Title }}")
+        self.assertEqual(template.render({"Title": "A"}), "A - A")
+
+    def test_missing_value_keeps_placeholder(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Unknown }}")
+        self.assertEqual(template.render({"Title": "A"}), "<h1>A</h1>{{ Unknown }}")
+
+    def test_values_not_rescanned(self):
+        template = Template("{{ Title }}|{{ Content }}")
+        self.assertEqual(
+            template.render({"Title": "{{ Content }}", "Content": "x"}),
+            "{{ Content }}|x",
+        )
+
+    def test_iter_render_streams_iterable_values(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        chunks = list(template.iter_render({"Title": "T", "Content": iter(["<p>", "x", "</p>"])}))
+        self.assertEqual(chunks, ["<title>", "T", "</title>", "<p>", "x", "</p>", ""])
+
+    def test_basepath_resolved_at_compile_time(self):
+        template = Template('<link href="/index.css" /><script src="//cdn.example/x.js"></script>{{ Content }}', "/site/")
+        self.assertEqual(
+            template.render({"Content": '<a href="/raw">'}),
+            '<link href="/site/index.css" /><script src="//cdn.example/x.js"></script><a href="/raw">',
+        )
+
+    def test_no_slots(self):
+        self.assertEqual(Template("plain").render({}), "plain")
+
+
+class TestTemplateLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "template.html")
+        write(self.path, "<p>{{ Content }}</p>")
+
+    def test_get_is_cached(self):
+        loader = TemplateLoader()
+        self.assertIs(loader.get(self.path), loader.get(self.path))
+
+    def test_get_reloads_changed_file(self):
+        loader = TemplateLoader()
+        first = loader.get(self.path)
+        write(self.path, "<div>{{ Content }}</div>")
+        second = loader.get(self.path)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.render({"Content": "x"}), "<div>x</div>")
+
+
+class TestFindLayout(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.content = os.path.join(self.tmp.name, "content")
+        self.default = os.path.join(self.tmp.name, "template.html")
+        self.blog_layout = os.path.join(self.content, "blog", LAYOUT_FILENAME)
+        write(self.blog_layout, "{{ Content }}")
+
+    def test_default_outside_section(self):
+        page = os.path.join(self.content, "contact", "index.md")
+        self.assertEqual(find_layout(page, self.content, self.default), self.default)
+
+    def test_nearest_section_layout(self):
+        page = os.path.join(self.content, "blog", "tom", "index.md")
+        self.assertEqual(find_layout(page, self.content, self.default), self.blog_layout)
+
+    def test_cache_shared_across_pages(self):
+        cache = {}
+        for name in ("tom", "majesty"):
+            page = os.path.join(self.content, "blog", name, "index.md")
+            self.assertEqual(find_layout(page, self.content, self.default, cache), self.blog_layout)
+        self.assertEqual(cache[os.path.join(self.content, "blog")], self.blog_layout)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -23,6 +23,10 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("Link text", TextType.LINK, None)
         self.assertEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -43,6 +43,21 @@ class TestTextNodeToHtmlNode(unittest.TestCase):
         self.assertEqual(html_node.props["src"], "https://example.com/image.png")
         self.assertEqual(html_node.props["alt"], "Alt text")
 
+    def test_repeated_link_shares_props(self):
+        first = text_node_to_html_node(TextNode("a", TextType.LINK, "https://shared.example"))
+        second = text_node_to_html_node(TextNode("b", TextType.LINK, "https://shared.example"))
+        self.assertIs(first.props, second.props)
+        with self.assertRaises(TypeError):
+            first.props["href"] = "changed"
+
+    def test_basepath_resolved_for_root_relative_urls(self):
+        link = text_node_to_html_node(TextNode("Home", TextType.LINK, "/blog/tom"), "/site/")
+        image = text_node_to_html_node(TextNode("Tom", TextType.IMAGE, "/images/tom.png"), "/site/")
+        external = text_node_to_html_node(TextNode("Ext", TextType.LINK, "https://a.com/x"), "/site/")
+        self.assertEqual(link.props["href"], "/site/blog/tom")
+        self.assertEqual(image.props["src"], "/site/images/tom.png")
+        self.assertEqual(external.props["href"], "https://a.com/x")
+
     def test_invalid_type_raises(self):
         # Create a text node and manually set an invalid type to test error handling
         node = TextNode("Text", TextType.TEXT)
@@ -0,0 +1,33 @@
+import signal
+import time
+import unittest
+
+from timelimit import PageTimeoutError, time_limit, time_limits_supported
+
+
+@unittest.skipUnless(time_limits_supported(), "interval timers are not available")
+class TestTimeLimit(unittest.TestCase):
+    def test_long_block_interrupted(self):
+        start = time.perf_counter()
+        with self.assertRaises(PageTimeoutError) as ctx:
+            with time_limit(0.05):
+                while True:
+                    pass
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertIn("longer than 0.05 s", str(ctx.exception))
+        # Handlers for I/O errors must not swallow the timeout
+        self.assertNotIsInstance(ctx.exception, OSError)
+
+    def test_quick_block_unaffected_and_timer_cleared(self):
+        with time_limit(0.05):
+            pass
+        self.assertEqual(signal.getitimer(signal.ITIMER_REAL), (0.0, 0.0))
+        self.assertIs(signal.getsignal(signal.SIGALRM), signal.SIG_DFL)
+
+    def test_no_limit(self):
+        with time_limit(None):
+            time.sleep(0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
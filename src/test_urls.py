@@ -0,0 +1,26 @@
+import unittest
+from urls import is_root_relative, resolve_url
+
+
+class TestResolveUrl(unittest.TestCase):
+    def test_root_relative(self):
+        self.assertEqual(resolve_url("/images/a.png", "/static_site/"), "/static_site/images/a.png")
+
+    def test_root(self):
+        self.assertEqual(resolve_url("/", "/static_site/"), "/static_site/")
+
+    def test_default_basepath_unchanged(self):
+        self.assertEqual(resolve_url("/a", "/"), "/a")
+
+    def test_other_urls_unchanged(self):
+        for url in ("https://a.com/x", "//cdn.example/x.js", "relative/path", "#top", ""):
+            self.assertEqual(resolve_url(url, "/site/"), url)
+
+    def test_is_root_relative(self):
+        self.assertTrue(is_root_relative("/a"))
+        self.assertFalse(is_root_relative("//a"))
+        self.assertFalse(is_root_relative("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
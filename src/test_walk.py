@@ -0,0 +1,82 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import walk
+from walk import walk_tree
+from testsupport import write
+
+
+class TestWalkTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+
+    def files(self, **kwargs):
+        return [
+            (os.path.relpath(entry.path, self.root), dest)
+            for entry, dest in walk_tree(self.root, "out", **kwargs)
+            if not entry.is_dir()
+        ]
+
+    def test_sorted_walk_matches_sorting_all_paths(self):
+        for name in ("a.md", "a/b.md", "a/c/d.md", "a-b.md", "ab/e.md", "b.md", "a/b/f.md"):
+            write(os.path.join(self.root, *name.split("/")), "x")
+        walked = self.files(sort=True)
+        self.assertEqual(walked, sorted(walked))
+        self.assertEqual(len(walked), 7)
+        self.assertIn((os.path.join("a", "c", "d.md"), os.path.join("out", "a", "c", "d.md")), walked)
+
+    def test_directories_before_their_contents(self):
+        write(os.path.join(self.root, "a", "b", "c.txt"), "x")
+        os.makedirs(os.path.join(self.root, "empty"))
+        walked = [os.path.relpath(entry.path, self.root) for entry, _ in walk_tree(self.root, "out", sort=True)]
+        self.assertEqual(walked, ["a", os.path.join("a", "b"), os.path.join("a", "b", "c.txt"), "empty"])
+
+    def test_deeper_than_recursion_limit(self):
+        # os.makedirs and shutil.rmtree recurse, so the tree is made and
+        # removed one level at a time
+        levels = [self.root]
+        for _ in range(sys.getrecursionlimit() + 50):
+            levels.append(os.path.join(levels[-1], "d"))
+            os.mkdir(levels[-1])
+        leaf = os.path.join(levels[-1], "leaf.md")
+        write(leaf, "x")
+
+        def remove_levels():
+            os.remove(leaf)
+            for path in reversed(levels[1:]):
+                os.rmdir(path)
+        self.addCleanup(remove_levels)
+        self.assertEqual(len(self.files()), 1)
+
+    def test_symlink_loops_skipped(self):
+        write(os.path.join(self.root, "a", "b.md"), "x")
+        try:
+            os.symlink(self.root, os.path.join(self.root, "a", "loop"), target_is_directory=True)
+            os.symlink(os.path.join(self.root, "a"), os.path.join(self.root, "a", "again"), target_is_directory=True)
+            # A link to a directory outside the walk's current path is followed
+            os.symlink(os.path.join(self.root, "a"), os.path.join(self.root, "c"), target_is_directory=True)
+        except (NotImplementedError, OSError):
+            self.skipTest("symlinks are not available")
+        walked = [os.path.relpath(entry.path, self.root) for entry, _ in walk_tree(self.root, "out", sort=True)]
+        self.assertEqual(walked, ["a", os.path.join("a", "b.md"), "c", os.path.join("c", "b.md")])
+
+    def test_walk_is_lazy(self):
+        for i in range(5):
+            write(os.path.join(self.root, f"dir{i}", "page.md"), "x")
+        with mock.patch.object(walk.os, "scandir", wraps=os.scandir) as scandir:
+            walker = walk_tree(self.root, "out", sort=True)
+            next(walker)
+            next(walker)
+            # The root and the first directory only
+            self.assertEqual(scandir.call_count, 2)
+            list(walker)
+            self.assertEqual(scandir.call_count, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
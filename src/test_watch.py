@@ -0,0 +1,114 @@
+import gzip
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from compress import compress_site
+from build import build_pages
+from staticsync import sync_static
+from watch import SnapshotWatcher, page_dest_path, rebuild_changes
+from testsupport import SiteTestCase, read, write
+
+
+class TestSnapshotWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = os.path.join(self.tmp.name, "content")
+        self.file = os.path.join(self.root, "a.md")
+        write(self.file, "a")
+
+    def test_no_changes(self):
+        self.assertEqual(SnapshotWatcher([self.root]).poll(), set())
+
+    def test_detects_add_modify_remove(self):
+        watcher = SnapshotWatcher([self.root])
+        added = os.path.join(self.root, "sub", "b.md")
+        write(added, "b")
+        write(self.file, "changed")
+        self.assertEqual(watcher.poll(), {added, self.file})
+        os.remove(added)
+        self.assertEqual(watcher.poll(), {added})
+
+
+class TestRebuildChanges(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        write(os.path.join(self.static, "index.css"), "body {}")
+        self.home = os.path.join(self.content, "index.md")
+        self.post = os.path.join(self.content, "blog", "post", "index.md")
+        write(self.home, "# Home\n\nHello")
+        write(self.post, "# Post\n\nBody")
+        with redirect_stdout(StringIO()):
+            sync_static(self.static, self.dest, self.manifest)
+            build_pages(self.content, self.template, self.dest, "/", self.manifest)
+
+    def rebuild(self, *changed, **kwargs):
+        with redirect_stdout(StringIO()):
+            return rebuild_changes(
+                set(changed), self.content, self.static, self.template, self.dest, "/", self.manifest, **kwargs
+            )
+
+    def test_content_change_rebuilds_only_that_page(self):
+        write(self.post, "# Post\n\nEdited")
+        summary = self.rebuild(self.post)
+        self.assertEqual(summary["pages"], [self.post])
+        self.assertIn("Edited", read(page_dest_path(self.post, self.content, self.dest)))
+        with redirect_stdout(StringIO()):
+            followup = build_pages(self.content, self.template, self.dest, "/", self.manifest)
+        self.assertEqual(followup["built"], [])
+
+    def test_removed_page_deletes_output(self):
+        os.remove(self.post)
+        summary = self.rebuild(self.post)
+        self.assertEqual(summary["removed"], [os.path.join(self.dest, "blog", "post", "index.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+    def test_template_change_rebuilds_all_pages(self):
+        write(self.template, "<main>{{ Content }}</main>")
+        summary = self.rebuild(self.template)
+        self.assertEqual(sorted(summary["pages"]), sorted([self.home, self.post]))
+
+    def test_static_change_recopies_only_that_asset(self):
+        css = os.path.join(self.static, "index.css")
+        write(css, "body { color: red }")
+        summary = self.rebuild(css)
+        self.assertEqual(summary, {"pages": [], "assets": ["index.css"], "removed": []})
+        self.assertEqual(read(os.path.join(self.dest, "index.css")), "body { color: red }")
+
+    def test_static_removal(self):
+        css = os.path.join(self.static, "index.css")
+        os.remove(css)
+        self.rebuild(css)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_static_change_honours_hardlink(self):
+        css = os.path.join(self.static, "index.css")
+        write(css, "body { color: red }")
+        self.rebuild(css, hardlink=True)
+        self.assertTrue(os.path.samefile(css, os.path.join(self.dest, "index.css")))
+        # The manifest entry is the one a full build writes, so it finds
+        # nothing left to copy
+        with redirect_stdout(StringIO()):
+            assets = sync_static(self.static, self.dest, self.manifest, hardlink=True)
+        self.assertEqual(assets["copied"], [])
+
+    def test_sidecars_follow_rebuilt_pages(self):
+        with redirect_stdout(StringIO()):
+            compress_site(self.dest, self.manifest, min_savings=0)
+        post_html = page_dest_path(self.post, self.content, self.dest)
+        write(self.post, "# Post\n\nEdited")
+        self.rebuild(self.post, gzip=9, gzip_min_savings=0)
+        with gzip.open(post_html + ".gz", "rt") as gz:
+            self.assertIn("Edited", gz.read())
+        os.remove(self.post)
+        self.rebuild(self.post, gzip=9, gzip_min_savings=0)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html.gz")))
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""
+Fixtures shared by the test modules.
+"""
+import os
+import tempfile
+import unittest
+
+TEMPLATE = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+
+
+def write(path, data):
+    """
+    Write text or bytes to path, creating its directory.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    mode = "wb" if isinstance(data, bytes) else "w"
+    with open(path, mode) as f:
+        f.write(data)
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def read_tree(root):
+    """
+    Return the text of every file under root, keyed by relative path.
+    """
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            with open(path) as f:
+                files[os.path.relpath(path, root)] = f.read()
+    return files
+
+
+class SiteTestCase(unittest.TestCase):
+    """
+    A test case with a site laid out in a fresh temporary directory: the
+    content, static and dest (docs) directories, the build manifest, and a
+    template file holding template_text. Only the template is written.
+    """
+
+    template_text = TEMPLATE
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest = os.path.join(self.root, "manifest.json")
+        write(self.template, self.template_text)
\ No newline at end of file
@@ -1,5 +1,8 @@
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Optional
+from urls import resolve_url
 
 class TextType(Enum):
     TEXT = "text"
@@ -10,6 +13,8 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: Optional[str] = None):
         self.text = text
         self.text_type = text_type
@@ -28,7 +33,21 @@ class TextNode:
         text_type_val = self.text_type.value if isinstance(self.text_type, TextType) else str(self.text_type)
         return f"TextNode({self.text}, {text_type_val}, {self.url})"
 
-def text_node_to_html_node(text_node):
+# Links and images to the same target share one read-only props mapping
+# instead of each allocating a fresh dict
+@lru_cache(maxsize=4096)
+def _link_props(url):
+    return MappingProxyType({"href": url})
+
+@lru_cache(maxsize=4096)
+def _image_props(url, alt):
+    return MappingProxyType({"src": url, "alt": alt})
+
+def text_node_to_html_node(text_node, basepath="/"):
+    """
+    Convert a TextNode to a LeafNode. Root-relative link and image URLs are
+    resolved against basepath here, once, as the node is created.
+    """
     from leafnode import LeafNode
     
     if text_node.text_type == TextType.TEXT:
@@ -40,8 +59,8 @@ def text_node_to_html_node(text_node):
     elif text_node.text_type == TextType.CODE:
         return LeafNode("code", text_node.text)
     elif text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        return LeafNode("a", text_node.text, _link_props(resolve_url(text_node.url, basepath)))
     elif text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        return LeafNode("img", "", _image_props(resolve_url(text_node.url, basepath), text_node.text))
     else:
         raise ValueError(f"Invalid text type: {text_node.text_type}")
\ No newline at end of file
@@ -0,0 +1,46 @@
+import signal
+import threading
+from contextlib import contextmanager
+
+class PageTimeoutError(Exception):
+    """
+    Raised inside a page's render when it runs past the per-page time limit.
+    """
+
+    def __init__(self, seconds):
+        super().__init__(f"rendering took longer than {seconds:g} s")
+        self.seconds = seconds
+
+def time_limits_supported():
+    """
+    Return whether time_limit can interrupt code running in this thread:
+    it needs interval timers (not available on Windows) and, since signal
+    handlers only run there, the main thread.
+    """
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+@contextmanager
+def time_limit(seconds):
+    """
+    Raise PageTimeoutError in the block once it has run for seconds.
+
+    The limit is enforced with a SIGALRM interval timer, whose handler runs
+    between bytecodes and also interrupts long regular expression matches,
+    so even a pathological input cannot hold the block past the limit. With
+    no seconds, or where time limits are not supported, the block runs
+    unlimited.
+    """
+    if not seconds or not time_limits_supported():
+        yield
+        return
+
+    def expire(signum, frame):
+        raise PageTimeoutError(seconds)
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
\ No newline at end of file
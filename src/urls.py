@@ -0,0 +1,21 @@
+def is_root_relative(url):
+    """
+    True for site-absolute URLs such as "/images/a.png", but not for
+    protocol-relative ones such as "//cdn.example.com/a.png".
+    """
+    return url.startswith("/") and not url.startswith("//")
+
+def resolve_url(url, basepath="/"):
+    """
+    Prefix a root-relative URL with the site's basepath.
+
+    Args:
+        url: URL as written in the markdown or template
+        basepath: Base path for the site (e.g., "/" or "/static_site/")
+
+    Returns:
+        The URL to emit; anything that is not root-relative is unchanged
+    """
+    if basepath == "/" or not url or not is_root_relative(url):
+        return url
+    return basepath + url[1:]
@@ -0,0 +1,63 @@
+import os
+
+def _sort_key(entry):
+    # A directory's files are compared with its separator appended, so the
+    # walk yields paths in the same order as sorting them all at the end
+    # would ("a.md" < "a/b.md" although "a" < "a.md")
+    return entry.name + os.sep if entry.is_dir() else entry.name
+
+def _scan(path, sort):
+    with os.scandir(path) as entries:
+        entries = list(entries)
+    if sort:
+        entries.sort(key=_sort_key)
+    return iter(entries)
+
+def walk_tree(src_root, dest_root, sort=False):
+    """
+    Lazily walk a directory tree, yielding each entry with the path it maps
+    to under dest_root.
+
+    The walk is iterative, with an explicit stack of directories instead of
+    recursion, so any depth of tree is walked. Entries come from
+    os.scandir, whose DirEntry objects carry their file type, so telling
+    files from directories costs no stat call per entry on most
+    filesystems. Each directory is listed (and its handle closed) when the
+    walk reaches it, and its entries are yielded before the next directory
+    is listed, so callers can start working on the first files while the
+    rest of the tree is still unread.
+
+    Args:
+        src_root: Directory to walk
+        dest_root: Directory the tree is mapped onto
+        sort: Yield entries in sorted path order rather than the order the
+            filesystem lists them in
+
+    Yields:
+        (entry, dest_path) for every file and directory under src_root, a
+        directory before its contents, where entry is the source's
+        os.DirEntry; symlinks are followed, except a link to a directory
+        the walk is already inside, which would loop forever, and entries
+        that are neither files nor directories are skipped
+    """
+    root_stat = os.stat(src_root)
+    stack = [(_scan(src_root, sort), dest_root, (root_stat.st_dev, root_stat.st_ino))]
+    # (st_dev, st_ino) of the directories on the stack
+    ancestors = {stack[0][2]}
+    while stack:
+        entries, dest_dir, _ = stack[-1]
+        for entry in entries:
+            dest_path = os.path.join(dest_dir, entry.name)
+            if entry.is_dir():
+                stat = entry.stat()
+                key = (stat.st_dev, stat.st_ino)
+                if key in ancestors:
+                    continue
+                yield entry, dest_path
+                ancestors.add(key)
+                stack.append((_scan(entry.path, sort), dest_path, key))
+                break
+            if entry.is_file():
+                yield entry, dest_path
+        else:
+            ancestors.discard(stack.pop()[2])
\ No newline at end of file
@@ -0,0 +1,256 @@
+import os
+import time
+from manifest import BuildManifest, hash_file
+from compress import DEFAULT_MIN_SAVINGS, compress_site
+from output import PageBuildError
+from fingerprint import AssetMap
+from imagesize import IMAGE_EXTENSIONS, scan_image_sizes
+from search import SearchIndex, update_search_index
+from staticsync import sync_static
+from template import LAYOUT_FILENAME, default_loader, find_layout
+from build import build_pages, generate_page, remove_output, write_asset_manifest
+
+class SnapshotWatcher:
+    """
+    Detect changed files by polling (mtime, size) snapshots of a set of
+    files and directory trees. Uses only the standard library, so it works
+    the same on every platform and filesystem.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.state = self.scan()
+
+    def scan(self):
+        state = {}
+        for root in self.paths:
+            if os.path.isfile(root):
+                stat = os.stat(root)
+                state[root] = (stat.st_mtime_ns, stat.st_size)
+                continue
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    state[path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def poll(self):
+        """
+        Return the set of paths added, modified or removed since the last poll.
+        """
+        current = self.scan()
+        changed = {path for path, key in current.items() if self.state.get(path) != key}
+        changed.update(path for path in self.state if path not in current)
+        self.state = current
+        return changed
+
+def _is_under(path, root):
+    return os.path.commonpath([os.path.abspath(path), os.path.abspath(root)]) == os.path.abspath(root)
+
+def page_dest_path(src_path, content_dir, dest_dir):
+    """
+    Map a markdown source to the HTML file it is generated into.
+    """
+    rel_path = os.path.relpath(src_path, content_dir)
+    return os.path.join(dest_dir, rel_path[:-len(".md")] + ".html")
+
+def rebuild_changes(changed, content_dir, static_dir, template_path, dest_dir, basepath, manifest_path,
+                    fingerprint=False, image_sizes=False, image_cache=None, search=False, gzip=None,
+                    gzip_min_savings=DEFAULT_MIN_SAVINGS, checksum=False, hardlink=False):
+    """
+    Apply a batch of changed paths to the output with the least work.
+
+    A changed markdown file regenerates only its page, a removed one deletes
+    its output; a static change is applied by sync_static, which recopies
+    (or removes) only the assets that changed, the same way a full build
+    does; a change to the template or a section layout regenerates the
+    pages that use it. With fingerprinting, a static change also regenerates
+    every page, since their links to the assets change. When images are
+    annotated with their sizes, a change to an image's size regenerates the
+    pages that show it. With gzip, the sidecars of the files written or
+    removed are brought up to date.
+
+    Args:
+        changed: Set of changed file paths
+        content_dir: Content directory
+        static_dir: Static asset directory
+        template_path: Site-wide template path
+        dest_dir: Output directory
+        basepath: Base path for the site
+        manifest_path: Path to the build manifest
+        fingerprint: Static assets are copied to content-hashed names
+        image_sizes: <img> tags are annotated with their images' sizes
+        image_cache: Directory caching optimized PNGs, if they are optimized
+        search: Keep the search index up to date with the pages
+        gzip: gzip level of the .gz sidecars, if they are written
+        gzip_min_savings: Fraction of a file's size its sidecar must save
+        checksum: Compare equal-sized assets by content hash instead of mtime
+        hardlink: Hardlink assets to their sources instead of copying them
+
+    Returns:
+        Dict with the lists of rebuilt "pages", recopied "assets" and
+        "removed" outputs
+    """
+    summary = {"pages": [], "assets": [], "removed": []}
+    # Output files written or removed, relative to dest_dir, whose sidecars
+    # may be out of date
+    touched = []
+
+    def touch_outputs(outputs):
+        for status in ("added", "changed", "deleted"):
+            touched.extend(os.path.relpath(path, dest_dir) for path in outputs[status])
+
+    def compress_touched():
+        if gzip is not None and touched:
+            compress_site(dest_dir, manifest_path, gzip, gzip_min_savings, paths=touched)
+    layout_changed = any(
+        path == template_path or os.path.basename(path) == LAYOUT_FILENAME
+        for path in changed
+    )
+
+    images = default_loader.images
+    if image_sizes and any(
+        _is_under(path, static_dir) and path.lower().endswith(IMAGE_EXTENSIONS) for path in changed
+    ):
+        images = scan_image_sizes(static_dir, manifest_path)
+    images_changed = images is not default_loader.images and (
+        default_loader.images is None or images.digest != default_loader.images.digest
+    )
+
+    if fingerprint and any(_is_under(path, static_dir) for path in changed):
+        assets = sync_static(
+            static_dir, dest_dir, manifest_path,
+            checksum=checksum, hardlink=hardlink, fingerprint=True, image_cache=image_cache,
+        )
+        asset_map = AssetMap(assets["fingerprints"])
+        write_asset_manifest(dest_dir, asset_map, assets)
+        built = build_pages(
+            content_dir, template_path, dest_dir, basepath, manifest_path, assets=asset_map, images=images,
+            search=search,
+        )
+        touch_outputs(built["outputs"])
+        touched.extend(assets["copied"] + assets["removed"])
+        compress_touched()
+        return {"pages": built["built"], "assets": assets["copied"], "removed": assets["removed"]}
+
+    rebuild_all = layout_changed or images_changed
+    if rebuild_all:
+        # The manifest stores each page's template hash and the build
+        # settings, so only the pages they affect are regenerated
+        built = build_pages(
+            content_dir, template_path, dest_dir, basepath, manifest_path,
+            assets=default_loader.assets, images=images, search=search,
+        )
+        summary["pages"].extend(built["built"])
+        touch_outputs(built["outputs"])
+
+    if any(_is_under(path, static_dir) for path in changed):
+        assets = sync_static(
+            static_dir, dest_dir, manifest_path,
+            checksum=checksum, hardlink=hardlink, image_cache=image_cache,
+        )
+        summary["assets"].extend(assets["copied"])
+        summary["removed"].extend(assets["removed"])
+        touched.extend(assets["copied"] + assets["removed"])
+
+    manifest = BuildManifest.load(manifest_path)
+    layouts = {}
+    index = SearchIndex() if search else None
+    collected = {}
+    removed_sources = []
+    for path in sorted(changed):
+        if _is_under(path, content_dir) and path.endswith(".md") and not rebuild_all:
+            if os.path.exists(path):
+                dest_path = page_dest_path(path, content_dir, dest_dir)
+                layout = find_layout(path, content_dir, template_path, layouts)
+                previous_hash = manifest.output_hash(path, dest_path)
+                images_used = {}
+                try:
+                    output_hash, _ = generate_page(
+                        path, layout, dest_path, basepath, previous_hash=previous_hash, search=index,
+                        images_used=images_used,
+                    )
+                except Exception as e:
+                    raise PageBuildError(path, f"{type(e).__name__}: {e}") from e
+                manifest.record(path, hash_file(path), dest_path, hash_file(layout), output_hash, images_used)
+                if index is not None:
+                    collected[path] = (dest_path, index.pages[path])
+                summary["pages"].append(path)
+            else:
+                dest_path = manifest.forget(path) or page_dest_path(path, content_dir, dest_dir)
+                remove_output(dest_path, dest_dir)
+                removed_sources.append(path)
+                summary["removed"].append(dest_path)
+            touched.append(os.path.relpath(dest_path, dest_dir))
+
+    if index is not None and (collected or removed_sources):
+        touch_outputs(update_search_index(manifest, collected, removed_sources, dest_dir, basepath))
+    manifest.save()
+    compress_touched()
+    return summary
+
+def watch_site(content_dir, static_dir, template_path, dest_dir, basepath, manifest_path,
+               interval=0.5, debounce=0.2, fingerprint=False, image_sizes=False, image_cache=None,
+               search=False, gzip=None, gzip_min_savings=DEFAULT_MIN_SAVINGS, checksum=False, hardlink=False):
+    """
+    Poll the site sources and apply targeted rebuilds until interrupted.
+
+    A burst of saves is gathered into one rebuild: after the first change
+    is seen, polling continues every `debounce` seconds until a poll comes
+    back empty. The latency of each rebuild is printed.
+
+    Args:
+        content_dir: Content directory
+        static_dir: Static asset directory
+        template_path: Site-wide template path
+        dest_dir: Output directory
+        basepath: Base path for the site
+        manifest_path: Path to the build manifest
+        interval: Seconds between polls while idle
+        debounce: Quiet period in seconds that ends a burst of changes
+        fingerprint: Static assets are copied to content-hashed names
+        image_sizes: <img> tags are annotated with their images' sizes
+        image_cache: Directory caching optimized PNGs, if they are optimized
+        search: Keep the search index up to date with the pages
+        gzip: gzip level of the .gz sidecars, if they are written
+        gzip_min_savings: Fraction of a file's size its sidecar must save
+        checksum: Compare equal-sized assets by content hash instead of mtime
+        hardlink: Hardlink assets to their sources instead of copying them
+    """
+    watcher = SnapshotWatcher([content_dir, static_dir, template_path])
+    print(f"\nWatching {content_dir}/, {static_dir}/ and {template_path} for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(interval)
+            changed = watcher.poll()
+            if not changed:
+                continue
+            while True:
+                time.sleep(debounce)
+                more = watcher.poll()
+                if not more:
+                    break
+                changed |= more
+
+            start = time.perf_counter()
+            try:
+                summary = rebuild_changes(
+                    changed, content_dir, static_dir, template_path, dest_dir, basepath, manifest_path,
+                    fingerprint, image_sizes, image_cache, search, gzip, gzip_min_savings,
+                    checksum, hardlink,
+                )
+            except Exception as e:
+                print(f"Rebuild failed: {e}")
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            print(
+                f"Rebuilt {len(changed)} change(s) in {elapsed:.1f} ms: "
+                f"{len(summary['pages'])} page(s), {len(summary['assets'])} asset(s), "
+                f"{len(summary['removed'])} removed"
+            )
+    except KeyboardInterrupt:
+        print("\nStopped watching")
\ No newline at end of file